@@ -1,14 +1,28 @@
 """
 PCB阻抗计算器 - 后端API主文件
 """
+import time
+# 记录包导入起点，用于启动耗时报告（须在其余导入之前）
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 from flask import Flask, jsonify
 from flask_cors import CORS
-from .routes import calculator_bp, material_bp, form_bp, types_bp, health_bp
+from .routes import (
+    calculator_bp, material_bp, form_bp, types_bp, health_bp, synthesis_bp, admin_bp, metrics_bp, export_bp,
+    stackup_bp,
+)
+from .services import load_fast_tables, prewarm_models, model_import_report, LazyStaticPayloads
+from .utils.http_cache import DEFINITIONS_VERSION_HEADER
+from .utils.logger import setup_logger
+from .utils.metrics import install_request_metrics
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 
 def create_app():
     """创建Flask应用工厂函数"""
+    started = time.perf_counter()
     app = Flask(__name__)
     
     # 配置
@@ -30,16 +44,42 @@ def create_app():
             "origins": origins_list,
             "methods": ["GET", "POST", "OPTIONS"],
             "allow_headers": ["Content-Type"],
+            "expose_headers": ["ETag", DEFINITIONS_VERSION_HEADER, "Content-Disposition"],
             "supports_credentials": False  # 当使用 * 时必须为 False
         }
     })
     
+    # 加载 fast 引擎插值表（mmap 只读映射，gunicorn --preload 时各 worker 共享物理页）
+    phase_started = time.perf_counter()
+    load_fast_tables()
+    fast_tables_seconds = time.perf_counter() - phase_started
+
+    # 模型按需导入；ZCAL_PREWARM_MODELS 指定的模型在此预热（--preload 时在主进程中完成）
+    prewarm_seconds = prewarm_models()
+
+    # 计算类型、表单字段定义与材料库预先序列化（附 ETag 与定义版本号）；需要导入全部模型，
+    # 因此推迟到首次访问，只有全部模型已预热时才在此构建
+    payloads = app.config['STATIC_PAYLOADS'] = LazyStaticPayloads()
+    static_payloads_seconds = None
+    if all(item['loaded'] for item in model_import_report().values()):
+        phase_started = time.perf_counter()
+        payloads.get()
+        static_payloads_seconds = time.perf_counter() - phase_started
+
     # 注册蓝图
     app.register_blueprint(calculator_bp, url_prefix='/api')
     app.register_blueprint(material_bp, url_prefix='/api')
     app.register_blueprint(form_bp, url_prefix='/api')
     app.register_blueprint(types_bp, url_prefix='/api')
+    app.register_blueprint(synthesis_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(stackup_bp, url_prefix='/api')
     app.register_blueprint(health_bp)  # 健康检查不需要前缀
+    app.register_blueprint(metrics_bp)  # Prometheus 抓取端点 /metrics
+
+    # 请求数、错误数与延迟指标
+    install_request_metrics(app)
     
     # 根路径健康检查
     @app.route('/')
@@ -48,6 +88,7 @@ def create_app():
             'service': 'PCB Impedance Calculator API',
             'status': 'running',
             'version': '1.0.0',
+            'definitions_version': app.config['STATIC_PAYLOADS'].definitions_version,
             'cors_origins': origins_list  # 显示当前CORS配置
         }), 200
     
@@ -59,10 +100,27 @@ def create_app():
     @app.errorhandler(500)
     def internal_error(error):
         return jsonify({'status': 'error', 'message': '服务器内部错误'}), 500
-    
+
+    # 启动耗时报告（GET /api/admin/startup 可查看）
+    app.config['STARTUP_REPORT'] = _startup_report(started, fast_tables_seconds, prewarm_seconds, static_payloads_seconds)
+    setup_logger().info("启动耗时", extra={'payload': {'event': 'startup', **app.config['STARTUP_REPORT']}})
+
     return app
 
 
+def _startup_report(started, fast_tables_seconds, prewarm_seconds, static_payloads_seconds):
+    """启动各阶段耗时（毫秒）及各模型模块的导入耗时"""
+    return {
+        'package_import_ms': round(_IMPORT_SECONDS * 1000, 2),
+        'fast_tables_ms': round(fast_tables_seconds * 1000, 2),
+        'prewarm_ms': {calc_type: round(seconds * 1000, 2) for calc_type, seconds in prewarm_seconds.items()},
+        # None 表示推迟到首次访问
+        'static_payloads_ms': round(static_payloads_seconds * 1000, 2) if static_payloads_seconds is not None else None,
+        'create_app_ms': round((time.perf_counter() - started) * 1000, 2),
+        'models': model_import_report(),
+    }
+
+
 # if __name__ == '__main__':
 #     app = create_app()
 #     app.run(debug=True, host='0.0.0.0', port=5000)
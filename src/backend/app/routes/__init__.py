@@ -6,5 +6,11 @@ from .get_material import material_bp
 from .get_models_form import form_bp
 from .get_model_types import types_bp
 from .health import health_bp
+from .get_synthesis import synthesis_bp
+from .admin import admin_bp
+from .metrics import metrics_bp
+from .export import export_bp
+from .get_stackup import stackup_bp
 
-__all__ = ['calculator_bp', 'material_bp', 'form_bp', 'types_bp', 'health_bp']
\ No newline at end of file
+__all__ = ['calculator_bp', 'material_bp', 'form_bp', 'types_bp', 'health_bp', 'synthesis_bp', 'admin_bp',
+           'metrics_bp', 'export_bp', 'stackup_bp']
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+管理API路由 - 结果缓存与材料缓存查看与清空、fast 引擎插值表状态、启动耗时报告
+"""
+import os
+from functools import wraps
+from flask import Blueprint, current_app, jsonify, request
+from app.services import result_cache, load_fast_tables, model_import_report, clear_material_cache
+from app.services.method import fast_table
+
+admin_bp = Blueprint('admin', __name__, url_prefix='')
+
+
+def require_admin_token(view):
+    """设置了 ZCAL_ADMIN_TOKEN 时，要求请求头 X-Admin-Token 与之一致"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = os.environ.get('ZCAL_ADMIN_TOKEN')
+        if token and request.headers.get('X-Admin-Token') != token:
+            return jsonify({'status': 'error', 'message': '无权访问'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/admin/cache', methods=['GET'])
+@require_admin_token
+def get_cache_stats():
+    """查看结果缓存统计（条目数、命中/未命中、淘汰/过期次数）"""
+    return jsonify({'status': 'success', 'cache': result_cache.stats()}), 200
+
+
+@admin_bp.route('/admin/cache/flush', methods=['POST'])
+@require_admin_token
+def flush_cache():
+    """清空结果缓存；同时清空已解析材料并重新打开材料库（重建材料库后调用）"""
+    cleared = result_cache.clear()
+    materials = clear_material_cache()
+    return jsonify({'status': 'success', 'cleared': cleared, 'materials_cleared': materials,
+                    'cache': result_cache.stats()}), 200
+
+
+@admin_bp.route('/admin/fast-tables', methods=['GET'])
+@require_admin_token
+def get_fast_tables():
+    """查看 fast 引擎插值表加载状态"""
+    return jsonify({'status': 'success', 'fast_tables': fast_table.table_status()}), 200
+
+
+@admin_bp.route('/admin/fast-tables/reload', methods=['POST'])
+@require_admin_token
+def reload_fast_tables():
+    """重新加载插值表（离线重建表文件后使用，仅作用于处理该请求的 worker）"""
+    load_fast_tables()
+    return jsonify({'status': 'success', 'fast_tables': fast_table.table_status()}), 200
+
+
+@admin_bp.route('/admin/startup', methods=['GET'])
+@require_admin_token
+def get_startup_report():
+    """查看启动耗时报告（各阶段耗时、预热耗时）及当前各模型模块的导入状态"""
+    return jsonify({
+        'status': 'success',
+        'startup': current_app.config.get('STARTUP_REPORT'),
+        'models': model_import_report(),
+    }), 200
@@ -0,0 +1,71 @@
+"""
+导出API路由 - Touchstone（.s2p / .s4p）S 参数文件
+"""
+import time
+from flask import Blueprint, request, jsonify
+from app.services import export_touchstone
+from app.utils.logger import setup_logger, log_request, log_response, log_error
+from app.utils.streaming import attachment_response
+
+# 设置日志器
+logger = setup_logger("export_api")
+
+export_bp = Blueprint('export', __name__, url_prefix='')
+
+
+@export_bp.route('/export/touchstone', methods=['POST'])
+def export_touchstone_file():
+    """
+    导出传输线段的 Touchstone 文件（单端模型 2 端口，差分模型 4 端口），按块流式输出
+
+    请求体：{"type", "params", "length"（mm）, "sweep", "engine"?, "reference_impedance"?, "format"?（RI/MA/DB）}
+    """
+    start_time = time.time()
+    endpoint = "POST /export/touchstone"
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        calc_type = data.get('type')
+        params = data.get('params', {})
+        length = data.get('length')
+        sweep = data.get('sweep')
+        engine = data.get('engine')
+        reference_impedance = data.get('reference_impedance')
+        data_format = data.get('format', 'RI')
+
+        if not calc_type:
+            raise ValueError("计算类型不能为空")
+        if length is None:
+            raise ValueError("length 不能为空")
+        if sweep is None:
+            raise ValueError("sweep 不能为空")
+
+        log_request(logger, {"type": calc_type, "params": params, "length": length, "engine": engine,
+                             "format": data_format}, endpoint)
+
+        # 2. 参数校验在此完成（出错返回 400），S 参数在输出响应体时逐块计算
+        filename, chunks = export_touchstone(calc_type, params, length, sweep, engine,
+                                             reference_impedance, data_format)
+
+        def on_error(e):
+            log_error(logger, e, endpoint)
+            return str(e)
+
+        def on_complete():
+            log_response(logger, {"type": calc_type, "file": filename}, endpoint, time.time() - start_time)
+
+        return attachment_response(chunks, filename, on_error, on_complete=on_complete)
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
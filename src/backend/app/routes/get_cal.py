@@ -2,9 +2,19 @@
 计算器API路由
 """
 import time
-from flask import Blueprint, request, jsonify
-from app.services import calculate
+from flask import Blueprint, current_app, request, jsonify
+from app.services import (
+    calculate, calculate_batch, calculate_grid, stream_batch, stream_grid, analyze_tolerance, calculate_sensitivity,
+    CalculationTimeout,
+)
+from app.utils.http_cache import DEFINITIONS_VERSION_HEADER
 from app.utils.logger import setup_logger, log_request, log_response, log_error, log_calculation
+from app.utils.metrics import observe_phase, phase_timer
+from app.utils.response_format import (
+    JSON_MIMETYPE, negotiate, not_acceptable_message, compact_result, compact_batch, compact_header,
+    formatted_response,
+)
+from app.utils.streaming import ndjson_response
 
 # 设置日志器
 logger = setup_logger("calculator_api")
@@ -15,6 +25,10 @@ calculator_bp = Blueprint('calculator', __name__, url_prefix='')
 def calculate_impedance():
     start_time = time.time()
     endpoint = "POST /calculate"
+    # 响应格式（Accept 协商）：完整 JSON、紧凑 JSON 或 MessagePack
+    mimetype = negotiate()
+    if mimetype is None:
+        return jsonify({'status': 'error', 'message': not_acceptable_message()}), 406
     
     try:
         # 1. 解析请求
@@ -24,15 +38,25 @@ def calculate_impedance():
             
         calc_type = data.get('type')
         params = data.get('params', {})
+        # 可选扫频：{"start", "stop", "points"} 或 {"frequencies": [...]}（GHz）
+        sweep = data.get('sweep')
+        # 可选计算引擎：skrf（默认）、numpy 或 fast（插值表）
+        engine = data.get('engine')
+        # 可选 CPU 时间预算（秒），仅对分发到进程池的大计算生效
+        timeout = data.get('timeout')
+        # 可选材料键：按材料库中该材料的频率相关介电参数计算（代替 params 中的 dielectric / loss_tangent）
+        material = data.get('material')
         
         if not calc_type:
             raise ValueError("计算类型不能为空")
+        observe_phase('parse', calc_type, time.time() - start_time)
         
         # 记录请求日志
-        log_request(logger, {"type": calc_type, "params": params}, endpoint)
+        log_request(logger, {"type": calc_type, "params": params, "sweep": sweep, "engine": engine,
+                             "material": material}, endpoint)
         
-        # 2. 执行计算（services.calculate 在异常时直接抛出，路由统一处理）
-        result = calculate(calc_type, params)
+        # 2. 执行计算（services.calculate 在异常时直接抛出，路由统一处理；内部记录 validate / compute 阶段耗时）
+        result = calculate(calc_type, params, sweep, engine, timeout, material)
         
         # 3. 记录计算日志
         log_calculation(logger, calc_type, params, result)
@@ -42,7 +66,16 @@ def calculate_impedance():
         log_response(logger, result, endpoint, duration)
         
         # 5. 返回结果（成功）
-        return jsonify(result), 200
+        with phase_timer('serialize', calc_type):
+            if mimetype != JSON_MIMETYPE:
+                return formatted_response(compact_result(result), mimetype, _definitions_version())
+            response = jsonify(result)
+        return response, 200
+
+    except CalculationTimeout as e:
+        # 进程池中的计算超出时间预算 -> 504
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': str(e)}), 504
 
     except ValueError as e:
         # 参数校验或业务逻辑错误 -> 400
@@ -56,3 +89,337 @@ def calculate_impedance():
         log_error(logger, e, endpoint)
         return jsonify({'status': 'error', 'message': error_msg}), 500
 
+
+@calculator_bp.route('/calculate/batch', methods=['POST'])
+def calculate_impedance_batch():
+    """批量计算：一次请求提交多条 {type, params}，按输入顺序返回逐项结果"""
+    start_time = time.time()
+    endpoint = "POST /calculate/batch"
+    mimetype = negotiate()
+    if mimetype is None:
+        return jsonify({'status': 'error', 'message': not_acceptable_message()}), 406
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        items = data.get('items')
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+        if items is None:
+            raise ValueError("items 不能为空")
+
+        # 记录请求日志（只记录摘要，避免逐条格式化参数）
+        log_request(logger, {"count": len(items) if isinstance(items, list) else None}, endpoint)
+
+        # 2. 执行批量计算（单项错误写入对应结果，不中断整批）
+        results = calculate_batch(items, engine, timeout)
+
+        # 3. 计算耗时并记录响应日志
+        duration = time.time() - start_time
+        error_count = sum(1 for r in results if r.get('status') != 'success')
+        log_response(logger, {"count": len(results), "errors": error_count}, endpoint, duration)
+
+        # 4. 返回结果（紧凑格式为按结果字段定义分组的列式数组）
+        if mimetype != JSON_MIMETYPE:
+            return formatted_response(compact_batch(results), mimetype, _definitions_version())
+        return jsonify({'status': 'success', 'count': len(results), 'results': results}), 200
+
+    except CalculationTimeout as e:
+        # 进程池中的计算超出时间预算 -> 504
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': str(e)}), 504
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
+
+
+@calculator_bp.route('/calculate/grid', methods=['POST'])
+def calculate_impedance_grid():
+    """参数网格扫描：对指定参数做笛卡尔积扫描，返回N维结果数组及轴信息"""
+    start_time = time.time()
+    endpoint = "POST /calculate/grid"
+    mimetype = negotiate()
+    if mimetype is None:
+        return jsonify({'status': 'error', 'message': not_acceptable_message()}), 406
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        calc_type = data.get('type')
+        params = data.get('params', {})
+        axes = data.get('axes')
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+
+        if not calc_type:
+            raise ValueError("计算类型不能为空")
+
+        # 记录请求日志（轴只记录参数名，避免格式化大列表）
+        log_request(logger, {"type": calc_type, "params": params, "axes": list(axes or {})}, endpoint)
+
+        # 2. 执行网格扫描
+        result = calculate_grid(calc_type, params, axes, engine, timeout)
+
+        # 3. 计算耗时并记录响应日志
+        duration = time.time() - start_time
+        log_response(logger, {"type": calc_type, "shape": result['shape']}, endpoint, duration)
+
+        # 4. 返回结果
+        if mimetype != JSON_MIMETYPE:
+            return formatted_response(compact_header(result), mimetype, _definitions_version())
+        return jsonify(result), 200
+
+    except CalculationTimeout as e:
+        # 进程池中的计算超出时间预算 -> 504
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': str(e)}), 504
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
+
+
+@calculator_bp.route('/calculate/tolerance', methods=['POST'])
+def calculate_impedance_tolerance():
+    """蒙特卡洛容差分析：按参数容差分布抽样，返回结果的均值、标准差、百分位数与直方图"""
+    start_time = time.time()
+    endpoint = "POST /calculate/tolerance"
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        calc_type = data.get('type')
+        params = data.get('params', {})
+        tolerances = data.get('tolerances')
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+
+        if not calc_type:
+            raise ValueError("计算类型不能为空")
+
+        log_request(logger, {"type": calc_type, "params": params, "tolerances": tolerances,
+                             "samples": data.get('samples')}, endpoint)
+
+        # 2. 抽样并一次向量化计算全部样本
+        result = analyze_tolerance(
+            calc_type, params, tolerances,
+            samples=data.get('samples'),
+            sampling=data.get('sampling', 'random'),
+            seed=data.get('seed'),
+            bins=data.get('bins'),
+            target=data.get('target'),
+            tolerance=data.get('tolerance'),
+            engine=engine,
+            timeout=timeout,
+        )
+
+        # 3. 计算耗时并记录响应日志
+        duration = time.time() - start_time
+        log_response(logger, {"type": calc_type, "samples": result['samples'], "rejected": result['rejected']},
+                     endpoint, duration)
+
+        # 4. 返回结果
+        return jsonify(result), 200
+
+    except CalculationTimeout as e:
+        # 进程池中的计算超出时间预算 -> 504
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': str(e)}), 504
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
+
+
+@calculator_bp.route('/calculate/sensitivity', methods=['POST'])
+def calculate_impedance_sensitivity():
+    """灵敏度分析：各结果对各参数的偏导数（可选扫频，每个频点一张表）"""
+    start_time = time.time()
+    endpoint = "POST /calculate/sensitivity"
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        calc_type = data.get('type')
+        params = data.get('params', {})
+        sweep = data.get('sweep')
+        # 可选：求导的参数名列表，缺省为全部参数
+        keys = data.get('keys')
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+
+        if not calc_type:
+            raise ValueError("计算类型不能为空")
+
+        log_request(logger, {"type": calc_type, "params": params, "sweep": sweep, "keys": keys}, endpoint)
+
+        # 2. 全部扰动点一次向量化计算
+        result = calculate_sensitivity(calc_type, params, sweep, keys, engine, timeout)
+
+        # 3. 计算耗时并记录响应日志
+        duration = time.time() - start_time
+        log_response(logger, {"type": calc_type, "inputs": len(result['inputs'])}, endpoint, duration)
+
+        # 4. 返回结果
+        return jsonify(result), 200
+
+    except CalculationTimeout as e:
+        # 进程池中的计算超出时间预算 -> 504
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': str(e)}), 504
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
+
+
+@calculator_bp.route('/calculate/batch/stream', methods=['POST'])
+def calculate_impedance_batch_stream():
+    """流式批量计算：请求体同 /calculate/batch（可加 chunk_size），逐条以 NDJSON 返回结果"""
+    start_time = time.time()
+    endpoint = "POST /calculate/batch/stream"
+    mimetype = negotiate(streaming=True)
+    if mimetype is None:
+        return jsonify({'status': 'error', 'message': not_acceptable_message(streaming=True)}), 406
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        items = data.get('items')
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+        chunk_size = data.get('chunk_size')
+        if items is None:
+            raise ValueError("items 不能为空")
+
+        log_request(logger, {"count": len(items) if isinstance(items, list) else None}, endpoint)
+
+        # 2. 参数校验在此完成（出错返回 400），计算在输出响应体时逐块进行
+        records = stream_batch(items, engine, timeout, chunk_size)
+
+        def on_complete():
+            log_response(logger, {"count": len(items)}, endpoint, time.time() - start_time)
+
+        return _stream_response(records, mimetype, _stream_error_handler(endpoint), on_complete)
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
+
+
+@calculator_bp.route('/calculate/grid/stream', methods=['POST'])
+def calculate_impedance_grid_stream():
+    """流式网格扫描：请求体同 /calculate/grid（可加 chunk_size），按块以 NDJSON 返回结果"""
+    start_time = time.time()
+    endpoint = "POST /calculate/grid/stream"
+    mimetype = negotiate(streaming=True)
+    if mimetype is None:
+        return jsonify({'status': 'error', 'message': not_acceptable_message(streaming=True)}), 406
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        calc_type = data.get('type')
+        params = data.get('params', {})
+        axes = data.get('axes')
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+        chunk_size = data.get('chunk_size')
+
+        if not calc_type:
+            raise ValueError("计算类型不能为空")
+
+        log_request(logger, {"type": calc_type, "params": params, "axes": list(axes or {})}, endpoint)
+
+        # 2. 参数与扫描轴校验在此完成（出错返回 400），计算在输出响应体时逐块进行
+        records = stream_grid(calc_type, params, axes, engine, timeout, chunk_size)
+
+        def on_complete():
+            log_response(logger, {"type": calc_type}, endpoint, time.time() - start_time)
+
+        return _stream_response(records, mimetype, _stream_error_handler(endpoint), on_complete)
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
+
+
+def _definitions_version():
+    return current_app.config['STATIC_PAYLOADS'].definitions_version
+
+
+def _stream_response(records, mimetype, on_error, on_complete):
+    """NDJSON 流式响应；紧凑格式时逐条记录以定义编号代替 resultDefinitions"""
+    if mimetype == JSON_MIMETYPE:
+        return ndjson_response(records, on_error, on_complete)
+    response = ndjson_response(records, on_error, on_complete, compact=True)
+    response.headers[DEFINITIONS_VERSION_HEADER] = _definitions_version()
+    response.vary.add('Accept')
+    return response
+
+
+def _stream_error_handler(endpoint):
+    """流式响应中途出错：记录错误日志，返回写入 error 记录的信息（状态码已发出，无法再改）"""
+    def on_error(e):
+        log_error(logger, e, endpoint)
+        if isinstance(e, CalculationTimeout):
+            return str(e)
+        if isinstance(e, ValueError):
+            return f'参数错误: {str(e)}'
+        return f'服务器错误: {str(e)}'
+    return on_error
@@ -1,8 +1,10 @@
 """
 材料库API路由
 """
-from flask import Blueprint, jsonify
-from app.services.model_materials import substrate_materials
+import math
+from flask import Blueprint, current_app, jsonify, request
+from app.services.model_materials import get_material, search_materials
+from app.utils.http_cache import static_response
 
 material_bp = Blueprint('material', __name__, url_prefix='')
 
@@ -10,6 +12,52 @@ material_bp = Blueprint('material', __name__, url_prefix='')
 @material_bp.route('/materials', methods=['GET'])
 def get_materials():
     """
-    获取预定义的基板材料列表
+    获取预定义的基板材料列表（预先序列化，支持 ETag/304）
     """
-    return jsonify(substrate_materials), 200
+    payloads = current_app.config['STATIC_PAYLOADS']
+    return static_response(payloads.materials, payloads.definitions_version)
+
+
+@material_bp.route('/materials/library', methods=['GET'])
+def search_material_library():
+    """
+    检索材料库：?q=键或名称前缀&vendor=厂商&limit=条数，返回材料摘要列表
+    """
+    try:
+        materials = search_materials(request.args.get('q', ''), request.args.get('vendor'),
+                                     request.args.get('limit', 50))
+        return jsonify({"status": "success", "count": len(materials), "materials": materials})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"检索材料库失败：{str(e)}"}), 500
+
+
+@material_bp.route('/materials/<key>', methods=['GET'])
+def get_material_properties(key):
+    """
+    获取材料摘要及指定频点的介电参数：?frequency=1,10,25（GHz，缺省为标定频率）
+    """
+    try:
+        material = get_material(key)
+        text = request.args.get('frequency')
+        try:
+            frequency = [float(value) for value in text.split(',')] if text else [material.f_ref]
+        except ValueError:
+            raise ValueError(f"frequency 必须是以逗号分隔的数字，当前值: {text}")
+        # inf / nan 会在 JSON 中输出为 Infinity / NaN（不是合法 JSON）
+        if not all(math.isfinite(value) and value > 0 for value in frequency):
+            raise ValueError("frequency 必须是大于0的有限数")
+        er, tand = material.properties(frequency)
+        return jsonify({
+            "status": "success",
+            **material.summary(),
+            "frequency": frequency,
+            "er_f": [round(float(value), 4) for value in er],
+            "loss_tangent_f": [round(float(value), 6) for value in tand],
+        })
+    except ValueError as e:
+        status = 404 if str(e).startswith("材料库中不存在材料") else 400
+        return jsonify({"status": "error", "message": str(e)}), status
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"获取材料失败：{str(e)}"}), 500
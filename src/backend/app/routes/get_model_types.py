@@ -2,14 +2,14 @@
 表单定义 API 路由
 """
 # from pyexpat import model
-from flask import Blueprint, jsonify, request
-from app.services import  get_calculation_types
+from flask import Blueprint, current_app
+from app.utils.http_cache import static_response
 
 types_bp = Blueprint('types', __name__, url_prefix='')
 
 
 @types_bp.route('/calculation_types', methods=['GET'])
 def get_calculation_types_endpoint():
-    """返回所有可用的计算类型"""
-    types = get_calculation_types()
-    return jsonify(types), 200
\ No newline at end of file
+    """返回所有可用的计算类型（预先序列化，支持 ETag/304）"""
+    payloads = current_app.config['STATIC_PAYLOADS']
+    return static_response(payloads.calculation_types, payloads.definitions_version)
\ No newline at end of file
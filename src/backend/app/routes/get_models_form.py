@@ -2,8 +2,8 @@
 表单定义 API 路由
 """
 # from pyexpat import model
-from flask import Blueprint, jsonify, request
-from app.services import get_form_definitions
+from flask import Blueprint, current_app, jsonify, request
+from app.utils.http_cache import static_response
 
 form_bp = Blueprint('form', __name__, url_prefix='')
 
@@ -18,7 +18,18 @@ def get_form_fields():
     if not model:
         return jsonify({"error": "model参数不能为空（请通过?model=xxx传递）"}), 400
     try:
-        defs = get_form_definitions(model)
-        return jsonify(defs), 200
+        # 响应体只序列化一次（见 app.services.model_metadata）
+        payloads = current_app.config['STATIC_PAYLOADS']
+        return static_response(payloads.form_fields_for(model), payloads.definitions_version)
     except Exception as e:
-        return jsonify({"error": f"获取字段定义失败：{str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"获取字段定义失败：{str(e)}"}), 500
+
+
+@form_bp.route('/result_definitions', methods=['GET'])
+def get_result_definitions():
+    """返回全部结果字段定义（定义编号 -> 定义列表），紧凑响应格式以编号引用"""
+    try:
+        payloads = current_app.config['STATIC_PAYLOADS']
+        return static_response(payloads.result_definitions, payloads.definitions_version)
+    except Exception as e:
+        return jsonify({"error": f"获取结果字段定义失败：{str(e)}"}), 500
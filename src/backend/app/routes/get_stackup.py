@@ -0,0 +1,62 @@
+"""
+叠层阻抗报告API路由
+"""
+import time
+from flask import Blueprint, request, jsonify
+from app.services import calculate_stackup, CalculationTimeout
+from app.utils.logger import setup_logger, log_request, log_response, log_error
+
+# 设置日志器
+logger = setup_logger("stackup_api")
+
+stackup_bp = Blueprint('stackup', __name__, url_prefix='')
+
+
+@stackup_bp.route('/stackup', methods=['POST'])
+def calculate_stackup_report():
+    """一次计算叠层上全部走线类别的阻抗，返回汇总报告表"""
+    start_time = time.time()
+    endpoint = "POST /stackup"
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        stackup = data.get('stackup')
+        frequency = data.get('frequency', 1)
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+        if stackup is None:
+            raise ValueError("stackup 不能为空")
+
+        # 记录请求日志（只记录层数，避免格式化整个叠层）
+        layers = stackup.get('layers') if isinstance(stackup, dict) else None
+        log_request(logger, {"layers": len(layers) if isinstance(layers, list) else None,
+                             "frequency": frequency, "engine": engine}, endpoint)
+
+        # 2. 计算（单条走线的错误写入对应行，不中断整个报告）
+        report = calculate_stackup(stackup, frequency, engine, timeout)
+
+        # 3. 计算耗时并记录响应日志
+        duration = time.time() - start_time
+        log_response(logger, report['summary'], endpoint, duration)
+
+        # 4. 返回结果
+        return jsonify(report), 200
+
+    except CalculationTimeout as e:
+        # 进程池中的计算超出时间预算 -> 504
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': str(e)}), 504
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
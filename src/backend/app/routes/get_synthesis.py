@@ -0,0 +1,68 @@
+"""
+阻抗综合API路由
+"""
+import time
+from flask import Blueprint, request, jsonify
+from app.services import synthesize, CalculationTimeout
+from app.utils.logger import setup_logger, log_request, log_response, log_error
+
+# 设置日志器
+logger = setup_logger("synthesis_api")
+
+synthesis_bp = Blueprint('synthesis', __name__, url_prefix='')
+
+
+@synthesis_bp.route('/synthesize', methods=['POST'])
+def synthesize_geometry():
+    """根据目标阻抗反解几何参数，支持一次提交多个目标值"""
+    start_time = time.time()
+    endpoint = "POST /synthesize"
+
+    try:
+        # 1. 解析请求
+        data = request.get_json()
+        if not data:
+            raise ValueError("请求体不能为空")
+
+        calc_type = data.get('type')
+        params = data.get('params', {})
+        free_param = data.get('free_param')
+        targets = data.get('targets', data.get('target'))
+        target_key = data.get('target_key', 'impedance')
+        bounds = data.get('bounds')
+        engine = data.get('engine')
+        timeout = data.get('timeout')
+
+        if not calc_type:
+            raise ValueError("计算类型不能为空")
+        if not free_param:
+            raise ValueError("free_param 不能为空")
+        if targets is None:
+            raise ValueError("target/targets 不能为空")
+
+        log_request(logger, {"type": calc_type, "params": params, "free_param": free_param,
+                             "targets": targets, "target_key": target_key}, endpoint)
+
+        # 2. 执行综合
+        result = synthesize(calc_type, params, free_param, targets, target_key, bounds, engine, timeout)
+
+        # 3. 计算耗时并记录响应日志
+        duration = time.time() - start_time
+        log_response(logger, result, endpoint, duration)
+
+        return jsonify(result), 200
+
+    except CalculationTimeout as e:
+        # 进程池中的计算超出时间预算 -> 504
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': str(e)}), 504
+
+    except ValueError as e:
+        error_msg = f'参数错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 400
+
+    except Exception as e:
+        error_msg = f'服务器错误: {str(e)}'
+        log_error(logger, e, endpoint)
+        return jsonify({'status': 'error', 'message': error_msg}), 500
@@ -0,0 +1,14 @@
+"""
+指标路由 - Prometheus 抓取端点（不经 nginx 暴露，直接抓取后端端口）
+"""
+from flask import Blueprint, Response
+from app.utils.metrics import render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus 文本格式指标（多进程模式下汇总所有 worker）"""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
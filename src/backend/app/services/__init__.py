@@ -1,3 +1,13 @@
 from .model_form import  get_calculation_types, get_form_definitions
-from .model_materials import substrate_materials
-from .model_calculate import calculate
\ No newline at end of file
+from .model_materials import substrate_materials, get_material, search_materials, clear_material_cache
+from .model_metadata import build_static_payloads, LazyStaticPayloads
+from .model_calculate import (
+    calculate, calculate_batch, stream_batch, result_cache, load_fast_tables, prewarm_models, model_import_report,
+)
+from .model_sweep import calculate_grid, stream_grid
+from .model_synthesis import synthesize
+from .model_tolerance import analyze_tolerance
+from .model_sensitivity import calculate_sensitivity
+from .model_touchstone import export_touchstone
+from .model_stackup import calculate_stackup
+from .model_executor import CalculationTimeout
\ No newline at end of file
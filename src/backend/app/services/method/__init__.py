@@ -0,0 +1 @@
+"""计算内核"""
@@ -1,5 +1,254 @@
 """
-PCB阻抗计算器核心业务逻辑
+PCB阻抗计算器核心业务逻辑 - 纯 NumPy 闭式计算内核
+
+与 scikit-rf 媒质对象相比，这里直接在数组上求值同一组公式，不构造 Frequency/Media 对象，
+所有参数（包括频率）均可按 NumPy 规则广播，适合单点低延迟计算与批量/扫描向量化计算。
+
+微带线内核与 skrf.media.MLine 默认配置一致：
+    - 介质色散：Djordjevic–Svensson 宽带模型（f_low=1kHz, f_high=1THz, f_epr_tand=1GHz）
+    - 准静态：Hammerstad–Jensen（含导体厚度修正）
+    - 频率色散：Kirschning–Jansen
+    - 损耗：Wheeler 增量电感法导体损耗（铜 rho=1.68e-8，表面粗糙度 0.15µm）+ 介质损耗
+在 0.1–100 GHz、w/h 0.01–20、er 1–15 范围内与 skrf 结果的相对误差 < 1e-9（由 validate_kernels.py 校验）。
+
+共面波导内核与 skrf.media.CPW 默认配置一致：
+    - 准静态：Ghione–Naldi 保角映射（空气背面 / 金属背面两种情形）+ 导体厚度一阶修正
+    - 频率色散：Frankel / Gevorgian 色散公式
+    - 损耗：Ghione 导体损耗 + 介质损耗
+K(k)/K'(k) 比值沿用 skrf 的 Hilberg 闭式近似（与 ellipk 精确值相差约 2 ppm），
+损耗项中的完全椭圆积分用 scipy.special.ellipk 按数组一次求值。
+与 skrf 结果的相对误差同样 < 1e-9（validate_kernels.py cpw）。
 """
-# 注意：此文件中的函数已被移除，因为它们没有被使用
-# 各个模型的计算核心已移到对应模型文件中
+from typing import NamedTuple
+
+import numpy as np
+from scipy.constants import c, epsilon_0, mu_0, pi
+from scipy.special import ellipk
+
+# 自由空间波阻抗
+ETA_0 = np.sqrt(mu_0 / epsilon_0)
+
+# 默认导体与介质色散参数（与 skrf 默认值一致）
+COPPER_RHO = 1.68e-8
+COPPER_ROUGHNESS = 0.15e-6
+DIEL_F_LOW = 1e3
+DIEL_F_HIGH = 1e12
+DIEL_F_EPR_TAND = 1e9
+# skrf CPW 未指定介质厚度时的默认值（m）
+CPW_DEFAULT_H = 1.55
+
+
+class LineResult(NamedTuple):
+    """内核计算结果，属性名与 skrf 媒质对象一致，便于模型代码在两种引擎间共用"""
+    z0: np.ndarray          # 特征阻抗（复数，Ω）
+    ep_reff_f: np.ndarray   # 色散后的有效介电常数（复数）
+    w_eff: np.ndarray       # 厚度修正后的有效线宽（m）
+    gamma: np.ndarray       # 传播常数 alpha + j*beta（Np/m, rad/m）
+
+
+def djordjevic_svensson(ep_r, tand, f, f_low=DIEL_F_LOW, f_high=DIEL_F_HIGH, f_epr_tand=DIEL_F_EPR_TAND):
+    """Djordjevic–Svensson 宽带介质模型：返回频率相关的复介电常数与损耗角正切"""
+    k = np.log((f_high + 1j * f_epr_tand) / (f_low + 1j * f_epr_tand))
+    fd = np.log((f_high + 1j * f) / (f_low + 1j * f))
+    ep_d = -tand * ep_r / np.imag(k)
+    ep_inf = ep_r * (1. + tand * np.real(k) / np.imag(k))
+    ep_r_f = ep_inf + ep_d * fd
+    tand_f = -np.imag(ep_r_f) / np.real(ep_r_f)
+    return ep_r_f, tand_f
+
+
+def _hammerstad_zl(u):
+    """Hammerstad 均匀介质准静态阻抗"""
+    fu = 6 + (2 * pi - 6) * np.exp(-(30.666 / u) ** 0.7528)
+    return ETA_0 / 2. / pi * np.log(fu / u + np.sqrt(1. + (2. / u) ** 2))
+
+
+def _hammerstad_er(u, ep_r):
+    """Hammerstad 准静态有效介电常数"""
+    a = 1. + np.log((u ** 4 + (u / 52.) ** 2) / (u ** 4 + 0.432)) / 49. + np.log(1 + (u / 18.1) ** 3) / 18.7
+    b = 0.564 * ((ep_r - 0.9) / (ep_r + 3.)) ** 0.053
+    return (ep_r + 1) / 2 + (ep_r - 1) / 2 * (1. + 10. / u) ** (-a * b)
+
+
+def _kirschning_er(u, fn, ep_r, ep_reff):
+    """Kirschning–Jansen 有效介电常数色散（fn 单位 GHz·mm）"""
+    p1 = 0.27488 + (0.6315 + 0.525 / (1 + 0.0157 * fn) ** 20) * u - 0.065683 * np.exp(-8.7513 * u)
+    p2 = 0.33622 * (1 - np.exp(-0.03442 * ep_r))
+    p3 = 0.0363 * np.exp(-4.6 * u) * (1 - np.exp(-(fn / 38.7) ** 4.97))
+    p4 = 1 + 2.751 * (1 - np.exp(-(ep_r / 15.916) ** 8))
+    pf = p1 * p2 * ((0.1844 + p3 * p4) * fn) ** 1.5763
+    return ep_r - (ep_r - ep_reff) / (1 + pf)
+
+
+def _kirschning_zl(u, fn, ep_r, ep_reff, ep_reff_f, zl_eff):
+    """Kirschning–Jansen 特征阻抗色散（fn 单位 GHz·mm）"""
+    r1 = np.minimum(0.03891 * ep_r ** 1.4, 20.)
+    r2 = np.minimum(0.2671 * u ** 7, 20.)
+    r3 = 4.766 * np.exp(-3.228 * u ** 0.641)
+    r4 = 0.016 + (0.0514 * ep_r) ** 4.524
+    r5 = (fn / 28.843) ** 12
+    r6 = np.minimum(22.20 * u ** 1.92, 20.)
+    r7 = 1.206 - 0.3144 * np.exp(-r1) * (1 - np.exp(-r2))
+    r8 = 1 + 1.275 * (1 - np.exp(-0.004625 * r3 * ep_r ** 1.674 * (fn / 18.365) ** 2.745))
+    r9 = (5.086 * r4 * r5 / (0.3838 + 0.386 * r4) * np.exp(-r6) / (1 + 1.2992 * r5)
+          * (ep_r - 1) ** 6 / (1 + 10 * (ep_r - 1) ** 6))
+    r10 = 0.00044 * ep_r ** 2.136 + 0.0184
+    r11 = (fn / 19.47) ** 6 / (1 + 0.0962 * (fn / 19.47) ** 6)
+    r12 = 1 / (1 + 0.00245 * u ** 2)
+    r13 = 0.9408 * ep_reff_f ** r8 - 0.9603
+    r14 = (0.9408 - r9) * ep_reff ** r8 - 0.9603
+    r15 = 0.707 * r10 * (fn / 12.3) ** 1.097
+    r16 = 1 + 0.0503 * ep_r ** 2 * r11 * (1 - np.exp(-(u / 15) ** 6))
+    r17 = r7 * (1 - 1.1241 * r12 / r16 * np.exp(-0.026 * fn ** 1.15656 - r15))
+    return zl_eff * (r13 / r14) ** r17
+
+
+def mline(f, w, h, t, ep_r, tand, rho=COPPER_RHO, rough=COPPER_ROUGHNESS):
+    """
+    微带线闭式计算（可广播）
+
+    Args:
+        f: 频率（Hz）
+        w: 线宽（m）
+        h: 介质厚度（m）
+        t: 铜厚（m），须大于0
+        ep_r: 介电常数
+        tand: 损耗角正切
+        rho: 导体电阻率（Ω·m）
+        rough: 导体表面粗糙度 RMS（m）
+
+    Returns:
+        LineResult(z0, ep_reff_f, w_eff, gamma)，形状为各参数广播后的形状
+    """
+    f, w, h, t, ep_r, tand = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (f, w, h, t, ep_r, tand)))
+
+    # 1. 频率相关复介电常数
+    ep_r_f, tand_f = djordjevic_svensson(ep_r, tand, f)
+
+    # 2. Hammerstad–Jensen 准静态（导体厚度修正）
+    u = w / h
+    t_n = t / h
+    du1 = t_n / pi * np.log(1. + 4. * np.e / t_n * np.tanh(np.sqrt(6.517 * u)) ** 2)
+    dur = du1 * (1. + 1. / np.cosh(np.sqrt(ep_r_f - 1.))) / 2.
+    u1 = u + du1
+    ur = u + dur
+    w_eff = ur * h
+    zr = _hammerstad_zl(ur)
+    z1 = _hammerstad_zl(u1)
+    e = _hammerstad_er(ur, ep_r_f)
+    zl_eff = zr / np.sqrt(e)
+    ep_reff = e * (z1 / zr) ** 2
+
+    # 3. Kirschning–Jansen 频率色散
+    u_eff = w_eff / h
+    fn = f * h * 1e-6
+    ep_reff_f = _kirschning_er(u_eff, fn, ep_r_f, ep_reff)
+    z0 = _kirschning_zl(u_eff, fn, ep_r_f, ep_reff, ep_reff_f, zl_eff)
+
+    # 4. 损耗：导体损耗（Wheeler 增量电感法 + 粗糙度修正）与介质损耗
+    ep_r_real = np.real(ep_r_f)
+    ep_reff_real = np.real(ep_reff_f)
+    z_real = np.real(z0)
+    skin_depth = np.sqrt(rho / (pi * f * mu_0))
+    rs = rho / skin_depth
+    ki = np.exp(-1.2 * (z_real / ETA_0) ** 0.7)
+    kr = 1 + 2 / pi * np.arctan(1.4 * (rough / skin_depth) ** 2)
+    alpha_conductor = rs / (z_real * w) * ki * kr
+    alpha_dielectric = (pi * ep_r_real / (ep_r_real - 1) * (ep_reff_real - 1)
+                        / np.sqrt(ep_reff_real) * tand_f * f / c)
+
+    beta = 2 * pi * f * np.sqrt(ep_reff_real) / c
+    gamma = alpha_conductor + alpha_dielectric + 1j * beta
+
+    return LineResult(z0=z0, ep_reff_f=ep_reff_f, w_eff=w_eff, gamma=gamma)
+
+
+def ellipk_ratio(k):
+    """K(k)/K'(k) 的 Hilberg 闭式近似（可广播，与 skrf.media.cpw.ellipa 一致）"""
+    k = np.asarray(k, dtype=float)
+    low = k < np.sqrt(0.5)
+    # 两个分支分别只在各自区间内取值，避免另一分支的无效运算
+    k_low = np.where(low, k, 0.5)
+    k_high = np.where(low, 0.9, k)
+    sqrt_kp = np.sqrt(np.sqrt(1. - k_low * k_low))
+    sqrt_k = np.sqrt(k_high)
+    return np.where(
+        low,
+        pi / np.log(2. * (1. + sqrt_kp) / (1. - sqrt_kp)),
+        np.log(2. * (1. + sqrt_k) / (1. - sqrt_k)) / pi,
+    )
+
+
+def cpw(f, w, s, t, ep_r, tand, h=CPW_DEFAULT_H, has_metal_backside=False, rho=COPPER_RHO):
+    """
+    共面波导闭式计算（可广播）
+
+    Args:
+        f: 频率（Hz）
+        w: 中心导体宽度（m）
+        s: 缝隙宽度（m）
+        t: 铜厚（m），须大于0
+        ep_r: 介电常数
+        tand: 损耗角正切
+        h: 介质厚度（m）
+        has_metal_backside: 是否有金属背面（CPWG）
+        rho: 导体电阻率（Ω·m）
+
+    Returns:
+        LineResult(z0, ep_reff_f, w_eff, gamma)，w_eff 为中心导体宽度
+    """
+    f, w, s, h, t, ep_r, tand = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (f, w, s, h, t, ep_r, tand)))
+
+    # 1. 频率相关复介电常数
+    ep_r_f, tand_f = djordjevic_svensson(ep_r, tand, f)
+
+    # 2. Ghione–Naldi 准静态
+    a = w
+    b = w + 2. * s
+    k1 = a / b
+    q1 = ellipk_ratio(k1)
+    if has_metal_backside:
+        k3 = np.tanh(pi * a / 4. / h) / np.tanh(pi * b / 4. / h)
+        q3 = ellipk_ratio(k3)
+        e = 1. + q3 / (q1 + q3) * (ep_r_f - 1.)
+    else:
+        k2 = np.sinh((pi / 4.) * a / h) / np.sinh((pi / 4.) * b / h)
+        e = 1. + (ep_r_f - 1.) / 2. * ellipk_ratio(k2) / q1
+
+    # 导体厚度一阶修正
+    d = 1.25 * t / pi * (1. + np.log(4. * pi * w / t))
+    qe = ellipk_ratio(k1 + (1. - k1 * k1) * d / 2. / s)
+    zr = ETA_0 / 2. / (qe + q3) if has_metal_backside else ETA_0 / 4. / qe
+    ep_reff = e - (0.7 * (e - 1.) * t / s) / (q1 + (0.7 * t / s))
+    zl_eff = zr / np.sqrt(ep_reff)
+
+    # 3. 频率色散
+    fte = (c / 4.) / (h * np.sqrt(ep_r_f - 1.))
+    p = np.log(w / h)
+    u = 0.54 - (0.64 - 0.015 * p) * p
+    v = 0.43 - (0.86 - 0.54 * p) * p
+    g = np.exp(u * np.log(w / s) + v)
+    sqrt_ep_reff = np.sqrt(ep_reff)
+    sqrt_e = sqrt_ep_reff + (np.sqrt(ep_r_f) - sqrt_ep_reff) / (1. + g * (f / fte) ** (-1.8))
+    ep_reff_f = sqrt_e ** 2
+    z0 = zl_eff * sqrt_ep_reff / sqrt_e
+
+    # 4. 损耗：导体损耗（与 skrf 相同，ellipk 以 k1 作为参数）与介质损耗
+    ep_r_real = np.real(ep_r_f)
+    ep_reff_real = np.real(ep_reff_f)
+    skin_depth = np.sqrt(rho / (pi * f * mu_0))
+    rs = rho / skin_depth
+    n = (1. - k1) * 8. * pi / (t * (1. + k1))
+    half_w = w / 2.
+    outer = half_w + s
+    ac = (pi + np.log(n * half_w)) / half_w + (pi + np.log(n * outer)) / outer
+    alpha_conductor = (rs * np.sqrt(ep_reff_real) * ac
+                       / (4. * ETA_0 * ellipk(k1) * ellipk(np.sqrt(1. - k1 * k1)) * (1. - k1 * k1)))
+    alpha_dielectric = (pi * ep_r_real / (ep_r_real - 1) * (ep_reff_real - 1)
+                        / np.sqrt(ep_reff_real) * tand_f * f / c)
+
+    beta = 2 * pi * f * np.sqrt(ep_reff_real) / c
+    gamma = alpha_conductor + alpha_dielectric + 1j * beta
+
+    return LineResult(z0=z0, ep_reff_f=ep_reff_f, w_eff=w, gamma=gamma)
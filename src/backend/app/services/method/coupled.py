@@ -0,0 +1,310 @@
+"""
+耦合线内核 - 差分对的偶模/奇模闭式计算（纯 NumPy，可广播）
+
+一次数组求值同时得到两个模式的特征阻抗、有效介电常数与传播常数，由此导出
+差分阻抗 Zdiff = 2·Zodd、共模阻抗 Zcommon = Zeven / 2 与耦合系数 (Zeven - Zodd) / (Zeven + Zodd)。
+
+    - 边缘耦合微带线：Kirschning–Jansen 准静态偶/奇模公式（Hammerstad–Jensen 厚度修正 + Jansen 奇偶模宽度修正），
+      频率色散按各模式的等效宽度套用单线 Kirschning–Jansen 色散
+    - 边缘耦合带状线：Cohn 零厚度精确解（椭圆积分），Cohn 厚度修正（单线阻抗取 Wheeler 厚导体公式）
+    - 宽边耦合带状线：Cohn 宽导体近似（平板电容 + 边缘电容，窄导体按 Cohn 等效宽度修正）
+    - 共面耦合线（差分 CPW）：保角映射，奇模以中心电壁、偶模以中心磁壁化为单个 K(k)/K'(k) 比值；
+      与单线 CPW 内核一致按无限厚基板计算，导体厚度按一阶修正
+带状线为 TEM 模式，两模式有效介电常数均等于（色散后的）基板介电常数。
+导体损耗统一按 Wheeler 增量电感法的闭式近似（与微带线内核相同）分别计算各模式。
+"""
+from typing import NamedTuple
+
+import numpy as np
+from scipy.constants import c, mu_0, pi
+from scipy.special import ellipk
+
+from .calculator import (
+    COPPER_RHO, COPPER_ROUGHNESS, ETA_0, djordjevic_svensson,
+    _hammerstad_er, _hammerstad_zl, _kirschning_er, _kirschning_zl,
+)
+
+
+class CoupledResult(NamedTuple):
+    """耦合线内核计算结果（各量为广播后的实数组）"""
+    z_even: np.ndarray         # 偶模特征阻抗（Ω）
+    z_odd: np.ndarray          # 奇模特征阻抗（Ω）
+    ep_reff_even: np.ndarray   # 偶模有效介电常数
+    ep_reff_odd: np.ndarray    # 奇模有效介电常数
+    gamma_even: np.ndarray     # 偶模传播常数 alpha + j*beta（Np/m, rad/m）
+    gamma_odd: np.ndarray      # 奇模传播常数
+    w_eff: np.ndarray          # 厚度修正后的有效线宽（m）
+
+
+def _broadcast(*values):
+    return np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in values))
+
+
+def _k_ratio(m):
+    """K(k)/K'(k)，m = k²（scipy.special.ellipk 的参数为 m）"""
+    return ellipk(m) / ellipk(1. - m)
+
+
+def _gamma(f, z, w, ep_reff, ep_r, tand, rho, rough):
+    """单个模式的传播常数：导体损耗（Wheeler 近似 + 粗糙度修正）+ 介质损耗（填充因子）+ 相位常数"""
+    skin_depth = np.sqrt(rho / (pi * f * mu_0))
+    rs = rho / skin_depth
+    ki = np.exp(-1.2 * (z / ETA_0) ** 0.7)
+    kr = 1 + 2 / pi * np.arctan(1.4 * (rough / skin_depth) ** 2)
+    alpha_conductor = rs / (z * w) * ki * kr
+    # 均匀介质（带状线）时填充因子为1；ep_r = 1 时不计介质损耗
+    with np.errstate(divide='ignore', invalid='ignore'):
+        filling = np.where(ep_r > 1, ep_r / (ep_r - 1) * (ep_reff - 1) / ep_reff, 1.)
+    alpha_dielectric = pi * np.sqrt(ep_reff) * filling * tand * f / c
+    beta = 2 * pi * f * np.sqrt(ep_reff) / c
+    return alpha_conductor + alpha_dielectric + 1j * beta
+
+
+def _require(condition, message):
+    """几何约束（整组参数中任一行不满足即报错）"""
+    if not np.all(condition):
+        raise ValueError(f"耦合线引擎要求{message}")
+
+
+def edge_coupled_mline(f, w, s, h, t, ep_r, tand, rho=COPPER_RHO, rough=COPPER_ROUGHNESS):
+    """
+    边缘耦合微带线（Kirschning–Jansen）
+
+    Args:
+        f: 频率（Hz）
+        w: 线宽（m）
+        s: 线间距（m），须大于0
+        h: 介质厚度（m）
+        t: 铜厚（m），须大于0
+        ep_r: 介电常数
+        tand: 损耗角正切
+
+    Returns:
+        CoupledResult
+    """
+    f, w, s, h, t, ep_r, tand = _broadcast(f, w, s, h, t, ep_r, tand)
+    _require(s > 0, "线间距 spacing 大于0")
+    ep_r_f, tand_f = djordjevic_svensson(ep_r, tand, f)
+    er = np.real(ep_r_f)
+
+    # 1. 导体厚度：单线 Hammerstad–Jensen 线宽增量，再按 Jansen 拆分为偶/奇模等效线宽
+    #    （奇模另计两线相对侧壁之间的电容，等效为线宽增加 dt）
+    u, g, t_n = w / h, s / h, t / h
+    du1 = t_n / pi * np.log(1. + 4. * np.e / t_n * np.tanh(np.sqrt(6.517 * u)) ** 2)
+    dur = du1 * (1. + 1. / np.cosh(np.sqrt(er - 1.))) / 2.
+    dt = 2. * t_n / (g * er)
+    u_even = u + dur * (1. - 0.5 * np.exp(-0.69 * dur / dt))
+    u_odd = u_even + dt
+
+    # 2. 准静态偶/奇模有效介电常数
+    v = u_even * (20. + g ** 2) / (10. + g ** 2) + g * np.exp(-g)
+    ep_even = _hammerstad_er(v, er)
+    ep_single_odd = _hammerstad_er(u_odd, er)
+    a_o = 0.7287 * (ep_single_odd - (er + 1.) / 2.) * (1. - np.exp(-0.179 * u_odd))
+    b_o = 0.747 * er / (0.15 + er)
+    c_o = b_o - (b_o - 0.207) * np.exp(-0.414 * u_odd)
+    d_o = 0.593 + 0.694 * np.exp(-0.562 * u_odd)
+    ep_odd = ((er + 1.) / 2. + a_o - ep_single_odd) * np.exp(-c_o * g ** d_o) + ep_single_odd
+
+    # 3. 准静态偶/奇模特征阻抗
+    q2 = 1. + 0.7519 * g + 0.189 * g ** 2.31
+    q3 = 0.1975 + (16.6 + (8.4 / g) ** 6) ** -0.387 + np.log(g ** 10 / (1. + (g / 3.4) ** 10)) / 241.
+    q5 = 1.794 + 1.14 * np.log(1. + 0.638 / (g + 0.517 * g ** 2.43))
+    q6 = 0.2305 + np.log(g ** 10 / (1. + (g / 5.8) ** 10)) / 281.3 + np.log(1. + 0.598 * g ** 1.154) / 5.1
+    q7 = (10. + 190. * g ** 2) / (1. + 82.3 * g ** 3)
+    q8 = np.exp(-6.5 - 0.95 * np.log(g) - (g / 0.15) ** 5)
+    q9 = np.log(q7) * (q8 + 1. / 16.5)
+
+    def q4(u_mode):
+        q1 = 0.8695 * u_mode ** 0.194
+        return 2. * q1 / q2 / (np.exp(-g) * u_mode ** q3 + (2. - np.exp(-g)) * u_mode ** -q3)
+
+    z_air_even = _hammerstad_zl(u_even)
+    z_air_odd = _hammerstad_zl(u_odd)
+    ep_single_even = _hammerstad_er(u_even, er)
+    q10 = q4(u_odd) - q5 / q2 * np.exp(q6 * np.log(u_odd) / u_odd ** q9)
+    z_even = z_air_even / np.sqrt(ep_even) / (1. - z_air_even / ETA_0 * q4(u_even))
+    z_odd = z_air_odd / np.sqrt(ep_odd) / (1. - z_air_odd / ETA_0 * q10)
+
+    # 4. 频率色散：各模式按等效线宽套用单线 Kirschning–Jansen 色散
+    fn = f * h * 1e-6
+    ep_even_f = _kirschning_er(u_even, fn, er, ep_even)
+    ep_odd_f = _kirschning_er(u_odd, fn, er, ep_odd)
+    z_even_f = _kirschning_zl(u_even, fn, er, ep_even, ep_even_f, z_even)
+    z_odd_f = _kirschning_zl(u_odd, fn, er, ep_odd, ep_odd_f, z_odd)
+
+    tand_f = np.real(tand_f)
+    return CoupledResult(
+        z_even=z_even_f, z_odd=z_odd_f, ep_reff_even=ep_even_f, ep_reff_odd=ep_odd_f,
+        gamma_even=_gamma(f, z_even_f, w, ep_even_f, er, tand_f, rho, rough),
+        gamma_odd=_gamma(f, z_odd_f, w, ep_odd_f, er, tand_f, rho, rough),
+        w_eff=(u + dur) * h,
+    )
+
+
+def _wheeler_stripline(w, b, t, er):
+    """单根带状线（Wheeler 厚导体公式，导体居中），返回 (特征阻抗, 等效线宽)"""
+    x = t / b
+    m = 2. / (1. + 2. / 3. * x / (1. - x))
+    with np.errstate(divide='ignore'):
+        # t = 0 时 x·ln(x) 项的极限为0
+        fringe = np.where(x > 0, 1. - 0.5 * np.log((x / (2. - x)) ** 2 + (0.0796 * x / (w / b + 1.1 * x)) ** m), 0.)
+    dw = (b - t) * x / (pi * (1. - x)) * fringe
+    w_eff = w + dw
+    r = 4. * (b - t) / (pi * w_eff)
+    z0 = 30. / np.sqrt(er) * np.log(1. + r * (2. * r + np.sqrt((2. * r) ** 2 + 6.27)))
+    return z0, w_eff
+
+
+def _cohn_fringe(t_b):
+    """
+    Cohn 厚导体边缘电容（以 ε 归一化，不含 1/π），t_b = t / b：
+        (2 / (1 - x))·ln((2 - x) / (1 - x)) - (x / (1 - x))·ln(x(2 - x) / (1 - x)²)
+    """
+    return (2. * np.log((2. - t_b) / (1. - t_b)) - t_b * np.log(t_b * (2. - t_b) / (1. - t_b) ** 2)) / (1. - t_b)
+
+
+def edge_coupled_stripline(f, w, s, b, t, ep_r, tand, rho=COPPER_RHO, rough=COPPER_ROUGHNESS):
+    """
+    边缘耦合带状线（Cohn，导体居中于两参考平面之间）
+
+    Args:
+        f: 频率（Hz）
+        w: 线宽（m）
+        s: 线间距（m），须大于0
+        b: 两参考平面间距（m，含铜厚）
+        t: 铜厚（m），须小于 b
+        ep_r: 介电常数
+        tand: 损耗角正切
+
+    Returns:
+        CoupledResult
+    """
+    f, w, s, b, t, ep_r, tand = _broadcast(f, w, s, b, t, ep_r, tand)
+    _require(s > 0, "线间距 spacing 大于0")
+    _require(b > t, "两参考平面间距大于铜厚 thickness")
+    ep_r_f, tand_f = djordjevic_svensson(ep_r, tand, f)
+    er = np.real(ep_r_f)
+
+    # 1. 零厚度精确解
+    edge = np.tanh(pi * w / (2. * b))
+    far = np.tanh(pi * (w + s) / (2. * b))
+    k_even, k_odd = edge * far, edge / far
+    z_even_0 = 30. * pi / np.sqrt(er) / _k_ratio(k_even ** 2)
+    z_odd_0 = 30. * pi / np.sqrt(er) / _k_ratio(k_odd ** 2)
+
+    # 2. Cohn 厚度修正：单线零厚度/有厚度阻抗之差按边缘电容之比计入（t = 0 时退化为零厚度解）
+    z_thin, _ = _wheeler_stripline(w, b, np.zeros_like(t), er)
+    z_thick, w_eff = _wheeler_stripline(w, b, t, er)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(t > 0, _cohn_fringe(t / b) / (2. * np.log(2.)), 1.)
+    z_even = 1. / (1. / z_thick - ratio * (1. / z_thin - 1. / z_even_0))
+    z_odd = 1. / (1. / z_thick + ratio * (1. / z_odd_0 - 1. / z_thin))
+
+    tand_f = np.real(tand_f)
+    return CoupledResult(
+        z_even=z_even, z_odd=z_odd, ep_reff_even=er, ep_reff_odd=er,
+        gamma_even=_gamma(f, z_even, w, er, er, tand_f, rho, rough),
+        gamma_odd=_gamma(f, z_odd, w, er, er, tand_f, rho, rough),
+        w_eff=w_eff,
+    )
+
+
+def broadside_coupled_stripline(f, w, s, b, t, ep_r, tand, rho=COPPER_RHO, rough=COPPER_ROUGHNESS):
+    """
+    宽边耦合带状线（Cohn 宽导体近似，两导体上下对齐并关于两参考平面的中面对称）
+
+    每根导体的电容 = 平板电容 + 两个边缘电容。导体到参考平面的距离 d1 = (b - s - 2t) / 2，
+    到中面的距离 d2 = s / 2；奇模中面为电壁、偶模中面为磁壁，边缘电容（以 ε 归一化，p = d1 / (d1 + d2)）：
+        奇模 Cfo = [ln(1/p) / (1 - p) + ln(1/(1 - p)) / p] / π
+        偶模 Cfe = [2·ln2 - ln(p) - (1 - p)/p · ln(1 - p)] / π
+    线宽不足 0.35·(b - s) 时按 Cohn 的窄导体等效宽度 (0.07·(b - s) + w) / 1.2 计算。
+
+    Args:
+        f: 频率（Hz）
+        w: 线宽（m）
+        s: 两导体间的介质厚度（m），须大于0
+        b: 两参考平面间距（m，含铜厚），须大于 s + 2t
+        t: 铜厚（m）
+        ep_r: 介电常数
+        tand: 损耗角正切
+
+    Returns:
+        CoupledResult
+    """
+    f, w, s, b, t, ep_r, tand = _broadcast(f, w, s, b, t, ep_r, tand)
+    _require(s > 0, "线间距 spacing 大于0")
+    d1 = (b - s - 2. * t) / 2.
+    _require(d1 > 0, "介质厚度 height 大于线间距 spacing")
+    d2 = s / 2.
+    ep_r_f, tand_f = djordjevic_svensson(ep_r, tand, f)
+    er = np.real(ep_r_f)
+
+    outer = 2. * d1
+    w_eff = np.where(w < 0.35 * outer, (0.07 * outer + w) / 1.2, w)
+    p = d1 / (d1 + d2)
+    fringe_odd = (np.log(1. / p) / (1. - p) + np.log(1. / (1. - p)) / p) / pi
+    fringe_even = (2. * np.log(2.) - np.log(p) - (1. - p) / p * np.log(1. - p)) / pi
+    z_even = ETA_0 / 2. / np.sqrt(er) / (w_eff / outer + fringe_even)
+    z_odd = ETA_0 / 2. / np.sqrt(er) / (w_eff / outer + w_eff / s + fringe_odd)
+
+    tand_f = np.real(tand_f)
+    return CoupledResult(
+        z_even=z_even, z_odd=z_odd, ep_reff_even=er, ep_reff_odd=er,
+        gamma_even=_gamma(f, z_even, w, er, er, tand_f, rho, rough),
+        gamma_odd=_gamma(f, z_odd, w, er, er, tand_f, rho, rough),
+        w_eff=w_eff,
+    )
+
+
+def coupled_cpw(f, w, s, g, t, ep_r, tand, rho=COPPER_RHO, rough=COPPER_ROUGHNESS):
+    """
+    共面耦合线（差分 CPW：地 | 缝隙 g | 线 w | 间距 s | 线 w | 缝隙 g | 地），无限厚基板
+
+    以两线中心为原点，内缘 a = s/2、外缘 b = s/2 + w、地边缘 c = b + g；ζ = z² 把半个截面映射为上半平面：
+        奇模（中心为电壁）k² = (b² - a²)·c² / ((c² - a²)·b²)
+        偶模（中心为磁壁）k² = (b² - a²) / (c² - a²)
+    每个半空间中单根导体的电容为 ε·K(k)/K'(k)。
+
+    Args:
+        f: 频率（Hz）
+        w: 线宽（m）
+        s: 两线间距（m），须大于0
+        g: 线与地之间的缝隙（m）
+        t: 铜厚（m），须大于0
+        ep_r: 介电常数
+        tand: 损耗角正切
+
+    Returns:
+        CoupledResult
+    """
+    f, w, s, g, t, ep_r, tand = _broadcast(f, w, s, g, t, ep_r, tand)
+    _require(s > 0, "线间距 spacing 大于0")
+    ep_r_f, tand_f = djordjevic_svensson(ep_r, tand, f)
+    er = np.real(ep_r_f)
+
+    # 导体厚度一阶修正（与单线 CPW 内核相同的等效线宽增量），每侧加宽不超过相邻缝隙的 1/4
+    d = 1.25 * t / pi * (1. + np.log(4. * pi * w / t))
+    a = s / 2. - np.minimum(d / 2., s / 8.)
+    b_edge = s / 2. + w + np.minimum(d / 2., g / 4.)
+    c_edge = s / 2. + w + g
+    k2_even = (b_edge ** 2 - a ** 2) / (c_edge ** 2 - a ** 2)
+    k2_odd = k2_even * c_edge ** 2 / b_edge ** 2
+
+    def mode(k2):
+        q = _k_ratio(k2)
+        ep_reff = (er + 1.) / 2.
+        # 铜厚使缝隙中的空气电容增加，有效介电常数略降（同单线 CPW 内核）
+        ep_reff = ep_reff - (0.7 * (ep_reff - 1.) * t / g) / (q + 0.7 * t / g)
+        return ETA_0 / (2. * q * np.sqrt(ep_reff)), ep_reff
+
+    z_even, ep_even = mode(k2_even)
+    z_odd, ep_odd = mode(k2_odd)
+
+    tand_f = np.real(tand_f)
+    return CoupledResult(
+        z_even=z_even, z_odd=z_odd, ep_reff_even=ep_even, ep_reff_odd=ep_odd,
+        gamma_even=_gamma(f, z_even, w, ep_even, er, tand_f, rho, rough),
+        gamma_odd=_gamma(f, z_odd, w, ep_odd, er, tand_f, rho, rough),
+        w_eff=w,
+    )
@@ -0,0 +1,81 @@
+"""
+频率相关介质模型 - 宽带 Debye（Djordjevic–Sarkar）模型与频率表插值
+
+各计算内核（skrf / numpy / coupled / field）的介电参数输入均为 1 GHz 处的 er 与 tand，
+内部经 Djordjevic–Svensson 宽带 Debye 模型（f_low=1kHz, f_high=1THz）外推到计算频率。
+材料在其他频率标定（如数据手册的 10 GHz 值）或以频率表给出时，由 equivalent_anchor 把材料在各频点的
+er(f) / tand(f) 换算为内核的等效 1 GHz 输入：该模型对 (er, er·tand) 是线性的，逐频点解一个 2×2 方程（闭式），
+经内核外推后恰好还原为材料在该频点的值，扫频时按频点向量化。
+介电参数与频率无关的内核（skrf Coaxial）不做外推，直接使用材料在各频点的值（见 BasicModel.DIELECTRIC_DISPERSION）。
+"""
+import numpy as np
+
+from .calculator import DIEL_F_EPR_TAND, DIEL_F_HIGH, DIEL_F_LOW, djordjevic_svensson
+
+
+def wideband_debye(f, er, tand, f_ref, f_low=DIEL_F_LOW, f_high=DIEL_F_HIGH):
+    """
+    宽带 Debye（Djordjevic–Sarkar）模型：由 f_ref 处的 er / tand 得到任意频率的 er / tand
+
+    Args:
+        f: 频率（Hz，可为数组）
+        er, tand: f_ref 处的介电常数与损耗角正切
+        f_ref: 标定频率（Hz）
+        f_low, f_high: 模型的低端 / 高端极点频率（Hz）
+
+    Returns:
+        (er_f, tand_f)，与 f 同形状的实数组
+    """
+    ep_r_f, tand_f = djordjevic_svensson(er, tand, f, f_low=f_low, f_high=f_high, f_epr_tand=f_ref)
+    return np.real(ep_r_f), tand_f
+
+
+def equivalent_anchor(er_f, tand_f, f):
+    """
+    计算内核的等效输入：求 1 GHz 处的 (er, tand)，使内核的 Djordjevic–Svensson 外推在频率 f 处恰为 (er_f, tand_f)
+
+    外推结果 ε(f) = er + er·tand·(Re k − L(f)) / Im k，其中 k = L(1GHz)，L(f) = ln((f_high + jf) / (f_low + jf))。
+
+    Args:
+        er_f, tand_f: 材料在频率 f 处的介电常数与损耗角正切
+        f: 频率（Hz）
+
+    Returns:
+        (er, tand)，与输入同形状
+    """
+    k = np.log((DIEL_F_HIGH + 1j * DIEL_F_EPR_TAND) / (DIEL_F_LOW + 1j * DIEL_F_EPR_TAND))
+    fd = np.log((DIEL_F_HIGH + 1j * np.asarray(f, dtype=float)) / (DIEL_F_LOW + 1j * np.asarray(f, dtype=float)))
+    # 虚部方程给出 er·tand，实部方程给出 er
+    loss = er_f * tand_f * np.imag(k) / np.imag(fd)
+    er = er_f - loss * (np.real(k) - np.real(fd)) / np.imag(k)
+    return er, loss / er
+
+
+class DielectricTable:
+    """
+    频率表插值：er 与 tand 分别按 log f 做单调三次（PCHIP）插值，插值对象在构造时一次建好
+
+    PCHIP 不会在表点之间产生过冲（tand 不会插值出负值）；超出表的频率范围时取端点值。
+    """
+
+    def __init__(self, frequency, er, tand):
+        # scipy.interpolate 只在解析频率表材料时导入，不计入应用启动
+        from scipy.interpolate import PchipInterpolator
+
+        frequency = np.asarray(frequency, dtype=float)
+        er = np.asarray(er, dtype=float)
+        tand = np.asarray(tand, dtype=float)
+        if not (frequency.ndim == 1 and frequency.size >= 2 and er.shape == frequency.shape == tand.shape):
+            raise ValueError("频率表的 frequency / er / loss_tangent 必须是等长的数组（至少 2 个点）")
+        if not (np.all(frequency > 0) and np.all(np.diff(frequency) > 0)):
+            raise ValueError("频率表的 frequency 必须大于0且严格递增")
+        if not (np.all(er >= 1) and np.all(tand >= 0)):
+            raise ValueError("频率表的 er 必须≥1、loss_tangent 必须≥0")
+        self.log_f = np.log(frequency)
+        self._er = PchipInterpolator(self.log_f, er)
+        self._tand = PchipInterpolator(self.log_f, tand)
+
+    def __call__(self, f):
+        """频率（Hz，可为数组） -> (er_f, tand_f)"""
+        x = np.clip(np.log(np.asarray(f, dtype=float)), self.log_f[0], self.log_f[-1])
+        return self._er(x), self._tand(x)
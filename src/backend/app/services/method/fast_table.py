@@ -0,0 +1,382 @@
+"""
+fast 引擎 - 预计算插值表
+
+每个模型在归一化几何坐标（如 w/h、t/h、er、f·h）上离线预计算一张稠密结果表，
+查询时做（对数或线性）等距坐标下的张量积三次 Lagrange 插值，并给出所在网格单元的误差上界估计
+（构建时在每个单元中心与精确模型比较得到）。查询点超出表范围、固定参数不匹配
+或误差估计超过容差时由调用方回退到精确模型。
+
+表文件（每个模型三个）：
+    <type>.json          坐标轴、输出字段与构建信息
+    <type>.values.npy    结果表，形状 (*各轴点数, 输出数)，float32；恒正的输出存对数值
+    <type>.error.npy     单元误差估计，形状 (*各轴点数-1)，float32
+启动时以 mmap 方式加载，gunicorn --preload 下各 worker 共享同一份物理页。
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 插值表目录与容差（相对误差估计超过该值时回退精确模型）
+FAST_TABLE_DIR = os.environ.get(
+    'ZCAL_FAST_TABLE_DIR',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'data', 'fast_tables')),
+)
+FAST_TOLERANCE = float(os.environ.get('ZCAL_FAST_TOLERANCE', 1e-3))
+# 单次插值的分块大小（每个查询点需读取 4^维数 个表项）
+LOOKUP_CHUNK = 512
+# 构建时随机校验点数
+VALIDATION_POINTS = 2000
+# 单元误差估计的安全系数（单元中心误差取邻域最大值后再放大）
+ERROR_SAFETY = 1.5
+
+_tables: Dict[str, "FastTable"] = {}
+_status: Dict[str, str] = {}
+_tables_lock = threading.Lock()
+
+
+class FastTable:
+    """单个模型的插值表：等距网格（坐标轴缺省取对数）+ 局部三次 Lagrange 插值"""
+
+    def __init__(self, calc_type: str, axes: List[Dict], outputs: List[str], units: List[str],
+                 length_scale: Optional[str], fixed: Dict[str, float], log_outputs: Optional[List[bool]] = None,
+                 values: Optional[np.ndarray] = None, errors: Optional[np.ndarray] = None):
+        self.calc_type = calc_type
+        self.axes = axes
+        self.outputs = outputs
+        self.units = units
+        self.length_scale = length_scale
+        self.fixed = fixed
+        self.log_outputs = np.array(log_outputs or [False] * len(outputs))
+        self.values = values
+        self.errors = errors
+        self._log_axes = np.array([axis.get('scale', 'log') == 'log' for axis in axes])
+        self._coord_min = _to_coordinates(np.array([axis['min'] for axis in axes]), self._log_axes)
+        self._coord_step = (
+            _to_coordinates(np.array([axis['max'] for axis in axes]), self._log_axes) - self._coord_min
+        ) / (np.array([axis['points'] for axis in axes]) - 1)
+        self._points = np.array([axis['points'] for axis in axes])
+        # 插值模板（每轴4个节点）在展平表中的偏移量，按 C 顺序排列
+        strides = np.append(np.cumprod(self._points[:0:-1])[::-1], 1).astype(np.intp)
+        self._strides = strides
+        offsets = np.zeros(1, dtype=np.intp)
+        for stride in strides:
+            offsets = (offsets[:, None] + np.arange(4) * stride).ravel()
+        self._offsets = offsets
+
+    @classmethod
+    def load(cls, directory: str, calc_type: str) -> "FastTable":
+        """以 mmap 方式加载表文件"""
+        with open(os.path.join(directory, f"{calc_type}.json"), encoding='utf-8') as f:
+            meta = json.load(f)
+        # np.asarray 去掉 memmap 包装（仍指向映射内存），避免每次索引的子类开销
+        values = np.asarray(np.load(os.path.join(directory, f"{calc_type}.values.npy"), mmap_mode='r'))
+        errors = np.asarray(np.load(os.path.join(directory, f"{calc_type}.error.npy"), mmap_mode='r'))
+        return cls(calc_type, meta['axes'], meta['outputs'], meta['units'], meta['length_scale'], meta['fixed'],
+                   meta['log_outputs'], values, errors)
+
+    def coordinates(self, params: Dict[str, np.ndarray]) -> np.ndarray:
+        """参数 -> 归一化坐标（对数轴取对数），形状 (N, 维数)"""
+        columns = []
+        for axis in self.axes:
+            value = np.asarray(params[axis['key']], dtype=float)
+            if axis.get('per'):
+                value = value / np.asarray(params[axis['per']], dtype=float)
+            elif axis.get('times'):
+                value = value * np.asarray(params[axis['times']], dtype=float)
+            columns.append(value)
+        columns = np.broadcast_arrays(*columns)
+        return _to_coordinates(np.column_stack([np.ravel(column) for column in columns]), self._log_axes)
+
+    def lookup(self, params: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        插值查询（可广播的参数数组）
+
+        Returns:
+            (结果名 -> 长度N数组, 长度N的误差估计)；表外或固定参数不匹配的点误差为 inf
+        """
+        coords = self.coordinates(params)
+        size = len(coords)
+
+        # 1. 表范围与固定参数检查
+        position = (coords - self._coord_min) / self._coord_step
+        inside = np.all((position >= 0) & (position <= self._points - 1), axis=1)
+        for key, value in self.fixed.items():
+            inside &= np.broadcast_to(np.asarray(params[key], dtype=float) == value, (size,)).ravel()
+
+        bound = np.full(size, np.inf)
+        outputs = {key: np.full(size, np.nan) for key in self.outputs}
+        index = np.nonzero(inside)[0]
+        if index.size == 0:
+            return outputs, bound
+
+        # 2. 单元误差估计
+        position = position[index]
+        cell = np.minimum(position.astype(int), self._points - 2)
+        bound[index] = self.errors[tuple(cell.T)]
+
+        # 3. 分块插值
+        values = np.empty((index.size, len(self.outputs)))
+        for start in range(0, index.size, LOOKUP_CHUNK):
+            chunk = slice(start, start + LOOKUP_CHUNK)
+            values[chunk] = self._interpolate(position[chunk])
+
+        # 4. 长度类结果按参考长度还原
+        scale = self.output_scale(params, size)[index] if self.length_scale else None
+        for j, key in enumerate(self.outputs):
+            column = values[:, j]
+            if scale is not None:
+                column = column * scale[:, j]
+            outputs[key][index] = column
+        return outputs, bound
+
+    def _interpolate(self, position: np.ndarray) -> np.ndarray:
+        """张量积三次 Lagrange 插值，position 为以网格步长为单位的坐标，形状 (n, 维数)"""
+        n, dims = position.shape
+        start = np.clip(np.floor(position).astype(np.intp) - 1, 0, self._points - 4)
+        t = position - start
+
+        # 各轴 4 点 Lagrange 权重 (n, 维数, 4)，再按 C 顺序做外积得到 (n, 4^维数)
+        t0, t1, t2, t3 = t, t - 1, t - 2, t - 3
+        w = np.stack([-t1 * t2 * t3 / 6., t0 * t2 * t3 / 2., -t0 * t1 * t3 / 2., t0 * t1 * t2 / 6.], axis=-1)
+        weights = w[:, 0]
+        for k in range(1, dims):
+            weights = (weights[:, :, None] * w[:, k, None, :]).reshape(n, -1)
+
+        flat = start @ self._strides
+        block = self.values.reshape(-1, len(self.outputs))[flat[:, None] + self._offsets]
+        result = np.einsum('nko,nk->no', block, weights)
+        result[:, self.log_outputs] = np.exp(result[:, self.log_outputs])
+        return result
+
+    def output_scale(self, params: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        """各输出字段的长度还原系数：mm 结果乘参考长度，dB/mm 结果除以参考长度"""
+        reference = np.broadcast_to(np.asarray(params[self.length_scale], dtype=float), (size,)).ravel()
+        scale = np.ones((size, len(self.outputs)))
+        for j, unit in enumerate(self.units):
+            power = _length_power(unit)
+            if power:
+                scale[:, j] = reference ** power
+        return scale
+
+
+def _to_coordinates(values: np.ndarray, log_axes: np.ndarray) -> np.ndarray:
+    """参数值 -> 网格坐标（对数轴取对数，线性轴不变）"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(log_axes, np.log(values), values)
+
+
+def _length_power(unit: str) -> int:
+    """单位中长度的幂次（用于尺度还原）"""
+    if unit == 'mm':
+        return 1
+    if unit.endswith('/mm'):
+        return -1
+    return 0
+
+
+def load_tables(calc_types, directory: str = FAST_TABLE_DIR) -> Dict[str, str]:
+    """
+    加载各模型的插值表（缺失的表跳过，对应模型的 fast 请求回退精确计算）
+
+    只按模型类型查找表文件，不导入模型模块，可在启动时调用而不触发模型的按需导入。
+
+    Returns:
+        模型类型 -> 加载状态（loaded / missing / error: ...）
+    """
+    status = {}
+    loaded = {}
+    for calc_type in calc_types:
+        if not os.path.exists(os.path.join(directory, f"{calc_type}.json")):
+            status[calc_type] = 'missing'
+            continue
+        try:
+            loaded[calc_type] = FastTable.load(directory, calc_type)
+            status[calc_type] = 'loaded'
+        except (OSError, ValueError, KeyError) as e:
+            status[calc_type] = f'error: {e}'
+    with _tables_lock:
+        _tables.clear()
+        _tables.update(loaded)
+        _status.clear()
+        _status.update(status)
+    return status
+
+
+def get_table(calc_type: str) -> Optional[FastTable]:
+    """获取已加载的插值表，未加载时返回 None"""
+    return _tables.get(calc_type)
+
+
+def table_status() -> Dict:
+    """插值表加载状态（目录、容差、各模型状态与网格形状）"""
+    with _tables_lock:
+        return {
+            'directory': FAST_TABLE_DIR,
+            'tolerance': FAST_TOLERANCE,
+            'tables': {
+                calc_type: {
+                    'status': status,
+                    'shape': list(_tables[calc_type].values.shape[:-1]) if calc_type in _tables else None,
+                }
+                for calc_type, status in _status.items()
+            },
+        }
+
+
+def build_table(model_class, directory: str = FAST_TABLE_DIR, engine: Optional[str] = None) -> Dict:
+    """
+    离线构建单个模型的插值表并写入 directory
+
+    在网格节点上用精确模型（engine，缺省取模型的精确引擎）向量化求值，
+    再在每个网格单元中心比较插值与精确结果，得到单元误差估计；
+    最后用随机点校验整张表（校验点同时扰动表中未列出的参数）。
+
+    Returns:
+        构建信息（网格点数、单元误差估计与随机校验的最大相对误差、耗时）
+    """
+    # 仅离线构建用到，不在服务启动时导入
+    from scipy.ndimage import maximum_filter
+
+    started = time.perf_counter()
+    calc_type = model_class.TYPE
+    engine = engine or model_class.exact_engine()
+    axes = [dict(axis) for axis in model_class.FAST_TABLE_AXES]
+    outputs = [result_def['key'] for result_def in model_class.RESULT_DEFINITIONS]
+    units = [result_def.get('unit', '') for result_def in model_class.RESULT_DEFINITIONS]
+    length_scale = model_class.FAST_LENGTH_SCALE
+    fixed = dict(model_class.FAST_FIXED_PARAMS)
+    defaults = dict(model_class.validator().defaults)
+
+    table = FastTable(calc_type, axes, outputs, units, length_scale, fixed)
+
+    def evaluate(coords):
+        """网格坐标点 -> 精确结果（长度类结果按参考长度归一化），形状 (N, 输出数)"""
+        params = _params_from_coordinates(axes, coords, defaults, length_scale, fixed)
+        # 表边界处（如 er=1）部分中间量会出现 0/0，只影响 tand>0 的损耗项，结果中不会使用
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = model_class.evaluate_columns(params, engine)
+        values = np.column_stack([result[key] for key in outputs])
+        if length_scale:
+            values = values / table.output_scale(params, len(coords))
+        return values
+
+    # 1. 网格节点
+    grids = [
+        np.linspace(table._coord_min[k], table._coord_min[k] + table._coord_step[k] * (axis['points'] - 1),
+                    axis['points'])
+        for k, axis in enumerate(axes)
+    ]
+    nodes = np.stack(np.meshgrid(*grids, indexing='ij'), axis=-1).reshape(-1, len(axes))
+    shape = tuple(axis['points'] for axis in axes)
+    values = evaluate(nodes).reshape(shape + (len(outputs),))
+    # 恒正的输出（阻抗、有效介电常数等）在对数域插值，幂律/指数型变化更接近多项式
+    with np.errstate(invalid='ignore'):
+        log_outputs = [bool(np.all(column[np.isfinite(column)] > 0)) for column in np.moveaxis(values, -1, 0)]
+        values[..., log_outputs] = np.log(values[..., log_outputs])
+    values = values.astype(np.float32)
+    table.log_outputs = np.array(log_outputs)
+    table.values = values
+
+    # 2. 单元中心误差估计
+    centers = [(grid[:-1] + grid[1:]) / 2 for grid in grids]
+    center_coords = np.stack(np.meshgrid(*centers, indexing='ij'), axis=-1).reshape(-1, len(axes))
+    exact = evaluate(center_coords)
+    position = (center_coords - table._coord_min) / table._coord_step
+    approx = np.concatenate([
+        table._interpolate(position[start:start + LOOKUP_CHUNK])
+        for start in range(0, len(position), LOOKUP_CHUNK)
+    ])
+    errors = _relative_error(approx, exact).reshape(tuple(n - 1 for n in shape))
+    # 单元中心误差可能低估单元内的最大误差，取相邻（有效）单元的最大值作为该单元的估计；
+    # 插值模板或单元中心含无效结果（NaN）的单元标记为不可用
+    finite = np.isfinite(errors)
+    errors = maximum_filter(np.where(finite, errors, 0.), size=3, mode='nearest') * ERROR_SAFETY
+    errors = np.where(finite, errors, np.inf).astype(np.float32)
+
+    # 3. 写入文件
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, f"{calc_type}.values.npy"), values)
+    np.save(os.path.join(directory, f"{calc_type}.error.npy"), errors)
+
+    # 4. 随机校验（含未列出参数的扰动），衡量单元误差估计是否可信
+    table.errors = errors
+    rng = np.random.default_rng(0)
+    sample = rng.uniform(
+        table._coord_min, table._coord_min + table._coord_step * (table._points - 1),
+        size=(VALIDATION_POINTS, len(axes)),
+    )
+    params = _params_from_coordinates(axes, sample, defaults, length_scale, fixed)
+    if length_scale:
+        params[length_scale] = params[length_scale] * rng.uniform(0.1, 3.0, VALIDATION_POINTS)
+        params = _params_from_coordinates(axes, sample, params, length_scale, fixed)
+    for key in params:
+        if key in defaults and not _is_table_param(axes, length_scale, fixed, key):
+            params[key] = params[key] * rng.uniform(0.5, 2.0, VALIDATION_POINTS)
+    approx, bound = table.lookup(params)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exact = model_class.evaluate_columns(params, engine)
+    validation = _relative_error(
+        np.column_stack([approx[key] for key in outputs]),
+        np.column_stack([exact[key] for key in outputs]),
+    )
+    usable = np.isfinite(validation) & np.isfinite(bound)
+
+    info = {
+        'type': calc_type,
+        'engine': engine,
+        'shape': list(shape),
+        'outputs': outputs,
+        'bytes': int(values.nbytes + errors.nbytes),
+        'cell_error_max': float(np.max(errors[np.isfinite(errors)])) if np.isfinite(errors).any() else None,
+        'cell_error_median': float(np.median(errors[np.isfinite(errors)])) if np.isfinite(errors).any() else None,
+        'validation_error_max': float(np.max(validation[usable])) if usable.any() else None,
+        'validation_within_bound': float(np.mean(validation[usable] <= bound[usable] + 1e-7))
+        if usable.any() else None,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    meta = {
+        'axes': axes,
+        'outputs': outputs,
+        'units': units,
+        'log_outputs': log_outputs,
+        'length_scale': length_scale,
+        'fixed': fixed,
+        'build': info,
+    }
+    with open(os.path.join(directory, f"{calc_type}.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return info
+
+
+def _params_from_coordinates(axes, coords, base, length_scale, fixed) -> Dict[str, np.ndarray]:
+    """网格坐标 -> 模型参数列（参考长度取 base 中的值，其余参数取 base 值）"""
+    size = len(coords)
+    params = {key: np.broadcast_to(np.asarray(value, dtype=float), (size,)).copy() for key, value in base.items()}
+    for key, value in fixed.items():
+        params[key] = np.full(size, value)
+    values = np.where([axis.get('scale', 'log') == 'log' for axis in axes], np.exp(coords), coords)
+    for k, axis in enumerate(axes):
+        if axis.get('per'):
+            params[axis['key']] = values[:, k] * params[axis['per']]
+        elif axis.get('times'):
+            params[axis['key']] = values[:, k] / params[axis['times']]
+        else:
+            params[axis['key']] = values[:, k]
+    return params
+
+
+def _is_table_param(axes, length_scale, fixed, key) -> bool:
+    """参数是否由插值表坐标、参考长度或固定值决定"""
+    return key == length_scale or key in fixed or any(axis['key'] == key for axis in axes)
+
+
+def _relative_error(approx: np.ndarray, exact: np.ndarray) -> np.ndarray:
+    """逐点最大相对误差（精确值为0时以绝对误差计）"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error = np.abs(approx - exact) / np.maximum(np.abs(exact), 1e-12)
+        error = np.where(exact == 0, np.abs(approx), error)
+    return np.max(error, axis=1)
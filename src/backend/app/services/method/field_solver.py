@@ -0,0 +1,482 @@
+"""
+二维准静态场求解内核 - 有限差分（有限体积）法求解传输线截面的 Laplace 方程
+
+闭式公式在厚铜非对称带状线、多层介质等结构上误差较大，这里直接数值求解截面电位：
+    - 网格：按导体边缘、介质分界面放置网格线，导体边缘处最密（最小步长为最小特征尺寸的 1/EDGE_CELLS），
+      向外按 MESH_GROWTH 等比放大（场在导体棱角处奇异，误差主要来自该处）；差分对截面要求解偶模、奇模两次，
+      使用较粗的 COUPLED_MESH
+    - 离散：节点电位、单元介电常数的五点有限体积格式，系数矩阵按介质材料拆分为
+      A(ε) = A_air + Σ ε_k·A_k，改变介电常数只需重新加权，无需重建网格与稀疏结构
+    - 电容：能量法 C·V² = ε0·φᵀAφ（变分形式，离散解给出电容上界）；分别求有/无介质的电容，
+      Z0 = 1 / (c·√(C·C_air))，εeff = C / C_air；两套疏密不同的网格结果外推，
+      与零厚度带状线精确解（Cohn）相比阻抗误差 < 0.3%
+    - 对称结构只求半个截面（对称面为磁壁/电壁），差分对的偶模/奇模即两种对称面边界
+
+稀疏分解复用：每个截面缓存网格、各材料矩阵、空气电容与一个参考介电常数下的 LU 分解（LRU），
+差分对的偶模、奇模截面只有对称面边界不同，共用网格与整体矩阵。
+均匀介质（带状线）的电容与 ε 成正比，只需一次分解；非均匀介质改变 ε 时以缓存的 LU 为预条件做共轭梯度，
+数次迭代即收敛；扫频时 Djordjevic–Svensson 色散使每个频点的 ε 略有不同，在 ε 区间的 Chebyshev 节点上
+求解后插值，整个扫频只需一次分解与少量迭代求解。
+
+求解为准静态（不含几何色散），介质色散与损耗的处理与闭式内核一致（损耗沿用 Wheeler 近似）。
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.constants import c, epsilon_0
+from scipy.sparse.linalg import LinearOperator, cg, splu
+
+from .calculator import COPPER_RHO, COPPER_ROUGHNESS, djordjevic_svensson
+from .coupled import CoupledResult, _gamma, _require
+
+# 缓存的截面数（每个非均匀介质截面保留两套网格的 LU 分解，约 10MB）
+FIELD_CACHE_SIZE = int(os.environ.get('ZCAL_FIELD_CACHE_SIZE', 16))
+# 网格：导体边缘处步长为最小特征尺寸的 1/EDGE_CELLS，向外按 MESH_GROWTH 等比放大，
+# 在截面分辨尺度（导体到参考平面的最小距离）内步长不超过其 1/RESOLUTION_CELLS，FAR_FIELD 倍以外为远场；
+# 另以 COARSE_GROWTH 生成粗网格，两者外推消去主要离散误差（单线截面，差分对见 COUPLED_MESH）
+EDGE_CELLS = 100
+MESH_GROWTH = 1.25
+COARSE_GROWTH = 1.5
+RESOLUTION_CELLS = 8
+FAR_FIELD = 2.0
+# 开放边界（微带线上方空气、两侧）与带状线两侧的截断距离（特征尺寸的倍数）
+OPEN_BOUNDARY = 30.0
+SHIELDED_BOUNDARY = 6.0
+# 预条件共轭梯度的相对容差与最大迭代次数（不收敛时重新分解）；能量法电容的误差为电位误差的平方
+PCG_RTOL = 1e-5
+PCG_MAXITER = 40
+# 扫频时一个截面上不同介电常数超过该数目则改为 Chebyshev 节点求解 + 插值
+ER_INTERP_POINTS = 5
+
+_section_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class Rect(NamedTuple):
+    """截面上的矩形区域（m）"""
+    x0: float
+    x1: float
+    y0: float
+    y1: float
+
+
+class MeshSpec(NamedTuple):
+    """
+    网格参数：导体边缘处步长为最小特征尺寸的 1/edge_cells，近场最大步长为分辨尺度的 1/resolution_cells；
+    细 / 粗两套网格的等比放大倍数为 growth / coarse_growth，两者外推消去主要离散误差
+    """
+    edge_cells: int
+    resolution_cells: int
+    growth: float
+    coarse_growth: float
+
+
+# 单线截面的网格
+LINE_MESH = MeshSpec(EDGE_CELLS, RESOLUTION_CELLS, MESH_GROWTH, COARSE_GROWTH)
+# 差分对截面的网格：每个截面求偶模、奇模两次，取较粗的网格（与极细网格参考解相比阻抗误差约 0.2%）
+COUPLED_MESH = MeshSpec(60, 4, 1.3, 1.6)
+
+
+class CrossSection(NamedTuple):
+    """
+    求解区域 [0, width] × [0, height] 上的截面描述
+
+    conductors 为信号导体（电位 1），接地导体由 dirichlet 指定的边界表示；dielectrics 为 (区域, 材料序号)，
+    其余区域为空气。dirichlet 依次为 左、右、下、上 边界是否为电壁（接地 / 奇对称面），否则为磁壁
+    （开放边界截断 / 偶对称面）。scale 为求得电容的倍数（对称面剖开导体时为 2）；
+    resolution 为网格分辨尺度（导体到参考平面、对称面的最小距离），决定近场区域的最大网格步长；
+    mesh 为网格参数。
+    """
+    width: float
+    height: float
+    conductors: Tuple[Rect, ...]
+    dielectrics: Tuple[Tuple[Rect, int], ...]
+    dirichlet: Tuple[bool, bool, bool, bool]
+    scale: float
+    resolution: float
+    mesh: MeshSpec
+
+
+class FieldResult(NamedTuple):
+    """单根传输线的场求解结果（各量为广播后的实数组）"""
+    z0: np.ndarray         # 特征阻抗（Ω）
+    ep_reff: np.ndarray    # 有效介电常数
+    gamma: np.ndarray      # 传播常数 alpha + j*beta（Np/m, rad/m）
+
+
+def _axis(lo, hi, keys, fine, h_min, h_max, far, growth):
+    """
+    一维渐变网格：keys 中的坐标均为网格线；步长在 fine 中的坐标（导体边缘）处为 h_min，按 growth 等比放大，
+    不超过 h_max，距导体边缘 far 以外再继续等比放大（远场区域）
+    """
+    def size(x):
+        d = min(abs(point - x) for point in fine)
+        return min(h_min + (growth - 1.) * d, h_max + (growth - 1.) * max(d - far, 0.))
+
+    keys = np.unique(np.clip(np.asarray(keys, dtype=float), lo, hi))
+    nodes = [lo]
+    for a, b in zip(keys[:-1], keys[1:]):
+        if b - a <= 1e-3 * h_min:
+            continue
+        steps, x = [], a
+        while x < b:
+            h = min(size(x), size(min(x + size(x), b)))
+            steps.append(h)
+            x += h
+        # 最后一步越过 b：去掉多余的一步后按比例缩放整个区间，使网格线恰好落在 b 上
+        if len(steps) > 1 and x - b > 0.5 * steps[-1]:
+            steps.pop()
+        steps = np.asarray(steps) * (b - a) / np.sum(steps)
+        nodes.extend((a + np.cumsum(steps)).tolist())
+    nodes[-1] = hi
+    return np.asarray(nodes)
+
+
+class _Grid:
+    """
+    单一网格上的离散：按材料拆分的矩阵、参考分解与已求解的电容
+
+    网格与各材料的整体 Laplace 矩阵只取决于几何，与边界类型无关；sibling 为同一几何、
+    不同边界的网格（差分对的偶模 / 奇模）时直接复用，只重新按边界拆分自由节点。
+    """
+
+    def __init__(self, section: CrossSection, growth: float, sibling: "_Grid" = None):
+        self.section = section
+        if sibling is not None:
+            self.x, self.y = sibling.x, sibling.y
+            self._conductor, self._laplacians = sibling._conductor, sibling._laplacians
+        else:
+            rects = list(section.conductors) + [rect for rect, _ in section.dielectrics]
+            xs = [0., section.width] + [v for r in rects for v in (r.x0, r.x1)]
+            ys = [0., section.height] + [v for r in rects for v in (r.y0, r.y1)]
+            features = [d for r in section.conductors for d in (r.x1 - r.x0, r.y1 - r.y0) if d > 0]
+            h_min = min(features + [section.resolution]) / section.mesh.edge_cells
+            h_max = section.resolution / section.mesh.resolution_cells
+            far = FAR_FIELD * section.resolution
+            fine_x = [v for r in section.conductors for v in (r.x0, r.x1)]
+            fine_y = [v for r in section.conductors for v in (r.y0, r.y1)]
+            self.x = _axis(0., section.width, xs, fine_x, h_min, h_max, far, growth)
+            self.y = _axis(0., section.height, ys, fine_y, h_min, h_max, far, growth)
+            self._discretize()
+        self._reduce()
+        self._factor = None
+        self._solutions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nodes(self) -> int:
+        return self.x.size * self.y.size
+
+    def _discretize(self):
+        """单元材料、导体节点与各材料的整体 Laplace 矩阵（全部节点）"""
+        section, x, y = self.section, self.x, self.y
+        nx, ny = x.size, y.size
+        xc, yc = (x[:-1] + x[1:]) / 2, (y[:-1] + y[1:]) / 2
+        XC, YC = np.meshgrid(xc, yc)
+
+        # 单元材料：-1 为空气，-2 为导体内部（不参与），其余为材料序号
+        material = np.full(XC.shape, -1, dtype=int)
+        for rect, index in section.dielectrics:
+            material[(XC > rect.x0) & (XC < rect.x1) & (YC > rect.y0) & (YC < rect.y1)] = index
+        X, Y = np.meshgrid(x, y)
+        tol = 1e-9 * max(section.width, section.height)
+        conductor = np.zeros(X.shape, dtype=bool)
+        for rect in section.conductors:
+            material[(XC > rect.x0) & (XC < rect.x1) & (YC > rect.y0) & (YC < rect.y1)] = -2
+            conductor |= ((X >= rect.x0 - tol) & (X <= rect.x1 + tol)
+                          & (Y >= rect.y0 - tol) & (Y <= rect.y1 + tol))
+        self._conductor = conductor
+
+        # 每个单元对其四条边的贡献：边耦合系数 = 单元内对偶面长度 / 边长
+        index = np.arange(nx * ny).reshape(ny, nx)
+        DX, DY = np.meshgrid(np.diff(x), np.diff(y))
+        edges_a = np.concatenate([index[:-1, :-1], index[1:, :-1], index[:-1, :-1], index[:-1, 1:]], axis=None)
+        edges_b = np.concatenate([index[:-1, 1:], index[1:, 1:], index[1:, :-1], index[1:, 1:]], axis=None)
+        weights = np.concatenate([DY / 2 / DX, DY / 2 / DX, DX / 2 / DY, DX / 2 / DY], axis=None)
+        cells = np.tile(material.ravel(), 4)
+
+        self._laplacians = {}
+        for key in np.unique(cells[cells != -2]):
+            mask = cells == key
+            a, b, w = edges_a[mask], edges_b[mask], weights[mask]
+            self._laplacians[int(key)] = sp.coo_matrix(
+                (np.concatenate([w, w, -w, -w]),
+                 (np.concatenate([a, b, a, b]), np.concatenate([a, b, b, a]))),
+                shape=(nx * ny, nx * ny)).tocsr()
+
+    def _reduce(self):
+        """按边界类型拆分自由节点：每种材料一组 (A_ff, rhs, cc)，A_ff 为自由节点子矩阵，rhs = -A_fc·v，cc = vᵀ·A_cc·v"""
+        fixed = self._conductor.copy()
+        left, right, bottom, top = self.section.dirichlet
+        fixed[:, 0] |= left
+        fixed[:, -1] |= right
+        fixed[0, :] |= bottom
+        fixed[-1, :] |= top
+        free = ~fixed.ravel()
+        v_c = self._conductor.ravel()[~free].astype(float)
+
+        self.parts = {}
+        for key, laplacian in self._laplacians.items():
+            rows_free, rows_fixed = laplacian[free], laplacian[~free]
+            self.parts[key] = (
+                rows_free[:, free].tocsc(),
+                -(rows_free[:, ~free] @ v_c),
+                float(v_c @ (rows_fixed[:, ~free] @ v_c)),
+            )
+        # 均匀介质：只有一种材料且不含空气时电容与介电常数成正比
+        self.homogeneous = len(self.parts) == 1 and -1 not in self.parts
+
+    def capacitance(self, eps: Tuple[float, ...]) -> float:
+        """单位长度电容（F/m），eps 为各材料的相对介电常数"""
+        if self.homogeneous:
+            (key,) = self.parts
+            return eps[key] * self._solve(tuple(1. for _ in eps))
+        return self._solve(eps)
+
+    def _solve(self, eps):
+        with self._lock:
+            cached = self._solutions.get(eps)
+            if cached is not None:
+                return cached
+            weights = {key: (1. if key == -1 else eps[key]) for key in self.parts}
+            a_ff = sum(weights[key] * part[0] for key, part in self.parts.items())
+            rhs = sum(weights[key] * part[1] for key, part in self.parts.items())
+            cc = sum(weights[key] * part[2] for key, part in self.parts.items())
+
+            phi = None
+            if self._factor is not None:
+                # 以已有分解为预条件的共轭梯度（只改变介电常数时矩阵谱接近，数次迭代收敛）
+                preconditioner = LinearOperator(a_ff.shape, matvec=self._factor.solve, dtype=float)
+                phi, info = cg(a_ff, rhs, x0=self._factor.solve(rhs), rtol=PCG_RTOL, maxiter=PCG_MAXITER,
+                               M=preconditioner)
+                if info != 0:
+                    phi = None
+            if phi is None:
+                lu = splu(a_ff, permc_spec='MMD_AT_PLUS_A')
+                phi = lu.solve(rhs)
+                # 均匀介质只需求解一次，不保留分解
+                self._factor = None if self.homogeneous else lu
+            # 能量法：C·V² = ε0·φᵀAφ = ε0·(cc - 2·φ_f·rhs + φ_fᵀ·A_ff·φ_f)，对电位误差为二次（精确解时即 cc - φ_f·rhs）
+            value = epsilon_0 * self.section.scale * (cc - 2. * float(phi @ rhs) + float(phi @ (a_ff @ phi)))
+            self._solutions[eps] = value
+            return value
+
+
+class _SectionSolver:
+    """
+    单个截面的求解器：在等比放大倍数为 mesh.growth 与 mesh.coarse_growth 的两套网格上分别求电容，
+    按离散误差与 (放大倍数 - 1) 成正比做 Richardson 外推；sibling 为同一几何、不同边界的求解器时复用其网格
+    """
+
+    def __init__(self, section: CrossSection, sibling: "_SectionSolver" = None):
+        self.section = section
+        mesh = section.mesh
+        siblings = sibling.grids if sibling is not None else (None, None)
+        self.grids = (_Grid(section, mesh.growth, siblings[0]), _Grid(section, mesh.coarse_growth, siblings[1]))
+
+    @property
+    def nodes(self) -> int:
+        return sum(grid.nodes for grid in self.grids)
+
+    def capacitance(self, eps: Tuple[float, ...]) -> float:
+        """单位长度电容（F/m），eps 为各材料的相对介电常数"""
+        eps = tuple(float(value) for value in eps)
+        fine, coarse = (grid.capacitance(eps) for grid in self.grids)
+        mesh = self.section.mesh
+        ratio = (mesh.growth - 1.) / (mesh.coarse_growth - mesh.growth)
+        return fine - (coarse - fine) * ratio
+
+
+def get_solver(section: CrossSection) -> _SectionSolver:
+    """
+    按截面取缓存的求解器（LRU），未命中时建立网格与矩阵；
+    缓存中有同一几何、不同边界的截面（差分对的另一模式）时复用其网格与整体矩阵
+    """
+    geometry = section._replace(dirichlet=None)
+    with _cache_lock:
+        solver = _section_cache.get(section)
+        if solver is not None:
+            _section_cache.move_to_end(section)
+            return solver
+        sibling = next((cached for key, cached in _section_cache.items()
+                        if key._replace(dirichlet=None) == geometry), None)
+    solver = _SectionSolver(section, sibling)
+    with _cache_lock:
+        _section_cache[section] = solver
+        while len(_section_cache) > FIELD_CACHE_SIZE:
+            _section_cache.popitem(last=False)
+    return solver
+
+
+def clear_field_cache():
+    """清空截面缓存"""
+    with _cache_lock:
+        _section_cache.clear()
+
+
+def _capacitances(sections, er):
+    """
+    对同一组截面（每行一个截面）与每行的介电常数求 (C, C_air)
+
+    同一截面的行共用求解器；某截面上的不同介电常数较多时（扫频色散），只在其取值区间的 Chebyshev 节点上求解并插值。
+    """
+    capacitance, capacitance_air = np.empty(er.size), np.empty(er.size)
+    groups = {}
+    for row, section in enumerate(sections):
+        groups.setdefault(section, []).append(row)
+    for section, rows in groups.items():
+        rows = np.asarray(rows)
+        solver = get_solver(section)
+        capacitance_air[rows] = solver.capacitance((1.,))
+        values, inverse = np.unique(er[rows], return_inverse=True)
+        if values.size > ER_INTERP_POINTS and values[-1] > values[0]:
+            lo, hi = values[0], values[-1]
+            nodes = (lo + hi) / 2 + (hi - lo) / 2 * np.cos(np.pi * (np.arange(ER_INTERP_POINTS) + 0.5) / ER_INTERP_POINTS)
+            samples = [solver.capacitance((value,)) for value in nodes]
+            fit = np.polynomial.Chebyshev.fit(nodes, samples, ER_INTERP_POINTS - 1, domain=[lo, hi])
+            solved = fit(values)
+        else:
+            solved = np.array([solver.capacitance((value,)) for value in values])
+        capacitance[rows] = solved[inverse.ravel()]
+    return capacitance, capacitance_air
+
+
+def _section(width, height, conductor, substrate, dirichlet, scale, resolution, mesh=LINE_MESH):
+    """构造截面（坐标取整，避免浮点噪声使相同截面的缓存键不同）"""
+    def rect(x0, x1, y0, y1):
+        return Rect(*(round(float(value), 12) for value in (x0, x1, y0, y1)))
+    width, height = round(float(width), 12), round(float(height), 12)
+    return CrossSection(width, height, (rect(*conductor),), ((rect(0., width, 0., substrate), 0),),
+                        dirichlet, scale, round(float(resolution), 12), mesh)
+
+
+def _microstrip_section(w, h, t, s=None, odd=False):
+    """微带线半截面（x = 0 为对称面）：s 给出时为差分对中的一根，odd 选择奇模（对称面为电壁）"""
+    if s is None:
+        x0, x1, scale, resolution = 0., w / 2, 2., h
+    else:
+        x0, x1, scale, resolution = s / 2, s / 2 + w, 1., min(h, s / 2)
+    extent = OPEN_BOUNDARY * (x1 + h)
+    return _section(x1 + extent, h + extent, (x0, x1, h, h + t), h,
+                    (s is not None and odd, False, True, False), scale, resolution,
+                    LINE_MESH if s is None else COUPLED_MESH)
+
+
+def _stripline_section(w, h1, h2, t, s=None, odd=False):
+    """带状线半截面：导体下表面距下参考平面 h2、上表面距上参考平面 h1"""
+    if s is None:
+        x0, x1, scale, resolution = 0., w / 2, 2., min(h1, h2)
+    else:
+        x0, x1, scale, resolution = s / 2, s / 2 + w, 1., min(h1, h2, s / 2)
+    b = h1 + h2 + t
+    return _section(x1 + SHIELDED_BOUNDARY * b, b, (x0, x1, h2, h2 + t), b,
+                    (s is not None and odd, False, True, True), scale, resolution,
+                    LINE_MESH if s is None else COUPLED_MESH)
+
+
+def _broadside_section(w, s, b, t, odd=False):
+    """宽边耦合带状线四分之一截面：x = 0 为左右对称面，y = b/2 为两导体之间的对称面"""
+    d1 = (b - s - 2. * t) / 2.
+    return _section(w / 2 + SHIELDED_BOUNDARY * b, b / 2, (0., w / 2, d1, d1 + t), b / 2,
+                    (False, False, True, odd), 2., min(d1, s / 2), COUPLED_MESH)
+
+
+def _line(f, er, tand, sections, w):
+    """由截面电容得到单个模式的阻抗、有效介电常数与传播常数"""
+    ep_r_f, tand_f = djordjevic_svensson(er, tand, f)
+    er_f = np.real(ep_r_f)
+    capacitance, capacitance_air = _capacitances(sections, er_f)
+    z0 = 1. / (c * np.sqrt(capacitance * capacitance_air))
+    ep_reff = capacitance / capacitance_air
+    return z0, ep_reff, _gamma(f, z0, w, ep_reff, er_f, np.real(tand_f), COPPER_RHO, COPPER_ROUGHNESS)
+
+
+def _rows(*values):
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in values))
+    return [array.ravel() for array in arrays], arrays[0].shape
+
+
+def microstrip(f, w, h, t, ep_r, tand):
+    """
+    微带线（单层介质，上方为空气）
+
+    Args:
+        f: 频率（Hz）
+        w: 线宽（m）
+        h: 介质厚度（m）
+        t: 铜厚（m）
+        ep_r: 介电常数
+        tand: 损耗角正切
+
+    Returns:
+        FieldResult
+    """
+    (f, w, h, t, ep_r, tand), shape = _rows(f, w, h, t, ep_r, tand)
+    _require(w > 0, "线宽 width 大于0")
+    sections = [_microstrip_section(*row) for row in zip(w, h, t)]
+    z0, ep_reff, gamma = _line(f, ep_r, tand, sections, w)
+    return FieldResult(z0.reshape(shape), ep_reff.reshape(shape), gamma.reshape(shape))
+
+
+def stripline(f, w, h1, h2, t, ep_r, tand):
+    """
+    带状线（均匀介质，可非对称）：导体上表面距上参考平面 h1，下表面距下参考平面 h2
+
+    Args:
+        f: 频率（Hz）
+        w: 线宽（m）
+        h1: 上层介质厚度（m）
+        h2: 下层介质厚度（m）
+        t: 铜厚（m）
+        ep_r: 介电常数
+        tand: 损耗角正切
+
+    Returns:
+        FieldResult
+    """
+    (f, w, h1, h2, t, ep_r, tand), shape = _rows(f, w, h1, h2, t, ep_r, tand)
+    _require((w > 0) & (h1 > 0) & (h2 > 0), "线宽与导体两侧介质厚度大于0")
+    sections = [_stripline_section(*row) for row in zip(w, h1, h2, t)]
+    z0, ep_reff, gamma = _line(f, ep_r, tand, sections, w)
+    return FieldResult(z0.reshape(shape), ep_reff.reshape(shape), gamma.reshape(shape))
+
+
+def coupled_microstrip(f, w, s, h, t, ep_r, tand):
+    """边缘耦合微带线（差分对）的偶模/奇模，参数同 microstrip，s 为两线间距（m）"""
+    (f, w, s, h, t, ep_r, tand), shape = _rows(f, w, s, h, t, ep_r, tand)
+    _require((w > 0) & (s > 0), "线宽与线间距大于0")
+    return _coupled_result(f, ep_r, tand, w, shape, lambda odd: [
+        _microstrip_section(*row, odd=odd) for row in zip(w, h, t, s)])
+
+
+def coupled_stripline(f, w, s, h1, h2, t, ep_r, tand):
+    """边缘耦合带状线（差分对）的偶模/奇模，参数同 stripline，s 为两线间距（m）"""
+    (f, w, s, h1, h2, t, ep_r, tand), shape = _rows(f, w, s, h1, h2, t, ep_r, tand)
+    _require((w > 0) & (s > 0) & (h1 > 0) & (h2 > 0), "线宽、线间距与导体两侧介质厚度大于0")
+    return _coupled_result(f, ep_r, tand, w, shape, lambda odd: [
+        _stripline_section(*row, odd=odd) for row in zip(w, h1, h2, t, s)])
+
+
+def broadside_stripline(f, w, s, b, t, ep_r, tand):
+    """宽边耦合带状线的偶模/奇模：s 为两导体间的介质厚度，b 为两参考平面间距（m，含铜厚）"""
+    (f, w, s, b, t, ep_r, tand), shape = _rows(f, w, s, b, t, ep_r, tand)
+    _require((w > 0) & (s > 0), "线宽与线间距大于0")
+    _require(b - s - 2. * t > 0, "介质厚度 height 大于线间距 spacing")
+    return _coupled_result(f, ep_r, tand, w, shape, lambda odd: [
+        _broadside_section(*row, odd=odd) for row in zip(w, s, b, t)])
+
+
+def _coupled_result(f, ep_r, tand, w, shape, build):
+    """build(odd) 返回各行的偶模 / 奇模截面"""
+    z_even, ep_even, gamma_even = _line(f, ep_r, tand, build(False), w)
+    z_odd, ep_odd, gamma_odd = _line(f, ep_r, tand, build(True), w)
+    return CoupledResult(
+        z_even=z_even.reshape(shape), z_odd=z_odd.reshape(shape),
+        ep_reff_even=ep_even.reshape(shape), ep_reff_odd=ep_odd.reshape(shape),
+        gamma_even=gamma_even.reshape(shape), gamma_odd=gamma_odd.reshape(shape),
+        w_eff=w.reshape(shape),
+    )
@@ -1,27 +1,387 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.utils.metrics import phase_timer
+
+from . import model_executor
+from .method import fast_table
+from .model_materials import get_material
+from .model_sweep import parse_chunk_size
 from .models import MODEL_MAP
 
+# 单次批量请求允许的最大计算条目数
+MAX_BATCH_SIZE = int(os.environ.get('ZCAL_MAX_BATCH_SIZE', 10000))
+# 流式批量计算（NDJSON）每块的条目数
+STREAM_CHUNK_ITEMS = int(os.environ.get('ZCAL_STREAM_CHUNK_ITEMS', 500))
+# 结果缓存条目数上限（0 表示关闭缓存）与过期时间（秒，0 表示不过期）
+RESULT_CACHE_SIZE = int(os.environ.get('ZCAL_RESULT_CACHE_SIZE', 4096))
+RESULT_CACHE_TTL = float(os.environ.get('ZCAL_RESULT_CACHE_TTL', 0))
+# 启动时预热的模型：空表示不预热，all 表示全部，或逗号分隔的模型类型
+# （gunicorn --preload 下在主进程中导入并计算一次，worker fork 后共享）
+PREWARM_MODELS = os.environ.get('ZCAL_PREWARM_MODELS', '')
+
+
+class ResultCache:
+    """线程安全的 LRU 计算结果缓存（可选 TTL），带命中/未命中计数"""
+
+    def __init__(self, max_size, ttl=0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """查询缓存，命中时将条目移到队尾（最近使用），过期条目视为未命中"""
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """写入缓存，超出上限时淘汰最久未使用的条目"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存并返回清除的条目数（计数器保留）"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.max_size > 0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
 
-def calculate(calc_type, params):
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
+
+def calculate(calc_type, params, sweep=None, engine=None, timeout=None, material=None):
     """
     执行阻抗计算
-    
+
+    单点计算始终在当前线程完成；启用进程池时，频点数达到 ZCAL_POOL_MIN_SWEEP_POINTS 的扫频
+    分发到进程池，受 CPU 时间预算约束。
+
     Args:
         calc_type: 模型类型标识符
         params: 计算参数字典
-        
+        sweep: 扫频定义（可选），提供时各结果字段返回与频点等长的数组
+        engine: 计算引擎（可选），skrf、numpy 或 fast，缺省为模型默认引擎
+        timeout: CPU 时间预算（秒，可选），不超过 ZCAL_POOL_CPU_BUDGET，仅对进程池中的计算生效
+        material: 材料库中的材料键（可选）；给出时 dielectric / loss_tangent 按各频点的材料数据计算
+                  （忽略 params 中的值），结果附带 material：材料摘要及各频点的 er_f / loss_tangent_f
+
     Returns:
         计算结果字典
-        
+
     Raises:
         ValueError: 不支持的计算类型或参数错误
+        CalculationTimeout: 进程池中的计算超出时间预算
     """
     # 验证模型类型，抛出异常让路由统一处理
     if calc_type not in MODEL_MAP:
         raise ValueError(f"不支持的计算类型: {calc_type}")
+    model_executor.resolve_budget(timeout)
 
     # 实例化模型 + 计算（参数校验由 BasicModel.__init__ 负责）
     model_class = MODEL_MAP[calc_type]
-    model = model_class(params)
-    result = model.get_result()
-     
-    return result
\ No newline at end of file
+    with phase_timer('validate', calc_type):
+        model = model_class(params, sweep, engine)
+        if material is not None:
+            get_material(material)
+
+    # 以校验后的浮点参数（及扫频频点、材料键）作为缓存键，"0.2" 与 0.2 命中同一条目
+    with phase_timer('compute', calc_type):
+        values = tuple(model.params.values()) + ((('material', material),) if material is not None else ())
+        key = _cache_key(calc_type, model.engine, values, model.frequencies if model.sweep else None)
+        result = result_cache.get(key)
+        if result is None:
+            if model.sweep and model_executor.pool_enabled() \
+                    and len(model.frequencies) >= model_executor.POOL_MIN_SWEEP_POINTS:
+                result = model_executor.run(_get_result, (calc_type, params, sweep, engine, material), timeout)
+            elif material is not None:
+                result = _material_result(model, get_material(material))
+            else:
+                result = model.get_result()
+            if result.get('status') == 'success':
+                result_cache.put(key, result)
+
+    return dict(result)
+
+
+def calculate_batch(items, engine=None, timeout=None):
+    """
+    批量执行阻抗计算（允许混合不同模型类型）
+
+    先按模型类型分组，每组参数在一次向量化调用（BasicModel.evaluate_columns）中完成计算，
+    并复用相同参数的计算结果，最后按输入顺序返回每一项的结果。单项失败不会影响其他项。
+    启用进程池且条目数达到 ZCAL_POOL_MIN_BATCH_ITEMS 时，各组拆块在进程池中并行计算。
+
+    Args:
+        items: 计算条目列表，每项形如 {"type": ..., "params": {...}}
+        engine: 整批使用的计算引擎（可选）
+        timeout: CPU 时间预算（秒，可选），仅对进程池中的计算生效
+
+    Returns:
+        与 items 等长、顺序一致的结果字典列表
+
+    Raises:
+        ValueError: items 不是列表或超过最大批量
+        CalculationTimeout: 进程池中的计算超出时间预算
+    """
+    if not isinstance(items, list):
+        raise ValueError("items 必须是列表")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"批量计算条目数不能超过 {MAX_BATCH_SIZE}，当前: {len(items)}")
+    model_executor.resolve_budget(timeout)
+
+    results = [None] * len(items)
+
+    # 1. 按模型类型分组（记录原始下标以便按输入顺序回填）
+    groups = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _error_result("计算条目必须是对象")
+            continue
+
+        calc_type = item.get('type')
+        params = item.get('params') or {}
+        if not calc_type:
+            results[index] = _error_result("计算类型不能为空")
+            continue
+        if calc_type not in MODEL_MAP:
+            results[index] = _error_result(f"不支持的计算类型: {calc_type}")
+            continue
+        if not isinstance(params, dict):
+            results[index] = _error_result("params 必须是对象")
+            continue
+
+        groups.setdefault(calc_type, []).append((index, params))
+
+    # 2. 逐组计算（大批量时各组拆块分发到进程池）
+    if model_executor.pool_enabled() and len(items) >= model_executor.POOL_MIN_BATCH_ITEMS:
+        tasks = [
+            (calc_type, chunk, engine)
+            for calc_type, entries in groups.items()
+            for chunk in model_executor.split(entries)
+        ]
+        grouped = model_executor.run_many(_calculate_chunk, tasks, timeout)
+    else:
+        grouped = [_calculate_group(calc_type, entries, engine) for calc_type, entries in groups.items()]
+    for group in grouped:
+        for index, result in group:
+            results[index] = result
+
+    return results
+
+
+def stream_batch(items, engine=None, timeout=None, chunk_size=None):
+    """
+    流式批量计算：按块（chunk_size 条）调用 calculate_batch，返回记录生成器
+
+    生成的记录依次为：
+        {"event": "header", "status": "success", "count"}
+        {"event": "result", "index", ...单项结果}  （每个条目一条，按输入顺序）
+        {"event": "end", "count"}
+
+    Args:
+        chunk_size: 每块的条目数（可选），缺省为 ZCAL_STREAM_CHUNK_ITEMS
+        其余参数同 calculate_batch；timeout 为每一块的 CPU 时间预算（启用进程池时生效），
+        整个流另受总墙钟预算 ZCAL_STREAM_WALL_BUDGET 限制，超出时生成器抛出 CalculationTimeout
+
+    Raises:
+        ValueError: items 不是列表或超过最大批量
+    """
+    if not isinstance(items, list):
+        raise ValueError("items 必须是列表")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"批量计算条目数不能超过 {MAX_BATCH_SIZE}，当前: {len(items)}")
+    model_executor.resolve_budget(timeout)
+    chunk_size = parse_chunk_size(chunk_size, STREAM_CHUNK_ITEMS, MAX_BATCH_SIZE)
+    return _stream_batch_chunks(items, engine, timeout, chunk_size)
+
+
+def _stream_batch_chunks(items, engine, timeout, chunk_size):
+    yield {'event': 'header', 'status': 'success', 'count': len(items)}
+    for offset in model_executor.budgeted_chunks(range(0, len(items), chunk_size)):
+        results = calculate_batch(items[offset:offset + chunk_size], engine, timeout)
+        for index, result in enumerate(results, start=offset):
+            yield {'event': 'result', 'index': index, **result}
+    yield {'event': 'end', 'count': len(items)}
+
+
+def _calculate_group(calc_type, entries, engine=None):
+    """计算同一模型类型的一组条目：参数相同的条目只计算一次，其余在一次向量化调用中完成"""
+    model_class = MODEL_MAP[calc_type]
+
+    # 1. 整列校验参数（一次 NumPy 范围检查，单项错误单独返回，不影响整组）
+    try:
+        engine = model_class._resolve_engine(engine)
+        columns, errors = model_class.validator().validate_columns([params for _, params in entries])
+    except ValueError as e:
+        for index, _ in entries:
+            yield index, _error_result(str(e))
+        return
+    for row, message in errors.items():
+        yield entries[row][0], _error_result(message)
+    valid = [row for row in range(len(entries)) if row not in errors]
+    if not valid:
+        return
+
+    # 2. 以校验后的浮点参数作为去重键（"0.2" 与 0.2 视为相同），先查结果缓存
+    names = list(columns)
+    matrix = np.column_stack([columns[name] for name in names])[valid]
+    rows = [(entries[row][0], tuple(values)) for row, values in zip(valid, matrix.tolist())]
+    unique = {}
+    positions = [unique.setdefault(validated, len(unique)) for _, validated in rows]
+    keys = list(unique)
+    computed = [result_cache.get(_cache_key(calc_type, engine, key)) for key in keys]
+    missing = [i for i, result in enumerate(computed) if result is None]
+
+    # 3. 未命中的参数整组向量化计算；若组内存在导致整体计算失败的参数，则退回逐项计算以隔离错误
+    if missing:
+        try:
+            columns = {name: np.array([keys[i][j] for i in missing]) for j, name in enumerate(names)}
+            outputs = model_class.evaluate_columns(columns, engine)
+            for row, i in enumerate(missing):
+                model = model_class._from_columns(dict(zip(names, keys[i])), engine)
+                model.result.update({name: values[row] for name, values in outputs.items()})
+                computed[i] = model._build_result()
+        except Exception:
+            for i in missing:
+                computed[i] = model_class(dict(zip(names, keys[i])), engine=engine).get_result()
+
+        for i in missing:
+            if computed[i].get('status') == 'success':
+                result_cache.put(_cache_key(calc_type, engine, keys[i]), computed[i])
+
+    for (index, _), position in zip(rows, positions):
+        yield index, computed[position]
+
+
+def _get_result(calc_type, params, sweep, engine, material=None):
+    """进程池任务：单次计算"""
+    model = MODEL_MAP[calc_type](params, sweep, engine)
+    if material is not None:
+        return _material_result(model, get_material(material))
+    return model.get_result()
+
+
+def material_outputs(model, material):
+    """
+    按材料计算的结果列（未格式化，每个频点一个值）
+
+    各频点的材料 er / tand 作为 dielectric / loss_tangent 输入，与其余参数拼成按频点的参数列，
+    一次向量化计算（BasicModel.evaluate_columns）。内核自带 Djordjevic–Svensson 色散的模型
+    （DIELECTRIC_DISPERSION）先换算为等效 1 GHz 输入（Material.model_inputs），其余模型直接使用材料值。
+    """
+    frequencies = model.frequencies
+    er, tand = material.properties(frequencies)
+    dielectric, loss_tangent = material.model_inputs(frequencies) if model.DIELECTRIC_DISPERSION else (er, tand)
+    columns = {key: np.full(frequencies.size, value, dtype=float) for key, value in model.params.items()}
+    columns.update(frequency=frequencies, dielectric=dielectric, loss_tangent=loss_tangent)
+    outputs = model.evaluate_columns(columns, model.engine)
+    if model.engine in model.INPUT_ER_EFF_ENGINES:
+        # 均匀介质：er_eff 为材料在该频点的介电常数，而不是等效输入
+        outputs['er_eff'] = np.asarray(er, dtype=float)
+    return outputs
+
+
+def _material_result(model, material):
+    """按材料计算并格式化结果，附带材料摘要及各频点的材料参数"""
+    try:
+        model.result.update(material_outputs(model, material))
+        result = model._build_result()
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+    er, tand = material.properties(model.frequencies)
+    # 摘要中的 er / loss_tangent 为标定频率处的值，er_f / loss_tangent_f 为各计算频点的值
+    result['material'] = dict(
+        material.summary(),
+        er_f=model._format_value(np.asarray(er), 4),
+        loss_tangent_f=model._format_value(np.asarray(tand), 6),
+    )
+    return result
+
+
+def _calculate_chunk(calc_type, entries, engine):
+    """进程池任务：计算同一模型类型的一块条目"""
+    return list(_calculate_group(calc_type, entries, engine))
+
+
+def load_fast_tables():
+    """加载全部模型的 fast 引擎插值表（mmap），返回各模型的加载状态"""
+    return fast_table.load_tables(MODEL_MAP)
+
+
+def prewarm_models(spec=None):
+    """
+    预热模型：导入模型模块并以默认参数计算一次
+
+    Args:
+        spec: 预热范围（缺省取 ZCAL_PREWARM_MODELS）：空、all 或逗号分隔的模型类型
+
+    Returns:
+        模型类型 -> 预热耗时（秒）
+    """
+    spec = (PREWARM_MODELS if spec is None else spec).strip()
+    if not spec:
+        return {}
+    calc_types = None if spec == 'all' else [calc_type.strip() for calc_type in spec.split(',') if calc_type.strip()]
+    return MODEL_MAP.preload(calc_types)
+
+
+def model_import_report():
+    """各模型的导入状态与模块导入耗时"""
+    return MODEL_MAP.import_report()
+
+
+def _cache_key(calc_type, engine, values, frequencies=None):
+    """结果缓存键：模型类型 + 计算引擎 + 校验后的参数元组 + 扫频频点（单点模式为 None）"""
+    return calc_type, engine, values, None if frequencies is None else frequencies.tobytes()
+
+
+def _error_result(message):
+    """构造单项错误结果（与单次计算接口的错误格式保持一致）"""
+    return {'status': 'error', 'message': f'参数错误: {message}'}
@@ -0,0 +1,261 @@
+"""
+进程池执行 - 把大计算（长扫频、大批量、大网格、综合）分发到预先启动的进程池
+
+gunicorn 同步 worker 数量很少，一个大计算会长时间占住 worker；每个 worker 一个进程池，
+auto 时各 worker 的进程池均分 CPU 核数（worker 数取 WEB_CONCURRENCY），
+大批量/大网格拆块并行计算，吞吐随核数而非 worker 数增长。单点计算等小请求不经过进程池，
+直接在当前线程计算（避免序列化与进程间通信开销）。
+
+超时：每个请求有 CPU 时间预算（ITIMER_PROF，超出时在子进程内中断计算并返回 CalculationTimeout，子进程可继续复用）；
+另设墙钟上限兜底（子进程卡在无法响应信号的 C 代码中时），超出时该代进程池退役：后续请求改用新建的一代，
+旧一代待仍在使用它的其他请求全部结束后再终止，一个请求超时不会让并发的其他请求失败。
+流式响应另有总墙钟预算（budgeted_chunks），在 gunicorn --timeout 之前以 error 记录结束响应。
+"""
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from .models import MODEL_MAP
+
+
+def _pool_size(value):
+    """ZCAL_POOL_WORKERS：0 关闭进程池，auto 为 CPU 核数按 web worker 数均分（至少 1），或正整数"""
+    if value == 'auto':
+        return max((os.cpu_count() or 1) // WEB_WORKERS, 1)
+    return max(int(value), 0)
+
+
+# web worker 数（gunicorn / uvicorn 均以 WEB_CONCURRENCY 作为缺省 worker 数），auto 进程池据此均分 CPU 核数
+WEB_WORKERS = max(int(os.environ.get('WEB_CONCURRENCY', 1)), 1)
+
+
+# 进程池大小（0 表示关闭，所有计算在当前线程完成）
+POOL_WORKERS = _pool_size(os.environ.get('ZCAL_POOL_WORKERS', '0'))
+# 每个请求的 CPU 时间预算上限（秒），请求可通过 timeout 字段调低；
+# 对应的墙钟上限须小于 gunicorn --timeout（30s），否则 worker 先被 gunicorn 杀掉
+POOL_CPU_BUDGET = float(os.environ.get('ZCAL_POOL_CPU_BUDGET', 15))
+# 墙钟上限 = CPU 预算 × 系数 + 余量（进程池排队与进程间通信）
+WALL_TIMEOUT_FACTOR = 1.5
+WALL_TIMEOUT_MARGIN = 2.0
+# 流式响应（NDJSON / 附件下载）的总墙钟预算（秒）：gunicorn 同步 worker 输出响应体期间不发心跳，
+# 超过 --timeout（30s）会被 arbiter 杀掉、客户端收到截断的响应体，因此预算须小于该值（ASGI 模式下可调大）
+STREAM_WALL_BUDGET = float(os.environ.get('ZCAL_STREAM_WALL_BUDGET', 20))
+# 达到以下规模时才分发到进程池（扫频频点数 / 批量条目数 / 网格点数）
+POOL_MIN_SWEEP_POINTS = int(os.environ.get('ZCAL_POOL_MIN_SWEEP_POINTS', 2000))
+POOL_MIN_BATCH_ITEMS = int(os.environ.get('ZCAL_POOL_MIN_BATCH_ITEMS', 500))
+POOL_MIN_GRID_POINTS = int(os.environ.get('ZCAL_POOL_MIN_GRID_POINTS', 20000))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class CalculationTimeout(Exception):
+    """计算超出 CPU 时间预算或墙钟上限"""
+
+
+class _BudgetExceeded(BaseException):
+    """子进程内由 SIGPROF 抛出；继承 BaseException，不会被模型代码中的 except Exception 吞掉"""
+
+
+def pool_enabled():
+    """进程池是否启用"""
+    return POOL_WORKERS > 0
+
+
+def resolve_budget(timeout=None):
+    """请求的 CPU 时间预算：请求给出的 timeout 不能超过 ZCAL_POOL_CPU_BUDGET"""
+    if timeout is None:
+        return POOL_CPU_BUDGET
+    try:
+        timeout = float(timeout)
+    except (ValueError, TypeError):
+        raise ValueError("timeout 必须是数字（秒）")
+    if not timeout > 0:
+        raise ValueError(f"timeout 必须大于0，当前值: {timeout}")
+    return min(timeout, POOL_CPU_BUDGET)
+
+
+def run(func, args, timeout=None):
+    """在进程池中执行 func(*args)，返回其结果"""
+    return run_many(func, [args], timeout)[0]
+
+
+def run_many(func, args_list, timeout=None):
+    """
+    在进程池中并行执行 func(*args)（args_list 中每组参数一个任务），按输入顺序返回结果
+
+    Raises:
+        CalculationTimeout: 任一任务超出 CPU 预算或整体超出墙钟上限
+    """
+    budget = resolve_budget(timeout)
+    pool = _acquire_pool()
+    try:
+        futures = [pool.executor.submit(_run_with_budget, budget, func, args) for args in args_list]
+
+        done, pending = wait(futures, timeout=budget * WALL_TIMEOUT_FACTOR + WALL_TIMEOUT_MARGIN)
+        if pending:
+            # 子进程无法在 CPU 预算内自行中断：本代进程池退役，待其他请求用完后终止
+            for future in pending:
+                future.cancel()
+            _retire_pool(pool)
+            raise CalculationTimeout(f"计算超时（超过 {budget:g}s 预算）")
+        return [future.result() for future in futures]
+    except _BudgetExceeded:
+        # 预算恰好在任务返回后、清除计时器前用尽
+        raise CalculationTimeout(f"计算超时（超过 {budget:g}s CPU 时间预算）")
+    except BrokenProcessPool:
+        # 只退役本请求所用的一代（当前进程池可能已由其他请求重建，不能误伤）
+        _retire_pool(pool)
+        raise RuntimeError("计算进程异常退出")
+    finally:
+        _release_pool(pool)
+
+
+def budgeted_chunks(items, budget=None):
+    """
+    逐项迭代流式响应的块（每项对应一块的计算与输出），缺省预算为 ZCAL_STREAM_WALL_BUDGET
+
+    以已完成块的最长耗时预计下一块，累计耗时预计超出预算时抛出 CalculationTimeout，
+    流式响应以 error 记录结束（而不是被 gunicorn 中途杀掉、响应体被截断）
+
+    Raises:
+        CalculationTimeout: 下一块预计超出总墙钟预算
+    """
+    budget = STREAM_WALL_BUDGET if budget is None else budget
+    started = last = time.monotonic()
+    longest = 0.
+    for index, item in enumerate(items):
+        now = time.monotonic()
+        if index:
+            longest = max(longest, now - last)
+            if now - started + longest > budget:
+                raise CalculationTimeout(f"流式输出超出总时间预算（{budget:g}s），已输出 {index} 块；"
+                                         f"请缩小范围或分多次请求")
+        last = now
+        yield item
+
+
+def evaluate_columns(calc_type, columns, engine, timeout=None):
+    """
+    按列计算 MODEL_MAP[calc_type].evaluate_columns(columns, engine)
+
+    启用进程池且行数达到 ZCAL_POOL_MIN_GRID_POINTS 时按行拆块分发到进程池并行计算，再按原顺序拼接；
+    否则在当前线程一次向量化计算（timeout 只对进程池中的计算生效）
+
+    Raises:
+        CalculationTimeout: 进程池中的计算超出时间预算
+    """
+    total = len(next(iter(columns.values())))
+    if not (pool_enabled() and total >= POOL_MIN_GRID_POINTS):
+        return MODEL_MAP[calc_type].evaluate_columns(columns, engine)
+    tasks = [
+        (calc_type, {key: values[rows] for key, values in columns.items()}, engine)
+        for rows in split(np.arange(total))
+    ]
+    chunks = run_many(_evaluate_columns, tasks, timeout)
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def _evaluate_columns(calc_type, columns, engine):
+    """进程池任务：计算一块行"""
+    return MODEL_MAP[calc_type].evaluate_columns(columns, engine)
+
+
+def split(items, min_chunk=1):
+    """把列表均分为不超过进程池大小的若干块（每块至少 min_chunk 项）"""
+    chunks = max(1, min(POOL_WORKERS, len(items) // max(min_chunk, 1)))
+    size = math.ceil(len(items) / chunks)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def prestart():
+    """预先启动全部子进程（缺省按需启动）"""
+    if not pool_enabled():
+        return 0
+    pool = _acquire_pool()
+    try:
+        wait([pool.executor.submit(os.getpid) for _ in range(POOL_WORKERS)])
+    finally:
+        _release_pool(pool)
+    return POOL_WORKERS
+
+
+def shutdown():
+    """关闭进程池"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and pool.pid == os.getpid():
+        pool.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _Pool:
+    """一代进程池及其使用计数：退役后不再分配给新请求，最后一个使用者释放时终止"""
+
+    def __init__(self):
+        # forkserver：子进程由干净的服务进程派生，不继承 worker 中的线程与锁
+        self.executor = ProcessPoolExecutor(
+            max_workers=POOL_WORKERS,
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=_init_worker,
+        )
+        self.pid = os.getpid()
+        self.users = 0
+        self.retired = False
+
+
+def _acquire_pool():
+    """获取当前进程的进程池并计入使用者（fork 出的 gunicorn worker 各自创建自己的进程池）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = _Pool()
+        _pool.users += 1
+        return _pool
+
+
+def _retire_pool(pool):
+    """退役一代进程池：若它仍是当前进程池，后续请求改用新建的一代"""
+    global _pool
+    with _pool_lock:
+        pool.retired = True
+        if _pool is pool:
+            _pool = None
+
+
+def _release_pool(pool):
+    """释放使用者；已退役且无人使用时终止其全部子进程（包括卡住的）"""
+    with _pool_lock:
+        pool.users -= 1
+        terminate = pool.retired and pool.users == 0
+    if terminate:
+        for process in list((pool.executor._processes or {}).values()):
+            process.terminate()
+        pool.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_worker():
+    """子进程初始化：CPU 预算用尽时（SIGPROF）中断当前计算"""
+    signal.signal(signal.SIGPROF, _on_budget_exceeded)
+
+
+def _on_budget_exceeded(signum, frame):
+    raise _BudgetExceeded()
+
+
+def _run_with_budget(budget, func, args):
+    """子进程内执行任务：设置 CPU 时间预算，超出时以 CalculationTimeout 返回给父进程"""
+    signal.setitimer(signal.ITIMER_PROF, budget)
+    try:
+        return func(*args)
+    except _BudgetExceeded:
+        raise CalculationTimeout(f"计算超时（超过 {budget:g}s CPU 时间预算）") from None
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
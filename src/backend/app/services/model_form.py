@@ -19,24 +19,32 @@ def get_calculation_types():
 #------------------------------生成模型配置参数-----------------------------
 # 定义默认模型（兜底用）
 DEFAULT_MODEL = 'microstrip'
-def get_form_definitions(model):
+def form_definitions():
+    """从模型类动态生成所有模型的表单定义字典"""
+    return {model_type: model_class.PARAM_DEFINITIONS for model_type, model_class in MODEL_MAP.items()}
+
+
+def normalize_model(model, definitions):
     """
-    从模型类动态生成表单定义，并根据计算类型标识返回对应字段列表（含完整兜底逻辑）
-    :param model: 计算类型标识（字符串）
-    :return: 对应模型的表单字段列表，无效/空值时返回默认模型的字段
+    计算类型标识的兜底处理
+    :param model: 计算类型标识（任意类型）
+    :param definitions: 以计算类型为键的字典
+    :return: definitions 中存在的计算类型，无效/空值时为默认模型
     """
-    # 第一步：动态生成所有模型的表单定义字典
-    form_definitions = {}
-    for model_type, model_class in MODEL_MAP.items():
-        form_definitions[model_type] = model_class.PARAM_DEFINITIONS
-    
-    # 第二步：参数校验与兜底处理
     # 1. 非字符串类型转换，空值直接置为默认
     if not isinstance(model, str):
         model = str(model) if model is not None else DEFAULT_MODEL
     # 2. 去除首尾空格，空字符串置为默认
     model = model.strip() or DEFAULT_MODEL
-    # 3. 模型不存在时返回默认模型定义
-    return form_definitions.get(model, form_definitions[DEFAULT_MODEL])
+    # 3. 模型不存在时返回默认模型
+    return model if model in definitions else DEFAULT_MODEL
 
 
+def get_form_definitions(model):
+    """
+    从模型类动态生成表单定义，并根据计算类型标识返回对应字段列表（含完整兜底逻辑）
+    :param model: 计算类型标识（字符串）
+    :return: 对应模型的表单字段列表，无效/空值时返回默认模型的字段
+    """
+    definitions = form_definitions()
+    return definitions[normalize_model(model, definitions)]
@@ -1,3 +1,27 @@
+"""
+材料库 - 基板材料的频率相关介电参数
+
+substrate_materials 为前端下拉框使用的常用材料（单一 er / loss_tangent）。
+完整材料库存放在带索引的 SQLite 文件中（由 build_material_library.py 从 data/materials/*.json 构建），
+按材料键逐条查询并解析，解析结果（含预先建好的插值对象）放入进程内 LRU 缓存，
+各 worker 不需要加载整个库；库文件不存在时（开发环境）由源数据在内存中建库。
+
+材料模型（频率单位 GHz）：
+    debye   宽带 Debye（Djordjevic–Sarkar）：er / loss_tangent 为 f_ref 处的标定值，可选极点频率 f_low / f_high
+    table   频率表：frequency / er / loss_tangent，按 log f 单调三次插值，超出范围取端点值
+"""
+import glob
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .method import dielectric
+from .method.calculator import DIEL_F_HIGH, DIEL_F_LOW
 
 substrate_materials = {
         'FR4': {'er': 4.3, 'loss_tangent': 0.02, 'name': 'FR4 (标准)'},
@@ -7,4 +31,234 @@ substrate_materials = {
         'Isola370HR': {'er': 4.04, 'loss_tangent': 0.019, 'name': 'Isola 370HR'},
         'Teflon': {'er': 2.1, 'loss_tangent': 0.0002, 'name': 'Teflon/PTFE'},
         'Polyimide': {'er': 3.4, 'loss_tangent': 0.008, 'name': 'Polyimide'},
-    }
\ No newline at end of file
+    }
+
+_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+# 材料库文件（SQLite）与源数据目录
+MATERIAL_LIBRARY = os.environ.get('ZCAL_MATERIAL_LIBRARY', os.path.join(_DATA_DIR, 'materials.sqlite'))
+MATERIAL_SOURCE_DIR = os.environ.get('ZCAL_MATERIAL_SOURCE_DIR', os.path.join(_DATA_DIR, 'materials'))
+# 进程内已解析材料的缓存条目数
+MATERIAL_CACHE_SIZE = int(os.environ.get('ZCAL_MATERIAL_CACHE_SIZE', 256))
+# 材料检索单次返回的最大条数
+MAX_MATERIAL_SEARCH = 500
+MATERIAL_MODELS = ('debye', 'table')
+
+_SCHEMA = """
+CREATE TABLE materials (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    model TEXT NOT NULL,
+    er REAL NOT NULL,
+    loss_tangent REAL NOT NULL,
+    f_ref REAL NOT NULL,
+    record TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX materials_name ON materials (name COLLATE NOCASE);
+CREATE INDEX materials_vendor ON materials (vendor COLLATE NOCASE);
+"""
+
+_material_cache = OrderedDict()
+_cache_lock = threading.Lock()
+# 每个进程一个只读连接（fork 后在子进程中重新打开）
+_connection = None
+_connection_pid = None
+_connection_lock = threading.Lock()
+
+
+class Material(NamedTuple):
+    """已解析的材料；table 为频率表插值对象（debye 模型为 None）"""
+    key: str
+    name: str
+    vendor: str
+    model: str
+    er: float               # 标定频率处的介电常数（table 模型为 f_ref 处的插值）
+    loss_tangent: float     # 标定频率处的损耗角正切
+    f_ref: float            # 标定频率（GHz）
+    f_low: float            # Debye 模型极点频率（GHz）
+    f_high: float
+    table: Optional[dielectric.DielectricTable]
+    record: Dict[str, Any]  # 源数据记录
+
+    def properties(self, frequency) -> Tuple[np.ndarray, np.ndarray]:
+        """频率（GHz，可为数组） -> (er, loss_tangent)"""
+        f = np.asarray(frequency, dtype=float) * 1e9
+        if self.table is not None:
+            return self.table(f)
+        return dielectric.wideband_debye(f, self.er, self.loss_tangent, self.f_ref * 1e9,
+                                         self.f_low * 1e9, self.f_high * 1e9)
+
+    def model_inputs(self, frequency) -> Tuple[np.ndarray, np.ndarray]:
+        """各频点（GHz）作为模型 dielectric / loss_tangent 参数的等效值（见 method.dielectric.equivalent_anchor）"""
+        er, tand = self.properties(frequency)
+        return dielectric.equivalent_anchor(er, tand, np.asarray(frequency, dtype=float) * 1e9)
+
+    def summary(self) -> Dict[str, Any]:
+        return {'key': self.key, 'name': self.name, 'vendor': self.vendor, 'model': self.model,
+                'er': self.er, 'loss_tangent': self.loss_tangent, 'f_ref': self.f_ref}
+
+
+def parse_material(record: Dict[str, Any]) -> Material:
+    """校验源数据记录并解析为 Material（频率表模型在此建好插值对象）"""
+    if not isinstance(record, dict):
+        raise ValueError("材料记录必须是对象")
+    key = record.get('key')
+    if not isinstance(key, str) or not key.strip():
+        raise ValueError("材料记录缺少 key")
+    model = record.get('model', 'debye')
+    if model not in MATERIAL_MODELS:
+        raise ValueError(f"材料 {key} 的 model 必须是 {', '.join(MATERIAL_MODELS)} 之一，当前值: {model}")
+    name = str(record.get('name') or key)
+    vendor = str(record.get('vendor') or '')
+    try:
+        if model == 'table':
+            table = dielectric.DielectricTable(
+                np.asarray(record['frequency'], dtype=float) * 1e9, record['er'], record['loss_tangent'])
+            f_ref = float(record.get('f_ref', 1))
+            er, tand = (float(value) for value in table(f_ref * 1e9))
+            f_low, f_high = DIEL_F_LOW / 1e9, DIEL_F_HIGH / 1e9
+        else:
+            table = None
+            er, tand = float(record['er']), float(record['loss_tangent'])
+            f_ref = float(record.get('f_ref', 1))
+            f_low = float(record.get('f_low', DIEL_F_LOW / 1e9))
+            f_high = float(record.get('f_high', DIEL_F_HIGH / 1e9))
+            if not (er >= 1 and tand >= 0):
+                raise ValueError("er 必须≥1、loss_tangent 必须≥0")
+            if not 0 < f_low < f_ref < f_high:
+                raise ValueError("须满足 0 < f_low < f_ref < f_high")
+    except KeyError as e:
+        raise ValueError(f"材料 {key} 缺少字段: {e.args[0]}")
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"材料 {key} 定义错误: {e}")
+    return Material(key, name, vendor, model, er, tand, f_ref, f_low, f_high, table, record)
+
+
+def get_material(key: str) -> Material:
+    """
+    按键查询材料（进程内 LRU 缓存，未命中时查询材料库）
+
+    Raises:
+        ValueError: 材料库中不存在该材料
+    """
+    if not isinstance(key, str):
+        raise ValueError("material 必须是材料键（字符串）")
+    with _cache_lock:
+        material = _material_cache.get(key)
+        if material is not None:
+            _material_cache.move_to_end(key)
+            return material
+
+    row = _query("SELECT record FROM materials WHERE key = ?", (key,))
+    if not row:
+        raise ValueError(f"材料库中不存在材料: {key}")
+    material = parse_material(json.loads(row[0][0]))
+
+    with _cache_lock:
+        _material_cache[key] = material
+        _material_cache.move_to_end(key)
+        while len(_material_cache) > MATERIAL_CACHE_SIZE:
+            _material_cache.popitem(last=False)
+    return material
+
+
+def search_materials(query: str = '', vendor: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """按键或名称前缀（不区分大小写）与厂商检索材料，返回摘要列表（不解析材料）"""
+    try:
+        limit = int(limit)
+    except (ValueError, TypeError):
+        raise ValueError(f"limit 必须是整数，当前值: {limit}")
+    limit = max(1, min(limit, MAX_MATERIAL_SEARCH))
+    pattern = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    sql = ("SELECT key, name, vendor, model, er, loss_tangent, f_ref FROM materials "
+           "WHERE (key LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\')")
+    args = [pattern, pattern]
+    if vendor:
+        sql += " AND vendor = ? COLLATE NOCASE"
+        args.append(vendor)
+    sql += " ORDER BY key LIMIT ?"
+    args.append(limit)
+    columns = ('key', 'name', 'vendor', 'model', 'er', 'loss_tangent', 'f_ref')
+    return [dict(zip(columns, row)) for row in _query(sql, tuple(args))]
+
+
+def clear_material_cache() -> int:
+    """清空已解析材料的缓存并关闭材料库连接（重建库文件后调用），返回清除的条目数"""
+    global _connection, _connection_pid
+    with _cache_lock:
+        count = len(_material_cache)
+        _material_cache.clear()
+    with _connection_lock:
+        if _connection is not None and _connection_pid == os.getpid():
+            _connection.close()
+        _connection, _connection_pid = None, None
+    return count
+
+
+def load_source_records(paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """读取源数据（JSON 文件或目录，缺省为 MATERIAL_SOURCE_DIR）；文件内容为材料列表或 {"materials": [...]}"""
+    files = []
+    for path in paths or [MATERIAL_SOURCE_DIR]:
+        files.extend(sorted(glob.glob(os.path.join(path, '*.json'))) if os.path.isdir(path) else [path])
+    records = []
+    for file in files:
+        with open(file, encoding='utf-8') as f:
+            data = json.load(f)
+        records.extend(data['materials'] if isinstance(data, dict) else data)
+    return records
+
+
+def build_library(records: List[Dict[str, Any]], path: str = MATERIAL_LIBRARY) -> Dict[str, Any]:
+    """
+    校验全部记录并写入 SQLite 材料库（先写临时文件再原子替换，运行中的 worker 不会读到半成品）
+
+    Raises:
+        ValueError: 记录定义错误或材料键重复
+    """
+    materials, keys = [], set()
+    for record in records:
+        material = parse_material(record)
+        if material.key in keys:
+            raise ValueError(f"材料键重复: {material.key}")
+        keys.add(material.key)
+        materials.append(material)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.tmp{os.getpid()}"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    connection = sqlite3.connect(temporary)
+    try:
+        _populate(connection, materials)
+    finally:
+        connection.close()
+    os.replace(temporary, path)
+    return {'path': path, 'materials': len(materials), 'bytes': os.path.getsize(path)}
+
+
+def _populate(connection, materials):
+    connection.executescript(_SCHEMA)
+    connection.executemany(
+        "INSERT INTO materials VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(m.key, m.name, m.vendor, m.model, m.er, m.loss_tangent, m.f_ref,
+          json.dumps(m.record, ensure_ascii=False, separators=(',', ':'))) for m in materials],
+    )
+    connection.commit()
+
+
+def _query(sql, args):
+    with _connection_lock:
+        return _open().execute(sql, args).fetchall()
+
+
+def _open():
+    """本进程的材料库连接（调用方持有 _connection_lock）；库文件不存在时由源数据建内存库"""
+    global _connection, _connection_pid
+    if _connection is None or _connection_pid != os.getpid():
+        if os.path.exists(MATERIAL_LIBRARY):
+            _connection = sqlite3.connect(f"file:{MATERIAL_LIBRARY}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            _connection = sqlite3.connect(':memory:', check_same_thread=False)
+            _populate(_connection, [parse_material(record) for record in load_source_records()])
+        _connection_pid = os.getpid()
+    return _connection
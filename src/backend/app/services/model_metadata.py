@@ -0,0 +1,102 @@
+"""
+静态元数据响应 - 计算类型、表单字段定义与材料库只序列化一次
+
+这些数据只随代码（模型类定义、材料库）变化，每个响应体预先序列化为 JSON 字节串，
+并以内容的 SHA-256 作为强 ETag；另对全部响应体整体取哈希作为定义版本号（definitions_version），
+客户端据此判断模型定义是否变化。
+
+读取参数与结果定义需要导入全部模型模块，因此应用创建时只放入 LazyStaticPayloads，
+首次访问元数据端点（或紧凑响应需要定义版本号）时才序列化，不破坏模型的按需导入；
+预热了全部模型时（模块已导入）由 create_app 直接构建。
+
+结果字段定义（各模型在各计算引擎下的 resultDefinitions）以定义编号为键汇总为一个响应，
+供紧凑响应格式引用（见 app.utils.response_format）。
+"""
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, NamedTuple, Optional
+
+from app.utils.response_format import definitions_id
+
+from .model_form import get_calculation_types, form_definitions, normalize_model
+from .model_materials import substrate_materials
+from .models import MODEL_MAP
+
+
+class StaticPayload(NamedTuple):
+    """预先序列化的 JSON 响应体及其 ETag"""
+    body: bytes
+    etag: str
+
+
+class StaticPayloads(NamedTuple):
+    """全部静态元数据响应"""
+    calculation_types: StaticPayload
+    materials: StaticPayload
+    result_definitions: StaticPayload
+    form_fields: Dict[str, StaticPayload]
+    definitions_version: str
+
+    def form_fields_for(self, model) -> StaticPayload:
+        """指定模型的表单字段响应（兜底规则同 get_form_definitions）"""
+        return self.form_fields[normalize_model(model, self.form_fields)]
+
+
+def build_static_payloads() -> StaticPayloads:
+    """序列化全部静态元数据（会导入全部模型类以读取其参数定义）"""
+    form_fields = {model_type: _payload(definitions) for model_type, definitions in form_definitions().items()}
+    calculation_types = _payload(get_calculation_types())
+    materials = _payload(substrate_materials)
+    result_definitions = _payload(_result_definitions())
+
+    digest = hashlib.sha256()
+    for payload in (calculation_types, materials, result_definitions, *form_fields.values()):
+        digest.update(payload.etag.encode('ascii'))
+    return StaticPayloads(
+        calculation_types=calculation_types,
+        materials=materials,
+        result_definitions=result_definitions,
+        form_fields=form_fields,
+        definitions_version=digest.hexdigest()[:16],
+    )
+
+
+class LazyStaticPayloads:
+    """首次访问属性时构建 StaticPayloads（线程安全，只构建一次），属性访问转发给构建结果"""
+
+    def __init__(self, builder: Callable[[], StaticPayloads] = build_static_payloads):
+        self._builder = builder
+        self._payloads: Optional[StaticPayloads] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> StaticPayloads:
+        payloads = self._payloads
+        if payloads is None:
+            with self._lock:
+                if self._payloads is None:
+                    self._payloads = self._builder()
+                payloads = self._payloads
+        return payloads
+
+    @property
+    def built(self) -> bool:
+        return self._payloads is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+def _result_definitions():
+    """定义编号 -> 结果字段定义列表（全部模型、全部计算引擎；相同定义只出现一次）"""
+    definitions = {}
+    for model_class in MODEL_MAP.values():
+        for engine in model_class.supported_engines():
+            result_defs = model_class.result_definitions(engine)
+            definitions[definitions_id(result_defs)] = result_defs
+    return definitions
+
+
+def _payload(data) -> StaticPayload:
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return StaticPayload(body=body, etag=hashlib.sha256(body).hexdigest()[:32])
@@ -0,0 +1,131 @@
+"""
+灵敏度分析 - 各结果字段对各输入参数的偏导数（雅可比矩阵），批量中心差分
+
+每个参数取步长 h = ∛ε·max(|x|, |默认值|)（ε 为双精度机器精度，兼顾截断误差与舍入误差），
+全部 2K 个扰动点（K 为参数数）与名义点拼成参数列，一次向量化计算得到；扫频时每个频点各一组扰动，
+仍为一次计算。x - h 超出参数取值范围（如损耗角正切为0）时改用前向差分。
+
+同时给出归一化灵敏度（弹性系数）∂ln y / ∂ln x：参数变化 1% 时结果变化的百分数。
+"""
+import math
+
+import numpy as np
+
+from . import model_executor
+from .models import MODEL_MAP
+from .models.basic import FAST_ENGINE
+
+# 相对步长 ∛ε（中心差分误差最小）
+RELATIVE_STEP = float(np.finfo(float).eps) ** (1 / 3)
+# 偏导数输出的有效数字位数
+SENSITIVITY_DIGITS = 6
+
+
+def calculate_sensitivity(calc_type, params, sweep=None, keys=None, engine=None, timeout=None):
+    """
+    计算结果对参数的偏导数
+
+    Args:
+        calc_type: 模型类型标识符
+        params: 名义参数字典（缺省取 placeholder 默认值）
+        sweep: 扫频定义（可选），同 /calculate；给出时在每个频点计算一张灵敏度表
+        keys: 求导的参数名列表（可选），缺省为 PARAM_DEFINITIONS 中的全部参数
+        engine: 计算引擎（可选），缺省为模型的精确向量化引擎（优先 numpy）；
+                fast 引擎的插值误差远大于差分步长，不支持
+        timeout: CPU 时间预算（秒，可选），仅对进程池中的计算生效
+
+    Returns:
+        {"status", "engine", "params", "resultDefinitions", "inputs", "results", "sensitivity", "elasticity"}
+        （扫频时另含 "frequency"）；sensitivity / elasticity 为 结果名 -> {参数名 -> 偏导数}，
+        扫频时偏导数为与频点等长的列表
+
+    Raises:
+        ValueError: 不支持的计算类型、引擎、参数或扫频定义
+        CalculationTimeout: 进程池中的计算超出时间预算
+    """
+    if calc_type not in MODEL_MAP:
+        raise ValueError(f"不支持的计算类型: {calc_type}")
+    model_class = MODEL_MAP[calc_type]
+    if engine == FAST_ENGINE:
+        raise ValueError("灵敏度分析需要精确计算引擎，不支持 fast 引擎")
+    model_executor.resolve_budget(timeout)
+    base = model_class(params or {}, sweep, engine=engine or model_class.exact_engine())
+
+    validator = model_class.validator()
+    if keys is None:
+        keys = list(validator.keys)
+    elif not isinstance(keys, list) or not keys:
+        raise ValueError("keys 必须是非空的参数名列表")
+    for key in keys:
+        if key not in validator.defaults:
+            raise ValueError(f"模型 {calc_type} 不存在参数: {key}")
+
+    # 1. 名义点（每个频点一行）
+    points = base.frequencies.size
+    nominal = {key: np.full(points, value) for key, value in base.params.items()}
+    nominal['frequency'] = base.frequencies
+
+    # 2. 每个参数的正、负扰动块；x - h 超出取值范围的行以名义值代替（前向差分）
+    blocks, inputs = [nominal], []
+    for key in keys:
+        value = nominal[key]
+        step = RELATIVE_STEP * np.maximum(np.abs(value), abs(validator.defaults[key]) or 1.0)
+        plus, minus = value + step, value - step
+        forward = np.zeros(points, dtype=bool)
+        for bound in validator.bounds[key]:
+            forward |= bound.violated(minus)
+        minus = np.where(forward, value, minus)
+        blocks.append(dict(nominal, **{key: plus}))
+        blocks.append(dict(nominal, **{key: minus}))
+        inputs.append({
+            'key': key,
+            'step': _format(step, base.sweep),
+            'method': 'forward' if forward.any() else 'central',
+        })
+    columns = {key: np.concatenate([block[key] for block in blocks]) for key in nominal}
+
+    # 3. 一次向量化计算全部扰动点（行数较多时拆块分发到进程池）
+    outputs = model_executor.evaluate_columns(calc_type, columns, base.engine, timeout)
+
+    # 4. 差商
+    results, sensitivity, elasticity = {}, {}, {}
+    result_defs = model_class.result_definitions(base.engine)
+    for result_def in result_defs:
+        result_key = result_def['key']
+        if result_key not in outputs:
+            continue
+        values = outputs[result_key].reshape(len(blocks), points)
+        y = values[0]
+        results[result_key] = _format(y, base.sweep, result_def.get('precision'))
+        sensitivity[result_key], elasticity[result_key] = {}, {}
+        for index, key in enumerate(keys):
+            plus, minus = blocks[2 * index + 1][key], blocks[2 * index + 2][key]
+            derivative = (values[2 * index + 1] - values[2 * index + 2]) / (plus - minus)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                relative = np.where(y != 0, derivative * nominal[key] / y, np.nan)
+            sensitivity[result_key][key] = _format(derivative, base.sweep)
+            elasticity[result_key][key] = _format(relative, base.sweep)
+
+    response = {
+        'status': 'success',
+        'engine': base.engine,
+        'params': base.params,
+        'resultDefinitions': result_defs,
+        'inputs': inputs,
+        'results': results,
+        'sensitivity': sensitivity,
+        'elasticity': elasticity,
+    }
+    if base.sweep:
+        response['frequency'] = base.frequencies.tolist()
+    return response
+
+
+def _format(values, sweep, precision=None):
+    """单点返回标量、扫频返回列表；precision 为 None 时保留 SENSITIVITY_DIGITS 位有效数字，非有限值为 null"""
+    items = [
+        (round(value, precision) if precision is not None else float(f"{value:.{SENSITIVITY_DIGITS}g}"))
+        if math.isfinite(value) else None
+        for value in values.tolist()
+    ]
+    return items if sweep else items[0]
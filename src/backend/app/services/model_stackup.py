@@ -0,0 +1,275 @@
+"""
+叠层阻抗报告 - 一次请求计算整个叠层上所有走线类别的阻抗
+
+叠层描述（自上而下）：
+    {
+        "layers": [
+            {"name": "L1", "type": "signal", "copper_oz": 1,
+             "traces": [{"name": "SE50", "width": 0.12, "target": 50},
+                        {"name": "DIFF100", "width": 0.1, "spacing": 0.15, "target": 100}]},
+            {"name": "PP1", "type": "dielectric", "thickness": 0.1, "material": "FR4"},
+            {"name": "L2", "type": "plane", "copper_oz": 1},
+            ...
+        ]
+    }
+    - signal / plane 层：铜厚由 thickness（mm）或 copper_oz（盎司，1oz = 0.035mm）给出
+    - dielectric 层：thickness（mm），介电参数由 material（引用材料库）给出，dielectric / loss_tangent 可覆盖
+    - 走线类别：width，给出 spacing 为差分对；可选 target（目标阻抗，Ω）与 tolerance（允许偏差，%）
+
+每个信号层只解析一次几何量（上下参考平面、介质厚度、按厚度加权的介电常数与损耗角正切），
+并据此选择模型：单侧参考为（差分）微带线，两侧参考的单端走线一律按非对称带状线（上下介质厚度分别给出）计算，
+两侧参考的差分走线为差分带状线。
+全部走线类别汇总为一次批量计算（按模型类型分组向量化，大叠层经进程池并行）。
+"""
+import os
+
+from .model_calculate import calculate_batch
+from .model_materials import substrate_materials
+from .models import MODEL_MAP
+
+# 1 盎司铜厚（mm）
+COPPER_OZ_MM = 0.035
+# 目标阻抗的默认允许偏差（%）
+DEFAULT_TOLERANCE = 10.0
+# 单个叠层允许的最大层数与走线类别总数
+MAX_STACKUP_LAYERS = int(os.environ.get('ZCAL_MAX_STACKUP_LAYERS', 64))
+MAX_STACKUP_TRACES = int(os.environ.get('ZCAL_MAX_STACKUP_TRACES', 2000))
+LAYER_TYPES = ('signal', 'plane', 'dielectric')
+# 报告表中的结果列（按此顺序，存在于任一模型结果中的列才输出）
+REPORT_RESULT_KEYS = ('impedance', 'single_ended_impedance', 'er_eff', 'effective_width',
+                      'coupling_coefficient', 'asymmetry_factor', 'loss_db_per_mm')
+
+
+def calculate_stackup(stackup, frequency=1, engine=None, timeout=None):
+    """
+    计算叠层上全部走线类别的阻抗
+
+    Args:
+        stackup: 叠层描述（见模块说明）
+        frequency: 计算频率（GHz）
+        engine: 计算引擎（可选），对全部走线生效
+        timeout: CPU 时间预算（秒，可选），仅对进程池中的计算生效
+
+    Returns:
+        {"status", "frequency", "layers", "columns", "rows", "summary"}；rows 按层与走线顺序排列，
+        每行含层名、走线名、所用模型、计算参数、结果列及目标阻抗判定，单行错误不影响其他行
+
+    Raises:
+        ValueError: 叠层描述不合法
+        CalculationTimeout: 进程池中的计算超出时间预算
+    """
+    layers = _parse_layers(stackup)
+    try:
+        frequency = float(frequency)
+    except (ValueError, TypeError):
+        raise ValueError("frequency 必须是数字")
+
+    # 1. 逐个信号层解析几何量（同层走线共用），生成计算条目
+    rows, items = [], []
+    for index, layer in enumerate(layers):
+        if layer['type'] != 'signal' or not layer['traces']:
+            continue
+        geometry = _layer_geometry(layers, index)
+        for trace in layer['traces']:
+            row, params, calc_type = _trace_row(layer, trace, geometry)
+            rows.append(row)
+            if calc_type is None:
+                items.append(None)
+                continue
+            row['model'] = calc_type
+            row['params'] = dict(params, frequency=frequency)
+            items.append({'type': calc_type, 'params': row['params']})
+    if len(rows) > MAX_STACKUP_TRACES:
+        raise ValueError(f"走线类别总数不能超过 {MAX_STACKUP_TRACES}，当前: {len(rows)}")
+
+    # 2. 一次批量计算全部走线
+    positions = [position for position, item in enumerate(items) if item is not None]
+    results = calculate_batch([items[position] for position in positions], engine, timeout)
+    for position, result in zip(positions, results):
+        _fill_row(rows[position], result)
+
+    used = {row['model'] for row in rows if row.get('model')}
+    return {
+        'status': 'success',
+        'frequency': frequency,
+        'layers': [
+            {key: layer[key] for key in ('name', 'type', 'thickness', 'dielectric', 'loss_tangent') if key in layer}
+            for layer in layers
+        ],
+        'total_thickness': round(sum(layer['thickness'] for layer in layers), 4),
+        'columns': _report_columns(used),
+        'rows': rows,
+        'summary': {
+            'traces': len(rows),
+            'errors': sum(1 for row in rows if row['status'] != 'success'),
+            'out_of_tolerance': sum(1 for row in rows if row.get('within_tolerance') is False),
+        },
+    }
+
+
+def _parse_layers(stackup):
+    """校验叠层描述，返回规范化的层列表（铜厚与介电参数均已解析为浮点数）"""
+    if not isinstance(stackup, dict):
+        raise ValueError("stackup 必须是对象")
+    layers = stackup.get('layers')
+    if not isinstance(layers, list) or not layers:
+        raise ValueError("stackup.layers 必须是非空列表")
+    if len(layers) > MAX_STACKUP_LAYERS:
+        raise ValueError(f"叠层层数不能超过 {MAX_STACKUP_LAYERS}，当前: {len(layers)}")
+
+    parsed = []
+    for index, layer in enumerate(layers):
+        if not isinstance(layer, dict):
+            raise ValueError(f"第 {index + 1} 层必须是对象")
+        name = str(layer.get('name') or f"#{index + 1}")
+        layer_type = layer.get('type')
+        if layer_type not in LAYER_TYPES:
+            raise ValueError(f"层 {name} 的 type 必须是 {', '.join(LAYER_TYPES)} 之一，当前值: {layer_type}")
+
+        entry = {'name': name, 'type': layer_type}
+        if layer_type == 'dielectric':
+            entry['thickness'] = _number(layer, 'thickness', name, positive=True)
+            material = layer.get('material')
+            if material is not None and material not in substrate_materials:
+                raise ValueError(f"层 {name} 引用了不存在的材料: {material}")
+            defaults = substrate_materials.get(material, {})
+            for key, default_key in (('dielectric', 'er'), ('loss_tangent', 'loss_tangent')):
+                if key in layer:
+                    entry[key] = _number(layer, key, name)
+                elif default_key in defaults:
+                    entry[key] = float(defaults[default_key])
+                else:
+                    raise ValueError(f"层 {name} 缺少 material 或 {key}")
+        else:
+            if 'thickness' in layer:
+                entry['thickness'] = _number(layer, 'thickness', name, positive=True)
+            elif 'copper_oz' in layer:
+                entry['thickness'] = _number(layer, 'copper_oz', name, positive=True) * COPPER_OZ_MM
+            else:
+                entry['thickness'] = COPPER_OZ_MM
+            traces = layer.get('traces') or []
+            if layer_type == 'plane' and traces:
+                raise ValueError(f"参考平面层 {name} 不能定义走线")
+            if not isinstance(traces, list):
+                raise ValueError(f"层 {name} 的 traces 必须是列表")
+            entry['traces'] = traces
+        parsed.append(entry)
+    return parsed
+
+
+def _number(layer, key, name, positive=False):
+    try:
+        value = float(layer[key])
+    except KeyError:
+        raise ValueError(f"层 {name} 缺少 {key}")
+    except (ValueError, TypeError):
+        raise ValueError(f"层 {name} 的 {key} 必须是数字")
+    if positive and not value > 0:
+        raise ValueError(f"层 {name} 的 {key} 必须大于0，当前值: {value}")
+    return value
+
+
+def _layer_geometry(layers, index):
+    """
+    信号层几何量：向上、向下查找最近的参考平面，累计其间介质厚度并按厚度加权平均介电参数
+
+    Returns:
+        {"thickness", "above", "below", "dielectric", "loss_tangent"}；above / below 为到参考平面的介质厚度，
+        该侧没有参考平面时为 None
+    """
+    sides, span = {}, []
+    for side, step in (('above', -1), ('below', 1)):
+        height, dielectrics = 0.0, []
+        position = index + step
+        while 0 <= position < len(layers) and layers[position]['type'] != 'plane':
+            if layers[position]['type'] == 'dielectric':
+                height += layers[position]['thickness']
+                dielectrics.append(layers[position])
+            position += step
+        # 该侧有参考平面（且其间有介质）时计入几何量
+        if 0 <= position < len(layers) and height > 0:
+            sides[side] = height
+            span.extend(dielectrics)
+        else:
+            sides[side] = None
+
+    total = sum(layer['thickness'] for layer in span)
+    geometry = {'thickness': layers[index]['thickness'], **sides}
+    if total > 0:
+        geometry['dielectric'] = sum(layer['dielectric'] * layer['thickness'] for layer in span) / total
+        geometry['loss_tangent'] = sum(layer['loss_tangent'] * layer['thickness'] for layer in span) / total
+    return geometry
+
+
+def _trace_row(layer, trace, geometry):
+    """走线类别 -> (报告行, 模型参数, 模型类型)；无法确定模型时模型类型为 None，行内记录错误"""
+    name = str(trace.get('name') or '') if isinstance(trace, dict) else ''
+    row = {'layer': layer['name'], 'trace': name, 'status': 'success'}
+    if not isinstance(trace, dict):
+        row.update(status='error', message="走线类别必须是对象")
+        return row, None, None
+    if trace.get('target') is not None:
+        try:
+            row['target'] = float(trace['target'])
+            row['tolerance'] = float(trace.get('tolerance', DEFAULT_TOLERANCE))
+        except (ValueError, TypeError):
+            row.update(status='error', message="target / tolerance 必须是数字")
+            return row, None, None
+
+    above, below = geometry['above'], geometry['below']
+    if above is None and below is None:
+        row.update(status='error', message="信号层上下均没有参考平面")
+        return row, None, None
+    if trace.get('width') is None:
+        row.update(status='error', message="走线类别缺少 width")
+        return row, None, None
+
+    differential = trace.get('spacing') is not None
+    params = {
+        'width': trace.get('width'),
+        'thickness': geometry['thickness'],
+        'dielectric': geometry['dielectric'],
+        'loss_tangent': geometry['loss_tangent'],
+    }
+    if differential:
+        params['spacing'] = trace['spacing']
+
+    if above is None or below is None:
+        calc_type = 'differential_microstrip' if differential else 'microstrip'
+        params['height'] = above if below is None else below
+    elif differential:
+        # 差分带状线模型只支持对称结构：height 取上下两侧介质厚度之和（不含铜厚）
+        calc_type = 'differential_striplines'
+        params['height'] = above + below
+    else:
+        # 对称结构也走非对称带状线模型，避免上下厚度恰好相等时切换模型造成结果跳变
+        calc_type = 'asymmetric_stripline'
+        params['height1'] = above
+        params['height2'] = below
+    return row, params, calc_type
+
+
+def _fill_row(row, result):
+    """把单项计算结果写入报告行，并按目标阻抗判定是否在允许偏差内"""
+    if result.get('status') != 'success':
+        row.update(status='error', message=result.get('message'))
+        return
+    for key in REPORT_RESULT_KEYS:
+        if key in result:
+            row[key] = result[key]
+
+    target = row.get('target')
+    if not target:
+        return
+    deviation = (float(row['impedance']) - target) / target * 100
+    row['deviation_percent'] = round(deviation, 2)
+    row['within_tolerance'] = abs(deviation) <= row['tolerance']
+
+
+def _report_columns(used):
+    """报告表的结果列定义（label / unit / precision 取自首个包含该列的模型）"""
+    definitions = {}
+    for calc_type in sorted(used):
+        for result_def in MODEL_MAP[calc_type].RESULT_DEFINITIONS:
+            definitions.setdefault(result_def['key'], result_def)
+    return [definitions[key] for key in REPORT_RESULT_KEYS if key in definitions]
@@ -0,0 +1,225 @@
+"""
+参数网格扫描 - 对任意参数子集做笛卡尔积扫描，单次向量化计算得到N维结果数组
+"""
+import os
+from typing import Any, Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from . import model_executor
+from .models import MODEL_MAP
+from .models.validation import format_errors
+
+# 单次网格扫描允许的最大网格点数
+MAX_GRID_POINTS = int(os.environ.get('ZCAL_MAX_GRID_POINTS', 250000))
+# 流式网格扫描（NDJSON）允许的最大网格点数：逐块计算与输出，内存占用与总点数无关；
+# 实际输出还受总墙钟预算 ZCAL_STREAM_WALL_BUDGET 限制（见 model_executor.budgeted_chunks）
+MAX_STREAM_GRID_POINTS = int(os.environ.get('ZCAL_MAX_STREAM_GRID_POINTS', 5000000))
+# 流式输出每块的网格点数
+STREAM_CHUNK_POINTS = int(os.environ.get('ZCAL_STREAM_CHUNK_POINTS', 10000))
+
+
+class GridPlan(NamedTuple):
+    """校验后的网格扫描定义"""
+    calc_type: str
+    model_class: Any
+    base: Any
+    param_defs: Dict[str, Dict[str, Any]]
+    axis_values: Dict[str, np.ndarray]
+    shape: Tuple[int, ...]
+    total: int
+
+
+def calculate_grid(calc_type, params, axes, engine=None, timeout=None):
+    """
+    参数网格扫描
+
+    Args:
+        calc_type: 模型类型标识符
+        params: 固定参数字典（未扫描的参数，缺省取 placeholder 默认值）
+        axes: 扫描轴定义，参数名 -> 数值列表 或 {"start", "stop", "points"}；
+              轴的顺序即结果数组的维度顺序
+        engine: 计算引擎（可选），skrf、numpy 或 fast
+        timeout: CPU 时间预算（秒，可选），仅对进程池中的计算生效；
+                 启用进程池且网格点数达到 ZCAL_POOL_MIN_GRID_POINTS 时拆块并行计算
+
+    Returns:
+        {"status", "resultDefinitions", "axes", "shape", "params", "results"}，
+        results 中每个结果字段为形状等于 shape 的嵌套列表
+
+    Raises:
+        ValueError: 不支持的计算类型、轴定义或参数错误
+        CalculationTimeout: 进程池中的计算超出时间预算
+    """
+    plan = _prepare_grid(calc_type, params, axes, engine, timeout, MAX_GRID_POINTS)
+    model_class, shape, total = plan.model_class, plan.shape, plan.total
+
+    # 一次向量化计算（大网格拆块分发到进程池）
+    outputs = model_executor.evaluate_columns(calc_type, _grid_columns(plan, np.arange(total)), plan.base.engine,
+                                              timeout)
+
+    # 组织结果
+    results = {}
+    for result_def in model_class.result_definitions(plan.base.engine):
+        key = result_def['key']
+        if key in outputs:
+            results[key] = _to_nested_list(outputs[key].reshape(shape), result_def.get('precision'))
+
+    response = _grid_header(plan)
+    response['results'] = results
+    # fast 引擎：逐点插值误差估计（回退精确计算的点为 null）
+    if 'error_bound' in outputs:
+        response['error_bound'] = _to_nested_list(outputs['error_bound'].reshape(shape), None)
+    return response
+
+
+def stream_grid(calc_type, params, axes, engine=None, timeout=None, chunk_size=None):
+    """
+    流式参数网格扫描：校验立即完成（错误直接抛出），计算按块进行，返回记录生成器
+
+    生成的记录依次为：
+        {"event": "header", "status", "engine", "resultDefinitions", "axes", "shape", "params", "chunk_size"}
+        {"event": "chunk", "offset", "count", "results": {结果名: 扁平列表}[, "error_bound"]}  （多条）
+        {"event": "end", "count"}
+    chunk 中的扁平列表按 C 顺序（最后一个轴变化最快）对应从 offset 开始的网格点。
+
+    Args:
+        chunk_size: 每块的网格点数（可选），缺省为 ZCAL_STREAM_CHUNK_POINTS，不超过 ZCAL_MAX_GRID_POINTS
+        其余参数同 calculate_grid；timeout 为每一块的 CPU 时间预算（启用进程池时生效），
+        整个流另受总墙钟预算 ZCAL_STREAM_WALL_BUDGET 限制，超出时生成器抛出 CalculationTimeout
+
+    Raises:
+        ValueError: 不支持的计算类型、轴定义或参数错误
+    """
+    plan = _prepare_grid(calc_type, params, axes, engine, timeout, MAX_STREAM_GRID_POINTS)
+    chunk_size = parse_chunk_size(chunk_size, STREAM_CHUNK_POINTS, MAX_GRID_POINTS)
+    return _stream_chunks(plan, chunk_size, timeout)
+
+
+def _prepare_grid(calc_type, params, axes, engine, timeout, max_points):
+    """校验模型类型、固定参数与各扫描轴，返回 GridPlan"""
+    if calc_type not in MODEL_MAP:
+        raise ValueError(f"不支持的计算类型: {calc_type}")
+    if not isinstance(axes, dict) or not axes:
+        raise ValueError("axes 必须是非空对象")
+
+    model_executor.resolve_budget(timeout)
+    model_class = MODEL_MAP[calc_type]
+    # 固定参数校验 + 默认值填充
+    base = model_class(params or {}, engine=engine)
+
+    param_defs = {param_def['key']: param_def for param_def in model_class.PARAM_DEFINITIONS}
+    axis_values = {}
+    for key, spec in axes.items():
+        if key not in param_defs:
+            raise ValueError(f"模型 {calc_type} 不存在参数: {key}")
+        values = _parse_axis(key, spec)
+        errors = model_class.validator().check_array(key, values)
+        if errors:
+            raise ValueError(f"扫描轴 {key} 中 {format_errors(errors)}")
+        axis_values[key] = values
+
+    shape = tuple(len(values) for values in axis_values.values())
+    total = int(np.prod(shape))
+    if total > max_points:
+        raise ValueError(f"网格点数不能超过 {max_points}，当前: {total}")
+    return GridPlan(calc_type, model_class, base, param_defs, axis_values, shape, total)
+
+
+def _grid_header(plan):
+    """网格扫描响应中与结果无关的部分"""
+    return {
+        'status': 'success',
+        'engine': plan.base.engine,
+        'resultDefinitions': plan.model_class.result_definitions(plan.base.engine),
+        'axes': [
+            {'key': key, 'label': plan.param_defs[key].get('label', key), 'values': values.tolist()}
+            for key, values in plan.axis_values.items()
+        ],
+        'shape': list(plan.shape),
+        'params': {key: value for key, value in plan.base.params.items() if key not in plan.axis_values},
+    }
+
+
+def _grid_columns(plan, rows):
+    """网格点（按 C 顺序展平的下标）-> 参数列；只构造所需的行，不生成整个网格"""
+    coordinates = np.unravel_index(rows, plan.shape)
+    columns = {key: np.full(len(rows), value) for key, value in plan.base.params.items()}
+    for (key, values), index in zip(plan.axis_values.items(), coordinates):
+        columns[key] = values[index]
+    return columns
+
+
+def _stream_chunks(plan, chunk_size, timeout):
+    """逐块计算网格并生成 NDJSON 记录（同一时刻只保留一块的参数与结果；超出总墙钟预算时中止）"""
+    header = _grid_header(plan)
+    header['chunk_size'] = chunk_size
+    yield {'event': 'header', **header}
+
+    for offset in model_executor.budgeted_chunks(range(0, plan.total, chunk_size)):
+        rows = np.arange(offset, min(offset + chunk_size, plan.total))
+        outputs = model_executor.evaluate_columns(plan.calc_type, _grid_columns(plan, rows), plan.base.engine,
+                                                  timeout)
+
+        results = {}
+        for result_def in plan.model_class.result_definitions(plan.base.engine):
+            key = result_def['key']
+            if key in outputs:
+                results[key] = _to_nested_list(outputs[key], result_def.get('precision'))
+        record = {'event': 'chunk', 'offset': offset, 'count': len(rows), 'results': results}
+        if 'error_bound' in outputs:
+            record['error_bound'] = _to_nested_list(outputs['error_bound'], None)
+        yield record
+
+    yield {'event': 'end', 'count': plan.total}
+
+
+def parse_chunk_size(value, default, maximum):
+    """解析请求给出的块大小（缺省取 default，超过 maximum 时取 maximum）"""
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except (ValueError, TypeError):
+        raise ValueError("chunk_size 必须是整数")
+    if value < 1:
+        raise ValueError(f"chunk_size 必须≥1，当前值: {value}")
+    return min(value, maximum)
+
+
+def _parse_axis(key, spec):
+    """解析单个扫描轴：数值列表或 {"start", "stop", "points"}（线性分布）"""
+    if isinstance(spec, dict):
+        try:
+            start = float(spec['start'])
+            stop = float(spec['stop'])
+            points = int(spec['points'])
+        except KeyError as e:
+            raise ValueError(f"扫描轴 {key} 缺少字段: {e.args[0]}")
+        except (ValueError, TypeError):
+            raise ValueError(f"扫描轴 {key} 的 start/stop/points 必须是数字")
+        if points < 1:
+            raise ValueError(f"扫描轴 {key} 的点数必须≥1，当前值: {points}")
+        values = np.linspace(start, stop, points)
+    elif isinstance(spec, list):
+        try:
+            values = np.asarray(spec, dtype=float).ravel()
+        except (ValueError, TypeError):
+            raise ValueError(f"扫描轴 {key} 必须是数字列表")
+    else:
+        raise ValueError(f"扫描轴 {key} 必须是数值列表或 {{start, stop, points}} 对象")
+
+    if values.size == 0:
+        raise ValueError(f"扫描轴 {key} 不能为空")
+    if not np.all(np.isfinite(values)):
+        raise ValueError(f"扫描轴 {key} 包含非法数值")
+    return values
+
+
+def _to_nested_list(values, precision):
+    """按 precision 取整并转换为嵌套列表，非有限值输出为 null"""
+    if precision is not None:
+        values = np.round(values, precision)
+    if np.all(np.isfinite(values)):
+        return values.tolist()
+    return np.where(np.isfinite(values), values, None).tolist()
@@ -0,0 +1,259 @@
+"""
+阻抗综合 - 给定目标阻抗，反解指定几何参数（线宽、间距、缝隙、内径等）
+
+先用一次向量化粗扫描得到目标量随自由参数的变化曲线并定位括号区间，
+再在括号内用 Brent 法求根。粗扫描结果按叠层（除自由参数外的全部参数）缓存，
+同一叠层的后续请求直接复用括号，只需 Brent 迭代的少量正向计算。
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import model_executor
+from .models import MODEL_MAP
+
+# 单次请求允许的最大目标数
+MAX_SYNTHESIS_TARGETS = int(os.environ.get('ZCAL_MAX_SYNTHESIS_TARGETS', 1000))
+# 括号缓存条目数上限（按叠层）
+BRACKET_CACHE_SIZE = int(os.environ.get('ZCAL_BRACKET_CACHE_SIZE', 256))
+# 粗扫描点数与默认搜索跨度（当前值的 1/SPAN ~ SPAN 倍，对数分布）
+SCAN_POINTS = 41
+SCAN_SPAN = 100.0
+# 启用进程池时，目标数达到该值才把求根分发到进程池
+POOL_MIN_TARGETS = int(os.environ.get('ZCAL_POOL_MIN_SYNTHESIS_TARGETS', 50))
+# Brent 法最大迭代次数与容差
+BRENT_MAXITER = 50
+BRENT_XTOL = 1e-12
+BRENT_RTOL = 1e-10
+
+_bracket_cache = OrderedDict()
+_bracket_lock = threading.Lock()
+
+
+def synthesize(calc_type, params, free_param, targets, target_key='impedance', bounds=None, engine=None,
+               timeout=None):
+    """
+    阻抗综合：求解使 target_key 等于目标值的自由参数取值
+
+    Args:
+        calc_type: 模型类型标识符
+        params: 叠层及其余固定参数（缺省取 placeholder 默认值）
+        free_param: 待求解的参数名（须在模型 PARAM_DEFINITIONS 中）
+        targets: 目标值或目标值列表
+        target_key: 目标结果字段，默认 impedance
+        bounds: 可选的搜索范围 [下限, 上限]，缺省为自由参数当前值的 1/100 ~ 100 倍
+        engine: 计算引擎（可选），skrf、numpy、fast 或 coupled（差分对模型，可综合奇/偶模阻抗）
+        timeout: CPU 时间预算（秒，可选），仅对进程池中的求根生效
+
+    Returns:
+        {"status", "type", "engine", "free_param", "target_key", "params", "bounds", "warm_start",
+         "scan_evaluations", "solutions"}，
+        solutions 与 targets 顺序一致
+
+    Raises:
+        ValueError: 不支持的计算类型、参数或目标定义
+        CalculationTimeout: 进程池中的求根超出时间预算
+    """
+    if calc_type not in MODEL_MAP:
+        raise ValueError(f"不支持的计算类型: {calc_type}")
+    model_executor.resolve_budget(timeout)
+    model_class = MODEL_MAP[calc_type]
+
+    param_keys = [param_def['key'] for param_def in model_class.PARAM_DEFINITIONS]
+    if free_param not in param_keys:
+        raise ValueError(f"模型 {calc_type} 不存在参数: {free_param}")
+    result_defs = {result_def['key']: result_def for result_def in model_class.result_definitions(engine)}
+    if target_key not in result_defs:
+        raise ValueError(f"模型 {calc_type} 不存在结果字段: {target_key}")
+
+    # 目标值（单个或列表）
+    target_list = targets if isinstance(targets, list) else [targets]
+    if not target_list:
+        raise ValueError("targets 不能为空")
+    if len(target_list) > MAX_SYNTHESIS_TARGETS:
+        raise ValueError(f"目标数不能超过 {MAX_SYNTHESIS_TARGETS}，当前: {len(target_list)}")
+    try:
+        target_values = [float(target) for target in target_list]
+    except (ValueError, TypeError):
+        raise ValueError("targets 必须是数字或数字列表")
+
+    # 固定参数校验 + 默认值填充
+    base = model_class(params or {}, engine=engine)
+    lower, upper = _resolve_bounds(base, free_param, bounds)
+
+    # 1. 粗扫描（按叠层缓存）
+    stackup_key = (
+        calc_type, base.engine, free_param, target_key, lower, upper,
+        tuple((key, value) for key, value in base.params.items() if key != free_param),
+    )
+    scan = _get_cached_scan(stackup_key)
+    warm_start = scan is not None
+    if scan is None:
+        xs = _scan_candidates(base, free_param, lower, upper)
+        scan = (xs, _evaluate(model_class, base.engine, base.params, free_param, target_key, xs))
+        _store_scan(stackup_key, scan)
+
+    # 2. 逐目标在括号内求根（粗扫描留在本进程以复用括号缓存，目标多时求根拆块分发到进程池）
+    precision = result_defs[target_key].get('precision')
+    if model_executor.pool_enabled() and len(target_values) >= POOL_MIN_TARGETS:
+        tasks = [
+            (calc_type, base.engine, base.params, free_param, target_key, chunk, scan, precision)
+            for chunk in model_executor.split(target_values)
+        ]
+        solutions = [solution for chunk in model_executor.run_many(_solve_targets, tasks, timeout)
+                     for solution in chunk]
+    else:
+        solutions = _solve_targets(calc_type, base.engine, base.params, free_param, target_key,
+                                   target_values, scan, precision)
+
+    return {
+        'status': 'success',
+        'type': calc_type,
+        'engine': base.engine,
+        'free_param': free_param,
+        'target_key': target_key,
+        'params': {key: value for key, value in base.params.items() if key != free_param},
+        'bounds': [lower, upper],
+        'warm_start': warm_start,
+        # 粗扫描消耗的正向计算次数（复用缓存时为0），solutions 中的 evaluations 为各目标 Brent 阶段的次数
+        'scan_evaluations': 0 if warm_start else len(scan[0]),
+        'solutions': solutions,
+    }
+
+
+def clear_bracket_cache():
+    """清空括号缓存"""
+    with _bracket_lock:
+        _bracket_cache.clear()
+
+
+def _resolve_bounds(base, free_param, bounds):
+    """确定搜索范围：优先使用请求给出的 bounds，否则以当前值为中心取对数跨度"""
+    if bounds is not None:
+        try:
+            lower, upper = (float(value) for value in bounds)
+        except (ValueError, TypeError):
+            raise ValueError("bounds 必须是 [下限, 上限] 数字对")
+    else:
+        current = base.params[free_param]
+        if current <= 0:
+            raise ValueError(f"参数 {free_param} 当前值为 {current}，请通过 bounds 指定搜索范围")
+        lower, upper = current / SCAN_SPAN, current * SCAN_SPAN
+
+    if not (np.isfinite(lower) and np.isfinite(upper)) or lower >= upper:
+        raise ValueError(f"搜索范围非法: [{lower}, {upper}]")
+    return lower, upper
+
+
+def _scan_candidates(base, free_param, lower, upper):
+    """生成粗扫描点（正数范围对数分布，否则线性分布），剔除不满足参数范围校验的点"""
+    if lower > 0:
+        xs = np.geomspace(lower, upper, SCAN_POINTS)
+    else:
+        xs = np.linspace(lower, upper, SCAN_POINTS)
+
+    invalid = list(base.validator().check_array(free_param, xs))
+    valid = np.delete(xs, invalid)
+    if len(valid) < 2:
+        raise ValueError(f"参数 {free_param} 在搜索范围内没有有效取值")
+    return valid
+
+
+def _evaluate(model_class, engine, base_params, free_param, target_key, xs):
+    """向量化正向计算；整体计算失败时逐点计算，失败点记为 NaN"""
+    columns = {key: np.full(len(xs), value) for key, value in base_params.items()}
+    columns[free_param] = np.asarray(xs, dtype=float)
+    try:
+        return model_class.evaluate_columns(columns, engine)[target_key]
+    except Exception:
+        values = np.full(len(xs), np.nan)
+        for i in range(len(xs)):
+            row = {key: column[i:i + 1] for key, column in columns.items()}
+            try:
+                values[i] = model_class.evaluate_columns(row, engine)[target_key][0]
+            except Exception:
+                continue
+        return values
+
+
+def _solve_targets(calc_type, engine, base_params, free_param, target_key, targets, scan, precision):
+    """逐目标求根（也作为进程池任务）"""
+    model_class = MODEL_MAP[calc_type]
+    return [
+        _solve_one(model_class, engine, base_params, free_param, target_key, target, scan, precision)
+        for target in targets
+    ]
+
+
+def _solve_one(model_class, engine, base_params, free_param, target_key, target, scan, precision):
+    """在粗扫描曲线上定位括号（取最接近当前值的交点），再用 Brent 法求根"""
+    xs, ys = scan
+    residual = ys - target
+    finite = np.isfinite(residual[:-1]) & np.isfinite(residual[1:])
+    crossings = np.nonzero(finite & (np.sign(residual[:-1]) * np.sign(residual[1:]) <= 0))[0]
+
+    if crossings.size == 0:
+        reachable = ys[np.isfinite(ys)]
+        span = f"[{reachable.min():.4g}, {reachable.max():.4g}]" if reachable.size else "无有效结果"
+        return {
+            'target': target,
+            'status': 'error',
+            'message': f"目标值 {target} 超出搜索范围内可达的 {target_key} 范围 {span}",
+            'evaluations': 0,
+        }
+
+    # 多个交点时取离当前值最近的括号
+    current = base_params[free_param]
+    nearest = crossings[np.argmin(np.abs(0.5 * (xs[crossings] + xs[crossings + 1]) - current))]
+    lower, upper = xs[nearest], xs[nearest + 1]
+
+    def objective(x):
+        return _evaluate(model_class, engine, base_params, free_param, target_key, np.array([x]))[0] - target
+
+    if residual[nearest] == 0:
+        value, function_calls = lower, 0
+    elif residual[nearest + 1] == 0:
+        value, function_calls = upper, 0
+    else:
+        # scipy.optimize 导入约 0.2s，只在首次综合请求时导入
+        from scipy.optimize import brentq
+        value, info = brentq(
+            objective, lower, upper,
+            xtol=BRENT_XTOL, rtol=BRENT_RTOL, maxiter=BRENT_MAXITER,
+            full_output=True, disp=False,
+        )
+        function_calls = info.function_calls
+        if not info.converged:
+            return {
+                'target': target,
+                'status': 'error',
+                'message': f"Brent 求根未在 {BRENT_MAXITER} 次迭代内收敛",
+                'evaluations': function_calls,
+            }
+
+    achieved = objective(value) + target
+    return {
+        'target': target,
+        'status': 'success',
+        'value': float(value),
+        'achieved': round(float(achieved), precision) if precision is not None else float(achieved),
+        'evaluations': function_calls + 1,
+    }
+
+
+def _get_cached_scan(key):
+    with _bracket_lock:
+        scan = _bracket_cache.get(key)
+        if scan is not None:
+            _bracket_cache.move_to_end(key)
+        return scan
+
+
+def _store_scan(key, scan):
+    with _bracket_lock:
+        _bracket_cache[key] = scan
+        _bracket_cache.move_to_end(key)
+        while len(_bracket_cache) > BRACKET_CACHE_SIZE:
+            _bracket_cache.popitem(last=False)
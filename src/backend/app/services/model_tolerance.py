@@ -0,0 +1,241 @@
+"""
+容差分析（蒙特卡洛） - 按制造容差对参数抽样，一次向量化计算全部样本，统计结果分布
+
+容差定义（参数名 -> 分布），未给出的参数固定为名义值：
+    {"distribution": "normal", "sigma": 0.005}          正态分布，标准差为绝对值
+    {"distribution": "normal", "sigma_percent": 3}      正态分布，标准差为名义值的百分比
+    {"distribution": "uniform", "delta": 0.01}          均匀分布，名义值 ± delta
+    {"distribution": "uniform", "delta_percent": 10}    均匀分布，名义值 ± 名义值的百分比
+抽样方式：random（独立随机）或 lhs（拉丁超立方，每个参数的样本在各分位区间内各取一个，再随机配对）。
+
+超出参数取值范围的样本（如负的线宽）不参与计算，计入 rejected；结果为非有限值的样本不计入该结果的统计。
+"""
+import math
+import os
+
+import numpy as np
+
+from . import model_executor
+from .models import MODEL_MAP
+
+# 单次分析允许的最大样本数与缺省样本数
+MAX_TOLERANCE_SAMPLES = int(os.environ.get('ZCAL_MAX_TOLERANCE_SAMPLES', 1000000))
+DEFAULT_TOLERANCE_SAMPLES = int(os.environ.get('ZCAL_TOLERANCE_SAMPLES', 10000))
+# 直方图分箱数（缺省值与上限）
+DEFAULT_HISTOGRAM_BINS = 50
+MAX_HISTOGRAM_BINS = 1000
+DISTRIBUTIONS = ('normal', 'uniform')
+SAMPLING_METHODS = ('random', 'lhs')
+# 目标阻抗的默认允许偏差（%）
+DEFAULT_TOLERANCE = 10.0
+# 输出的百分位数（0.135 / 99.865 对应 ±3σ）
+PERCENTILES = (0.135, 1, 5, 25, 50, 75, 95, 99, 99.865)
+
+
+def analyze_tolerance(calc_type, params, tolerances, samples=None, sampling='random', seed=None,
+                      bins=None, target=None, tolerance=None, engine=None, timeout=None):
+    """
+    蒙特卡洛容差分析
+
+    Args:
+        calc_type: 模型类型标识符
+        params: 名义参数字典（缺省取 placeholder 默认值）
+        tolerances: 参数名 -> 分布定义（见模块说明）
+        samples: 样本数（可选），缺省 ZCAL_TOLERANCE_SAMPLES，不超过 ZCAL_MAX_TOLERANCE_SAMPLES
+        sampling: random 或 lhs
+        seed: 随机种子（可选），给出时结果可复现
+        bins: 直方图分箱数（可选）
+        target: 目标阻抗（Ω，可选），给出时统计 impedance 落在 target ± tolerance% 内的良率
+        tolerance: 目标阻抗允许偏差（%），缺省 DEFAULT_TOLERANCE
+        engine: 计算引擎（可选），缺省为模型的精确向量化引擎（优先 numpy，可对全部参数广播）
+        timeout: CPU 时间预算（秒，可选），仅对进程池中的计算生效；
+                 启用进程池且样本数达到 ZCAL_POOL_MIN_GRID_POINTS 时拆块并行计算
+
+    Returns:
+        {"status", "engine", "samples", "sampling", "seed", "params", "tolerances", "nominal",
+         "valid", "rejected", "resultDefinitions", "statistics"[, "yield"]}；
+        statistics 为 结果名 -> {"mean", "std", "min", "max", "percentiles", "histogram"}
+
+    Raises:
+        ValueError: 不支持的计算类型、参数或容差定义
+        CalculationTimeout: 进程池中的计算超出时间预算
+    """
+    if calc_type not in MODEL_MAP:
+        raise ValueError(f"不支持的计算类型: {calc_type}")
+    model_class = MODEL_MAP[calc_type]
+    model_executor.resolve_budget(timeout)
+    base = model_class(params or {}, engine=engine or model_class.exact_engine())
+
+    specs = _parse_tolerances(model_class, base.params, tolerances)
+    samples = _parse_count(samples, 'samples', DEFAULT_TOLERANCE_SAMPLES, MAX_TOLERANCE_SAMPLES)
+    bins = _parse_count(bins, 'bins', DEFAULT_HISTOGRAM_BINS, MAX_HISTOGRAM_BINS)
+    if sampling not in SAMPLING_METHODS:
+        raise ValueError(f"sampling 必须是 {', '.join(SAMPLING_METHODS)} 之一，当前值: {sampling}")
+    if seed is not None:
+        try:
+            seed = int(seed)
+        except (ValueError, TypeError):
+            raise ValueError("seed 必须是整数")
+    spec_limits = _parse_target(target, tolerance)
+
+    # 1. 抽样，剔除超出参数取值范围的样本
+    rng = np.random.default_rng(seed)
+    columns = {key: np.full(samples, value) for key, value in base.params.items()}
+    columns.update(_draw(specs, samples, sampling, rng))
+    valid = np.ones(samples, dtype=bool)
+    validator = model_class.validator()
+    for key in specs:
+        invalid = list(validator.check_array(key, columns[key]))
+        valid[invalid] = False
+    if not valid.any():
+        raise ValueError(f"全部 {samples} 个样本均超出参数取值范围，请减小容差")
+    if not valid.all():
+        columns = {key: values[valid] for key, values in columns.items()}
+    count = int(valid.sum())
+
+    # 2. 一次向量化计算全部样本（大样本拆块分发到进程池）
+    outputs = model_executor.evaluate_columns(calc_type, columns, base.engine, timeout)
+    nominal = model_class.evaluate_columns({key: np.array([value]) for key, value in base.params.items()},
+                                           base.engine)
+
+    # 3. 统计
+    statistics, nominal_results = {}, {}
+    result_defs = model_class.result_definitions(base.engine)
+    for result_def in result_defs:
+        key = result_def['key']
+        if key not in outputs:
+            continue
+        precision = result_def.get('precision')
+        nominal_results[key] = _round(float(nominal[key][0]), precision)
+        statistics[key] = _statistics(outputs[key], bins, precision)
+
+    response = {
+        'status': 'success',
+        'engine': base.engine,
+        'samples': samples,
+        'sampling': sampling,
+        'seed': seed,
+        'params': base.params,
+        'tolerances': specs,
+        'nominal': nominal_results,
+        'valid': count,
+        'rejected': samples - count,
+        'resultDefinitions': result_defs,
+        'statistics': statistics,
+    }
+    if spec_limits is not None:
+        if 'impedance' not in outputs:
+            raise ValueError(f"模型 {calc_type} 没有 impedance 结果，不能计算良率")
+        target, tolerance = spec_limits
+        low, high = target * (1 - tolerance / 100), target * (1 + tolerance / 100)
+        impedance = outputs['impedance']
+        response['yield'] = {
+            'target': target, 'tolerance': tolerance, 'low': round(low, 4), 'high': round(high, 4),
+            # 良率以全部样本为分母（超出参数范围的样本视为不合格）
+            'fraction': round(float(np.count_nonzero((impedance >= low) & (impedance <= high))) / samples, 6),
+        }
+    return response
+
+
+def _parse_tolerances(model_class, nominal, tolerances):
+    """校验容差定义，返回 参数名 -> {"distribution", "nominal", "sigma" | "delta"}（绝对值）"""
+    if not isinstance(tolerances, dict) or not tolerances:
+        raise ValueError("tolerances 必须是非空对象")
+    specs = {}
+    for key, spec in tolerances.items():
+        if key not in nominal:
+            raise ValueError(f"模型 {model_class.TYPE} 不存在参数: {key}")
+        if not isinstance(spec, dict):
+            raise ValueError(f"参数 {key} 的容差定义必须是对象")
+        distribution = spec.get('distribution', 'normal')
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"参数 {key} 的 distribution 必须是 {', '.join(DISTRIBUTIONS)} 之一，当前值: {distribution}")
+
+        width_key = 'sigma' if distribution == 'normal' else 'delta'
+        percent_key = f'{width_key}_percent'
+        if (width_key in spec) == (percent_key in spec):
+            raise ValueError(f"参数 {key} 的容差须给出 {width_key} 或 {percent_key} 之一")
+        try:
+            width = float(spec[width_key] if width_key in spec else spec[percent_key])
+        except (ValueError, TypeError):
+            raise ValueError(f"参数 {key} 的 {width_key} / {percent_key} 必须是数字")
+        if not (math.isfinite(width) and width >= 0):
+            raise ValueError(f"参数 {key} 的 {width_key} / {percent_key} 必须≥0，当前值: {width}")
+        if percent_key in spec:
+            width = abs(nominal[key]) * width / 100
+        specs[key] = {'distribution': distribution, 'nominal': nominal[key], width_key: width}
+    return specs
+
+
+def _parse_count(value, name, default, maximum):
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"{name} 必须是整数")
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{name} 必须在 1-{maximum} 之间，当前值: {value}")
+    return value
+
+
+def _parse_target(target, tolerance):
+    """目标阻抗与允许偏差（%，缺省 10） -> (target, tolerance)；未给出 target 时返回 None"""
+    if target is None:
+        return None
+    try:
+        target = float(target)
+        tolerance = DEFAULT_TOLERANCE if tolerance is None else float(tolerance)
+    except (ValueError, TypeError):
+        raise ValueError("target / tolerance 必须是数字")
+    if not (target > 0 and tolerance >= 0):
+        raise ValueError(f"target 必须大于0、tolerance 必须≥0，当前值: {target}, {tolerance}")
+    return target, tolerance
+
+
+def _draw(specs, samples, sampling, rng):
+    """按分布抽样：先得到 (0, 1) 上的均匀分位数，再经逆分布函数变换"""
+    from scipy.special import ndtri
+
+    columns = {}
+    for key, spec in specs.items():
+        if sampling == 'lhs':
+            # 每个分位区间 [i/n, (i+1)/n) 恰取一个样本，区间顺序随机打乱（各参数独立打乱即随机配对）
+            quantiles = (rng.permutation(samples) + rng.random(samples)) / samples
+        else:
+            quantiles = rng.random(samples)
+        if spec['distribution'] == 'normal':
+            # random() 可能取到 0，限制在开区间内避免 ndtri 返回 -inf
+            quantiles = np.clip(quantiles, 1e-12, 1 - 1e-12)
+            columns[key] = spec['nominal'] + spec['sigma'] * ndtri(quantiles)
+        else:
+            columns[key] = spec['nominal'] + spec['delta'] * (2 * quantiles - 1)
+    return columns
+
+
+def _statistics(values, bins, precision):
+    """单个结果的分布统计（忽略非有限值）；统计量比结果本身多保留两位小数"""
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return None
+    digits = None if precision is None else precision + 2
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        'count': int(values.size),
+        'mean': _round(float(values.mean()), digits),
+        'std': _round(float(values.std(ddof=1)) if values.size > 1 else 0.0, digits),
+        'min': _round(float(values.min()), digits),
+        'max': _round(float(values.max()), digits),
+        'percentiles': {
+            f'{q:g}': _round(value, digits)
+            for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist())
+        },
+        'histogram': {
+            'edges': edges.tolist() if digits is None else np.round(edges, digits).tolist(),
+            'counts': counts.tolist(),
+        },
+    }
+
+
+def _round(value, digits):
+    return value if digits is None else round(value, digits)
@@ -0,0 +1,182 @@
+"""
+Touchstone 导出 - 由模型扫频结果生成一段传输线的 S 参数文件（.s2p / .s4p）
+
+每个频点由模型结果得到特征阻抗 Z0、有效介电常数与损耗，传播常数 γ = α + jβ
+（α 由 loss_db_per_mm 换算，β = 2πf·√εeff / c），再按闭式公式计算长度为 l 的线段在参考阻抗 Zref 下的 S 参数：
+    Γ = (Z0 - Zref) / (Z0 + Zref)，P = exp(-γl)
+    S11 = S22 = Γ(1 - P²) / (1 - Γ²P²)，S21 = S12 = P(1 - Γ²) / (1 - Γ²P²)
+各引擎（skrf / numpy / fast）结果一致处理，全部为 NumPy 数组运算。
+
+差分模型（结果含 single_ended_impedance）输出 4 端口：奇模阻抗取差分阻抗的一半，偶模阻抗按
+Z_se² = Z_odd·Z_even 估算（两模式共用 εeff 与损耗），由偶/奇模二端口组合为单端 4 端口。
+端口顺序：1、2 为 P、N 线近端，3、4 为 P、N 线远端（1→3、2→4 为直通）。
+
+频点按块计算与格式化，生成器逐块返回文本，内存占用与总频点数无关；
+整个导出受流式响应的总墙钟预算限制（见 model_executor.budgeted_chunks）。
+"""
+import math
+import os
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from . import model_executor
+from .models import MODEL_MAP
+from .models.basic import parse_sweep
+
+# 单次导出允许的最大频点数
+MAX_TOUCHSTONE_POINTS = int(os.environ.get('ZCAL_MAX_TOUCHSTONE_POINTS', 100000))
+# 每块计算与格式化的频点数
+TOUCHSTONE_CHUNK_POINTS = int(os.environ.get('ZCAL_TOUCHSTONE_CHUNK_POINTS', 2000))
+# 数据格式：RI（实部/虚部）、MA（幅度/角度）、DB（dB 幅度/角度）
+TOUCHSTONE_FORMATS = ('RI', 'MA', 'DB')
+DEFAULT_REFERENCE_IMPEDANCE = 50.0
+# 真空光速（m/s）
+SPEED_OF_LIGHT = 299792458.0
+# dB -> Np
+NEPER_PER_DB = math.log(10) / 20
+
+
+def export_touchstone(calc_type, params, length, sweep, engine=None,
+                      reference_impedance=None, data_format='RI') -> Tuple[str, Iterator[str]]:
+    """
+    导出传输线段的 Touchstone 文件
+
+    参数校验立即完成（错误直接抛出），计算在遍历生成器时按块进行。
+
+    Args:
+        calc_type: 模型类型标识符
+        params: 模型参数字典（frequency 被 sweep 取代）
+        length: 线段物理长度（mm）
+        sweep: 扫频定义，{"start", "stop", "points"} 或 {"frequencies": [...]}（GHz），
+               最多 ZCAL_MAX_TOUCHSTONE_POINTS 个频点
+        engine: 计算引擎（可选）
+        reference_impedance: 端口参考阻抗（Ω，可选），缺省 50
+        data_format: RI、MA 或 DB
+
+    Returns:
+        (文件名, 文本块生成器)
+
+    Raises:
+        ValueError: 不支持的计算类型、参数、长度、扫频或格式
+    """
+    if calc_type not in MODEL_MAP:
+        raise ValueError(f"不支持的计算类型: {calc_type}")
+    model_class = MODEL_MAP[calc_type]
+    base = model_class(params or {}, engine=engine)
+
+    length_mm = _positive(length, "length")
+    z_ref = _positive(DEFAULT_REFERENCE_IMPEDANCE if reference_impedance is None else reference_impedance,
+                      "reference_impedance")
+    data_format = str(data_format or 'RI').upper()
+    if data_format not in TOUCHSTONE_FORMATS:
+        raise ValueError(f"format 必须是 {', '.join(TOUCHSTONE_FORMATS)} 之一，当前值: {data_format}")
+    frequencies = parse_sweep(sweep, MAX_TOUCHSTONE_POINTS)
+
+    result_keys = {result_def['key'] for result_def in model_class.RESULT_DEFINITIONS}
+    ports = 4 if 'single_ended_impedance' in result_keys else 2
+    filename = f"zcal_{calc_type}_{length_mm:g}mm.s{ports}p"
+    return filename, _generate(base, frequencies, length_mm / 1000, z_ref, data_format, ports)
+
+
+def _positive(value, name):
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"{name} 必须是数字")
+    if not (math.isfinite(value) and value > 0):
+        raise ValueError(f"{name} 必须大于0，当前值: {value}")
+    return value
+
+
+def _generate(base, frequencies, length_m, z_ref, data_format, ports):
+    """生成 Touchstone 文本：文件头，然后每块频点一段数据"""
+    params = ', '.join(f"{key}={value:g}" for key, value in base.params.items() if key != 'frequency')
+    yield (f"! Zcal {base.TYPE} ({base.engine}), length {length_m * 1000:g} mm\n"
+           f"! params: {params}\n")
+    if ports == 4:
+        yield "! ports: 1/2 = P/N near end, 3/4 = P/N far end\n"
+    yield f"# GHz S {data_format} R {z_ref:g}\n"
+
+    row_format = _row_format(ports)
+    for offset in model_executor.budgeted_chunks(range(0, frequencies.size, TOUCHSTONE_CHUNK_POINTS)):
+        chunk = frequencies[offset:offset + TOUCHSTONE_CHUNK_POINTS]
+        matrix = _s_parameters(base, chunk, length_m, z_ref, ports)
+        data = np.column_stack([chunk, _to_pairs(matrix, data_format)])
+        yield ''.join(row_format % tuple(row) for row in data.tolist())
+
+
+def _s_parameters(base, frequencies, length_m, z_ref, ports):
+    """一块频点的 S 参数，形状 (N, ports²)，按 Touchstone 数据顺序排列"""
+    model = type(base)._from_columns(dict(base.params, frequency=frequencies), base.engine)
+    result = model.evaluate()
+
+    def column(key):
+        return np.broadcast_to(np.asarray(result[key], dtype=float), frequencies.shape)
+
+    er_eff = column('er_eff')
+    alpha = column('loss_db_per_mm') * 1000 * NEPER_PER_DB
+    beta = 2 * np.pi * frequencies * 1e9 * np.sqrt(er_eff) / SPEED_OF_LIGHT
+    gamma_l = (alpha + 1j * beta) * length_m
+
+    if ports == 2:
+        s11, s21 = _line(column('impedance'), gamma_l, z_ref)
+        # 2 端口的 Touchstone 顺序为 S11 S21 S12 S22
+        return np.column_stack([s11, s21, s21, s11])
+
+    if 'odd_impedance' in result:
+        # 耦合线引擎直接给出两个模式的阻抗与有效介电常数（偶模相速不同，远端串扰不为0）
+        z_odd, z_even = column('odd_impedance'), column('even_impedance')
+        beta_even = 2 * np.pi * frequencies * 1e9 * np.sqrt(column('er_eff_even')) / SPEED_OF_LIGHT
+        gamma_even_l = (alpha + 1j * beta_even) * length_m
+    else:
+        z_odd = column('impedance') / 2
+        z_even = np.maximum(column('single_ended_impedance') ** 2 / z_odd, z_odd)
+        gamma_even_l = gamma_l
+    s11_even, s21_even = _line(z_even, gamma_even_l, z_ref)
+    s11_odd, s21_odd = _line(z_odd, gamma_l, z_ref)
+    reflect = (s11_even + s11_odd) / 2
+    next_ = (s11_even - s11_odd) / 2
+    thru = (s21_even + s21_odd) / 2
+    fext = (s21_even - s21_odd) / 2
+    # 4 端口按行输出：第 i 行为 Si1..Si4
+    return np.column_stack([
+        reflect, next_, thru, fext,
+        next_, reflect, fext, thru,
+        thru, fext, reflect, next_,
+        fext, thru, next_, reflect,
+    ])
+
+
+def _line(z0, gamma_l, z_ref):
+    """均匀传输线段（特征阻抗 z0、电长度 γl）在参考阻抗 z_ref 下的 (S11, S21)"""
+    reflection = (z0 - z_ref) / (z0 + z_ref)
+    propagation = np.exp(-gamma_l)
+    denominator = 1 - reflection ** 2 * propagation ** 2
+    s11 = reflection * (1 - propagation ** 2) / denominator
+    s21 = propagation * (1 - reflection ** 2) / denominator
+    return s11, s21
+
+
+def _to_pairs(matrix, data_format):
+    """复数 S 参数 -> 交错的实数对（RI：实部/虚部；MA：幅度/角度；DB：dB/角度）"""
+    pairs = np.empty((matrix.shape[0], matrix.shape[1] * 2))
+    if data_format == 'RI':
+        pairs[:, 0::2] = matrix.real
+        pairs[:, 1::2] = matrix.imag
+    else:
+        magnitude = np.abs(matrix)
+        if data_format == 'DB':
+            # 完全匹配时 |S| = 0，限制下界避免输出 -inf
+            magnitude = 20 * np.log10(np.maximum(magnitude, 1e-15))
+        pairs[:, 0::2] = magnitude
+        pairs[:, 1::2] = np.degrees(np.angle(matrix))
+    return pairs
+
+
+def _row_format(ports):
+    """一个频点的格式串：2 端口一行；4 端口每行一行矩阵（续行缩进）"""
+    pair = ' %.9g %.9g'
+    if ports == 2:
+        return '%.9g' + pair * 4 + '\n'
+    return '%.9g' + (pair * 4 + '\n') + ('   ' + pair * 4 + '\n') * 3
@@ -1,34 +1,122 @@
-"""导出所有传输线模型"""
-from .microstrip import Microstrip
-from .stripline import Stripline
-from .differential_microstrip import DifferentialMicrostrip
-from .coaxial import Coaxial
-from .cpw import CPW
-from .cpwg import CPWG
-from .asymmetric_stripline import AsymmetricStripline
-from .broadside_striplines import BroadsideStriplines
-from .differential_striplines import DifferentialStriplines
-from .differential_cpw import DifferentialCPW
-from .differential_cpwg import DifferentialCPWG
+"""导出所有传输线模型
 
+MODEL_MAP 是惰性注册表：模型模块在首次按类型取用时才导入（scikit-rf 由 basic.py 在
+skrf 引擎首次计算时导入），worker 启动只需加载注册表本身。需要在 gunicorn --preload
+的主进程里提前导入时，调用 MODEL_MAP.preload()（或设置 ZCAL_PREWARM_MODELS）。
+"""
+import importlib
+import threading
+import time
+from collections.abc import Mapping
 
-# 模型映射（路由层用）
-MODEL_MAP = {
-    "microstrip": Microstrip,
-    "stripline": Stripline,
-    "differential_microstrip": DifferentialMicrostrip,
-    "coaxial": Coaxial,
-    "cpw": CPW,
-    "cpwg": CPWG,
-    "asymmetric_stripline": AsymmetricStripline,
-    "broadside_striplines": BroadsideStriplines,
-    "differential_striplines": DifferentialStriplines,
-    "differential_cpw": DifferentialCPW,
-    "differential_cpwg": DifferentialCPWG
+# 模型类型 -> (模块名, 类名)，顺序即表单与类型列表的展示顺序
+MODEL_REGISTRY = {
+    "microstrip": ("microstrip", "Microstrip"),
+    "stripline": ("stripline", "Stripline"),
+    "differential_microstrip": ("differential_microstrip", "DifferentialMicrostrip"),
+    "coaxial": ("coaxial", "Coaxial"),
+    "cpw": ("cpw", "CPW"),
+    "cpwg": ("cpwg", "CPWG"),
+    "asymmetric_stripline": ("asymmetric_stripline", "AsymmetricStripline"),
+    "broadside_striplines": ("broadside_striplines", "BroadsideStriplines"),
+    "differential_striplines": ("differential_striplines", "DifferentialStriplines"),
+    "differential_cpw": ("differential_cpw", "DifferentialCPW"),
+    "differential_cpwg": ("differential_cpwg", "DifferentialCPWG"),
 }
 
+
+class LazyModelMap(Mapping):
+    """模型类型 -> 模型类的只读映射，按需导入模型模块并记录每个模块的导入耗时"""
+
+    def __init__(self, registry):
+        self._registry = registry
+        self._classes = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, calc_type):
+        model_class = self._classes.get(calc_type)
+        if model_class is None:
+            model_class = self._load(calc_type)
+        return model_class
+
+    def __contains__(self, calc_type):
+        # 只查注册表，不触发导入
+        return calc_type in self._registry
+
+    def __iter__(self):
+        return iter(self._registry)
+
+    def __len__(self):
+        return len(self._registry)
+
+    def _load(self, calc_type):
+        module_name, class_name = self._registry[calc_type]
+        with self._lock:
+            if calc_type not in self._classes:
+                started = time.perf_counter()
+                module = importlib.import_module(f"{__name__}.{module_name}")
+                self._classes[calc_type] = getattr(module, class_name)
+                self._timings[calc_type] = time.perf_counter() - started
+            return self._classes[calc_type]
+
+    def is_loaded(self, calc_type):
+        """模型模块是否已导入"""
+        return calc_type in self._classes
+
+    def preload(self, calc_types=None, warm=True):
+        """
+        预先导入模型（缺省全部），warm 为 True 时再以默认参数计算一次，
+        把默认引擎的依赖（如 scikit-rf）也一并导入
+
+        Returns:
+            模型类型 -> 预热耗时（秒）
+
+        Raises:
+            ValueError: 未知的模型类型
+        """
+        calc_types = list(self._registry) if calc_types is None else list(calc_types)
+        unknown = [calc_type for calc_type in calc_types if calc_type not in self._registry]
+        if unknown:
+            raise ValueError(f"不支持的计算类型: {', '.join(unknown)}")
+
+        seconds = {}
+        for calc_type in calc_types:
+            started = time.perf_counter()
+            model_class = self[calc_type]
+            if warm:
+                model_class({}).get_result()
+            seconds[calc_type] = time.perf_counter() - started
+        return seconds
+
+    def import_report(self):
+        """各模型的导入状态与模块导入耗时（毫秒，未导入为 None）"""
+        return {
+            calc_type: {
+                'loaded': calc_type in self._classes,
+                'import_ms': round(self._timings[calc_type] * 1000, 2) if calc_type in self._timings else None,
+            }
+            for calc_type in self._registry
+        }
+
+
+# 模型映射（路由层用）
+MODEL_MAP = LazyModelMap(MODEL_REGISTRY)
+
+_CLASS_TYPES = {class_name: calc_type for calc_type, (_, class_name) in MODEL_REGISTRY.items()}
+
+
+def __getattr__(name):
+    """按类名访问模型类（from app.services.models import Microstrip）时按需导入"""
+    if name in _CLASS_TYPES:
+        return MODEL_MAP[_CLASS_TYPES[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "MODEL_MAP",
+    "MODEL_REGISTRY",
+    "LazyModelMap",
     "Microstrip",
     "Stripline",
     "DifferentialMicrostrip",
@@ -40,4 +128,4 @@ __all__ = [
     "DifferentialStriplines",
     "DifferentialCPW",
     "DifferentialCPWG"
-]
\ No newline at end of file
+]
@@ -1,11 +1,8 @@
 """非对称带状线 (Asymmetric Stripline) 模型"""
 import math
 from typing import Dict, Any
-from .basic import BasicModel
-
-# 导入scikit-rf库
-from skrf.media import mline
-from skrf import Frequency
+import numpy as np
+from .basic import FAST_ENGINE, FIELD_ENGINE, BasicModel
 
 class AsymmetricStripline(BasicModel):
     # 核心标识
@@ -32,6 +29,21 @@ class AsymmetricStripline(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '4.3', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（MLine 仅支持对线宽、介电常数、损耗角正切广播）
+    SCALAR_PARAM_KEYS = ("frequency", "height1", "height2", "thickness")
+    # 支持的计算引擎（numpy 为纯 NumPy 闭式内核；field 为二维有限差分场求解）
+    ENGINES = ("skrf", "numpy", FIELD_ENGINE)
+    # 这些引擎的 er_eff 即 dielectric 输入（场求解与耦合线引擎由数值 / 模式解给出）
+    INPUT_ER_EFF_ENGINES = ("skrf", "numpy", FAST_ENGINE)
+    # fast 引擎插值表：结果只依赖 w/h1、h2/h1、t/h1、er 与 f·h1，按上层介质厚度归一化
+    FAST_LENGTH_SCALE = "height1"
+    FAST_TABLE_AXES = (
+        {'key': 'width', 'per': 'height1', 'min': 0.05, 'max': 20, 'points': 20},
+        {'key': 'height2', 'per': 'height1', 'min': 0.1, 'max': 10, 'points': 16},
+        {'key': 'thickness', 'per': 'height1', 'min': 0.005, 'max': 0.5, 'points': 8},
+        {'key': 'dielectric', 'min': 1.5, 'max': 16, 'points': 8},
+        {'key': 'frequency', 'times': 'height1', 'min': 0.01, 'max': 30, 'points': 20},
+    )
 
     def calculate(self) -> None:
         """非对称带状线阻抗计算 - 使用scikit-rf库"""
@@ -43,18 +55,21 @@ class AsymmetricStripline(BasicModel):
         er = self.params["dielectric"]
         loss_tangent = self.params["loss_tangent"]
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
+        if self.engine == FIELD_ENGINE:
+            # 场求解引擎：按实际的上下层介质厚度求解截面，不做平均厚度近似
+            from app.services.method import field_solver
+            line = field_solver.stripline(self.frequencies * 1e9, w=w, h1=h1, h2=h2, t=t,
+                                          ep_r=er, tand=loss_tangent)
+            self._store_line(line, w, loss_tangent)
+            self.result["asymmetry_factor"] = h1 / (h1 + h2)
+            return
 
         # 注意：scikit-rf没有专门的非对称带状线类
         # 对于非对称带状线，我们使用近似方法计算
         h_total = h1 + h2
         
         # 使用scikit-rf的MLine类并调整参数来近似计算非对称带状线
-        mline_obj = mline.MLine(
-            frequency=freq,
+        mline_obj = self._mline(
             w=w,
             h=h_total / 2,  # 非对称带状线的有效高度是总厚度的一半
             t=t,
@@ -63,15 +78,14 @@ class AsymmetricStripline(BasicModel):
         )
 
         # 获取计算结果
-        impedance = float(mline_obj.z0[0].real)
+        impedance = mline_obj.z0.real
         er_eff = er  # 非对称带状线的有效介电常数等于基板介电常数
         # 确保w_eff是实数
-        w_eff = mline_obj.w_eff
-        effective_width = float(w_eff.real) if hasattr(w_eff, 'real') else float(w_eff)
+        effective_width = np.real(mline_obj.w_eff)
         asymmetry_factor = h1 / h_total
         
         # 计算损耗
-        alpha = float(mline_obj.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = mline_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
@@ -79,4 +93,4 @@ class AsymmetricStripline(BasicModel):
         self.result["er_eff"] = er_eff
         self.result["effective_width"] = effective_width * 1000  # 转换回毫米
         self.result["asymmetry_factor"] = asymmetry_factor
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
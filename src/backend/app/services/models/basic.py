@@ -1,7 +1,76 @@
 """传输线基类 - 封装公共逻辑"""
 import math
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
 
+import numpy as np
+
+from app.services.method import calculator, fast_table
+
+from .validation import ParamValidator
+
+# 扫频模式允许的最大频点数
+MAX_SWEEP_POINTS = 10001
+# 默认计算引擎：skrf（scikit-rf 媒质对象）或 numpy（纯 NumPy 闭式内核）
+DEFAULT_ENGINE = "skrf"
+# 插值表引擎（声明了 FAST_TABLE_AXES 的模型自动支持）
+FAST_ENGINE = "fast"
+# 耦合线引擎：差分对按偶模/奇模闭式公式计算（method.coupled），在 ENGINES 中声明的模型支持
+COUPLED_ENGINE = "coupled"
+# 场求解引擎：二维准静态有限差分数值求解截面（method.field_solver），在 ENGINES 中声明的模型支持
+FIELD_ENGINE = "field"
+# 差分对按模式计算的引擎额外输出的模式结果字段（追加在模型 RESULT_DEFINITIONS 之后）
+MODAL_RESULT_DEFINITIONS: List[Dict[str, Any]] = [
+    {'key': 'odd_impedance', 'label': '奇模阻抗', 'unit': 'Ω', 'precision': 2},
+    {'key': 'even_impedance', 'label': '偶模阻抗', 'unit': 'Ω', 'precision': 2},
+    {'key': 'common_impedance', 'label': '共模阻抗', 'unit': 'Ω', 'precision': 2},
+    {'key': 'er_eff_odd', 'label': '奇模有效介电常数', 'unit': '', 'precision': 3},
+    {'key': 'er_eff_even', 'label': '偶模有效介电常数', 'unit': '', 'precision': 3},
+]
+
+# scikit-rf 导入开销较大（约 1s），只在 skrf 引擎首次计算时按需导入；
+# 耦合线与场求解（scipy.sparse）模块同样在对应引擎首次计算时导入
+if TYPE_CHECKING:
+    from skrf import Frequency
+    from app.services.method import coupled, field_solver
+
+
+def parse_sweep(sweep: Any, max_points: int = MAX_SWEEP_POINTS) -> np.ndarray:
+    """解析扫频定义为频点数组（GHz）：{"start", "stop", "points"} 或 {"frequencies": [...]}"""
+    if not isinstance(sweep, dict):
+        raise ValueError("sweep 必须是对象")
+
+    if "frequencies" in sweep:
+        # 显式频点列表
+        try:
+            frequencies = np.asarray(sweep["frequencies"], dtype=float).ravel()
+        except (ValueError, TypeError):
+            raise ValueError("sweep.frequencies 必须是数字列表")
+        if frequencies.size > 1 and np.any(np.diff(frequencies) <= 0):
+            raise ValueError("sweep.frequencies 必须严格递增")
+    else:
+        # 起止频率 + 点数（线性分布）
+        try:
+            start = float(sweep["start"])
+            stop = float(sweep["stop"])
+            points = int(sweep["points"])
+        except KeyError as e:
+            raise ValueError(f"sweep 缺少字段: {e.args[0]}")
+        except (ValueError, TypeError):
+            raise ValueError("sweep 的 start/stop/points 必须是数字")
+        if points < 1:
+            raise ValueError(f"扫频点数必须≥1，当前值: {points}")
+        if stop < start:
+            raise ValueError(f"终止频率不能小于起始频率: {start} > {stop}")
+        frequencies = np.linspace(start, stop, points)
+
+    if frequencies.size == 0:
+        raise ValueError("扫频频点不能为空")
+    if frequencies.size > max_points:
+        raise ValueError(f"扫频点数不能超过 {max_points}，当前值: {frequencies.size}")
+    if not np.all(np.isfinite(frequencies)) or np.any(frequencies <= 0):
+        raise ValueError("扫频频率必须大于0")
+
+    return frequencies
 
 
 class BasicModel:
@@ -13,99 +82,302 @@ class BasicModel:
     PARAM_DEFINITIONS: List[Dict[str, Any]] = []
     # 【核心】结果字段定义（子类可以定制输出结果项）
     RESULT_DEFINITIONS: List[Dict[str, Any]] = []
+    # 向量化计算时必须为标量的参数（底层 skrf 媒质无法对其广播），
+    # evaluate_columns 按这些参数的取值分组，每组调用一次 calculate
+    SCALAR_PARAM_KEYS: Tuple[str, ...] = ("frequency",)
+    # 支持的计算引擎（numpy 内核可对全部参数广播，无需分组）
+    ENGINES: Tuple[str, ...] = ("skrf",)
+    # 按偶模/奇模计算、额外输出模式结果字段的引擎（差分对模型）
+    MODAL_ENGINES: Tuple[str, ...] = ()
+    # 计算内核是否对 dielectric / loss_tangent 施加 Djordjevic–Svensson 色散（输入视为 1 GHz 处的值）；
+    # False 表示介电参数与频率无关，按材料计算时直接传入各频点的材料值
+    DIELECTRIC_DISPERSION: bool = True
+    # er_eff 直接取 dielectric 输入的引擎（均匀介质），按材料计算时 er_eff 取各频点的材料值
+    INPUT_ER_EFF_ENGINES: Tuple[str, ...] = ()
+    # fast 引擎插值表的坐标轴：{'key', 'min', 'max', 'points'}，可选 'per'（除以该参数）
+    # 或 'times'（乘以该参数）做归一化，坐标按对数等距分布（'scale': 'linear' 时线性等距）；空元组表示不支持 fast 引擎
+    FAST_TABLE_AXES: Tuple[Dict[str, Any], ...] = ()
+    # 归一化参考长度参数：单位为 mm 的结果按其缩放（None 表示坐标轴均为绝对值）
+    FAST_LENGTH_SCALE: Optional[str] = None
+    # 插值表构建时固定的参数，查询取值不同则回退精确模型（损耗仅在 tand>0 时计算，表内恒为0）
+    FAST_FIXED_PARAMS: Dict[str, float] = {"loss_tangent": 0.0}
+
+    def __init__(self, params: Dict[str, Any], sweep: Optional[Dict[str, Any]] = None,
+                 engine: Optional[str] = None):
+        """初始化：参数验证 + 赋值
 
-    def __init__(self, params: Dict[str, Any]):
-        """初始化：参数验证 + 赋值"""
+        Args:
+            params: 计算参数字典
+            sweep: 扫频定义（可选），{"start", "stop", "points"} 或 {"frequencies": [...]}，单位 GHz；
+                   提供时忽略 params 中的 frequency，所有频点在一次 skrf 计算中完成
+            engine: 计算引擎（可选），须在 ENGINES 中，缺省为 DEFAULT_ENGINE
+        """
+        self.engine = self._resolve_engine(engine)
         self.params = self._validate_and_format_params(params)
+        self.sweep = sweep is not None
+        # 计算频点（GHz），单点模式下长度为1
+        self.frequencies = self._build_frequencies(sweep)
         self.result: Dict[str, Any] = {"status": "success"}
 
+    @classmethod
+    def validator(cls) -> ParamValidator:
+        """本模型类的参数校验器（首次使用时按 PARAM_DEFINITIONS 编译，各子类分别缓存）"""
+        validator = cls.__dict__.get("_param_validator")
+        if validator is None:
+            validator = ParamValidator(cls.__name__, cls.PARAM_DEFINITIONS)
+            cls._param_validator = validator
+        return validator
+
     def _validate_and_format_params(self, params: Dict[str, Any]) -> Dict[str, float]:
-        """参数验证与格式转换（公共方法）：从placeholder提取默认值"""
-        if not self.PARAM_DEFINITIONS:
-            raise ValueError(f"模型 {self.__class__.__name__} 未定义参数字段")
-            
-        validated = {}
-        
-        # 遍历一次完成所有操作：默认值提取、参数验证与格式转换
-        for param_def in self.PARAM_DEFINITIONS:
-            key = param_def["key"]
-            placeholder = param_def.get("placeholder")
-            
-            if placeholder is None:
-                raise ValueError(f"参数 {key} 未定义默认值（placeholder）")
-            
-            # 获取参数（优先传参，其次用placeholder默认值）
-            value = params.get(key, placeholder)
-            
-            # 转换为浮点数
-            try:
-                validated[key] = float(value)
-            except (ValueError, TypeError):
-                raise ValueError(f"参数 {key} 必须是数字，当前值: {value}")
-            
-            # 参数范围验证
-            self._validate_param_range(key, validated[key])
-        
-        return validated
+        """参数验证与格式转换（公共方法）：未提供的参数取placeholder默认值"""
+        return self.validator().validate(params)
 
-    def _validate_param_range(self, key: str, value: float) -> None:
-        """参数范围验证"""
-        # 频率必须大于0
-        if key == "frequency" and value <= 0:
-            raise ValueError(f"频率必须大于0，当前值: {value}")
-        
-        # 介电常数必须≥1
-        if key.startswith("dielectric") and value < 1:
-            raise ValueError(f"介电常数 {key} 必须≥1，当前值: {value}")
-        
-        # 损耗角正切范围验证 (0-1)
-        if key == "loss_tangent" and (value < 0 or value > 1):
-            raise ValueError(f"损耗角正切必须在0-1之间，当前值: {value}")
-        
-        # 物理尺寸不能为负数
-        if key in ["width", "height", "thickness", "spacing", "gap"] and value < 0:
-            raise ValueError(f"物理尺寸 {key} 不能为负数，当前值: {value}")
-        
-        # 厚度不能为0
-        if key in ["height", "thickness"] and value <= 0:
-            raise ValueError(f"厚度参数 {key} 必须大于0，当前值: {value}")
+    def _build_frequencies(self, sweep: Optional[Dict[str, Any]]) -> np.ndarray:
+        """生成计算频点数组（GHz）：单点模式取 frequency 参数，扫频模式按 sweep 定义生成"""
+        if sweep is None:
+            return np.array([self.params.get("frequency", 1)])
+
+        return parse_sweep(sweep)
+
+    def _frequency(self) -> "Frequency":
+        """构建 scikit-rf 频率对象（单点与多点扫频共用，单位 Hz）"""
+        from skrf import Frequency
+        return Frequency.from_f(self.frequencies * 1e9, unit='hz')
+
+    @classmethod
+    def supported_engines(cls) -> Tuple[str, ...]:
+        """模型支持的全部计算引擎"""
+        return cls.ENGINES + ((FAST_ENGINE,) if cls.FAST_TABLE_AXES else ())
+
+    @classmethod
+    def exact_engine(cls) -> str:
+        """fast 引擎回退及构建插值表时使用的精确引擎（优先 numpy 内核）"""
+        return "numpy" if "numpy" in cls.ENGINES else cls.ENGINES[0]
+
+    @classmethod
+    def result_definitions(cls, engine: Optional[str] = None) -> List[Dict[str, Any]]:
+        """指定引擎下的结果字段定义：MODAL_ENGINES 中的引擎在 RESULT_DEFINITIONS 之后追加模式结果字段"""
+        if engine in cls.MODAL_ENGINES:
+            return cls.RESULT_DEFINITIONS + MODAL_RESULT_DEFINITIONS
+        return cls.RESULT_DEFINITIONS
+
+    @classmethod
+    def _resolve_engine(cls, engine: Optional[str]) -> str:
+        """校验计算引擎，未指定时使用默认引擎"""
+        if engine is None:
+            engine = DEFAULT_ENGINE if DEFAULT_ENGINE in cls.ENGINES else cls.ENGINES[0]
+        engines = cls.supported_engines()
+        if engine not in engines:
+            raise ValueError(f"模型 {cls.TYPE} 不支持计算引擎 {engine}，可选: {', '.join(engines)}")
+        return engine
+
+    def _mline(self, w, h, t, ep_r, tand):
+        """微带线媒质计算：skrf 引擎构造 MLine 对象，numpy 引擎调用闭式内核（属性名一致）"""
+        if self.engine == "numpy":
+            return calculator.mline(self.frequencies * 1e9, w=w, h=h, t=t, ep_r=ep_r, tand=tand)
+        from skrf.media import mline
+        return mline.MLine(frequency=self._frequency(), w=w, h=h, t=t, ep_r=ep_r, tand=tand)
 
+    def _cpw(self, w, s, t, ep_r, tand, h=calculator.CPW_DEFAULT_H, has_metal_backside=False):
+        """共面波导媒质计算：skrf 引擎构造 CPW 对象，numpy 引擎调用闭式内核（属性名一致）"""
+        if self.engine == "numpy":
+            return calculator.cpw(self.frequencies * 1e9, w=w, s=s, t=t, ep_r=ep_r, tand=tand,
+                                  h=h, has_metal_backside=has_metal_backside)
+        from skrf.media import cpw
+        return cpw.CPW(frequency=self._frequency(), w=w, s=s, h=h, t=t, ep_r=ep_r, tand=tand,
+                       has_metal_backside=has_metal_backside)
 
+    def _store_line(self, line: "field_solver.FieldResult", w, tand) -> None:
+        """场求解引擎（单线）：阻抗、有效介电常数与损耗；数值解已计入导体厚度，有效宽度即线宽"""
+        self.result["impedance"] = line.z0
+        self.result["er_eff"] = line.ep_reff
+        self.result["effective_width"] = w * 1000  # 转换回毫米
+        loss_db_per_mm = line.gamma.real * 8.686 / 1000  # Np/m 转换为 dB/mm
+        self.result["loss_db_per_mm"] = np.where(tand > 0, loss_db_per_mm, 0.0)
+
+    def _store_modes(self, modes: "coupled.CoupledResult", tand) -> None:
+        """耦合线 / 场求解引擎（差分对）：由偶模/奇模结果导出差分对的各结果字段
+
+        差分阻抗 = 2·Zodd，单端阻抗取 √(Zeven·Zodd)，有效介电常数与损耗取差分信号所用的奇模。
+        """
+        z_even, z_odd = modes.z_even, modes.z_odd
+        self.result["impedance"] = 2 * z_odd
+        self.result["single_ended_impedance"] = np.sqrt(z_even * z_odd)
+        self.result["er_eff"] = modes.ep_reff_odd
+        self.result["effective_width"] = modes.w_eff * 1000  # 转换回毫米
+        self.result["coupling_coefficient"] = (z_even - z_odd) / (z_even + z_odd)
+        loss_db_per_mm = modes.gamma_odd.real * 8.686 / 1000  # Np/m 转换为 dB/mm
+        self.result["loss_db_per_mm"] = np.where(tand > 0, loss_db_per_mm, 0.0)
+        self.result["odd_impedance"] = z_odd
+        self.result["even_impedance"] = z_even
+        self.result["common_impedance"] = z_even / 2
+        self.result["er_eff_odd"] = modes.ep_reff_odd
+        self.result["er_eff_even"] = modes.ep_reff_even
+
+    @classmethod
+    def evaluate_columns(cls, columns: Dict[str, np.ndarray], engine: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """向量化计算：对N组参数（按列给出的等长数组）批量求值
+
+        skrf 引擎按 SCALAR_PARAM_KEYS 的取值分组，每组只构造一次 skrf 媒质对象，
+        其余参数以数组形式参与广播计算；numpy 引擎一次调用覆盖全部参数。
+        参数需已完成校验与默认值填充。
+
+        Args:
+            columns: 参数名 -> 长度为N的浮点数组，须覆盖 PARAM_DEFINITIONS 中的全部参数
+            engine: 计算引擎（可选）
+
+        Returns:
+            结果名 -> 长度为N的浮点数组（未按 precision 取整）
+        """
+        engine = cls._resolve_engine(engine)
+        if engine == FAST_ENGINE:
+            return cls._evaluate_fast(columns)
+        size = len(next(iter(columns.values())))
+        outputs: Dict[str, np.ndarray] = {}
+
+        # 按标量参数的取值分组（稳定排序，保证组内顺序与输入一致）
+        scalar_keys = [key for key in cls.SCALAR_PARAM_KEYS if key in columns] if engine == "skrf" else []
+        if scalar_keys:
+            stacked = np.column_stack([columns[key] for key in scalar_keys])
+            _, inverse = np.unique(stacked, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            order = np.argsort(inverse, kind="stable")
+            groups = np.split(order, np.cumsum(np.bincount(inverse))[:-1])
+        else:
+            groups = [np.arange(size)]
+
+        for index in groups:
+            group_params = {key: values[index] for key, values in columns.items()}
+            for key in scalar_keys:
+                group_params[key] = float(group_params[key][0])
+
+            model = cls._from_columns(group_params, engine)
+            model.calculate()
+
+            for key, value in model.result.items():
+                if key == "status":
+                    continue
+                if key not in outputs:
+                    outputs[key] = np.empty(size)
+                outputs[key][index] = np.broadcast_to(np.asarray(value, dtype=float), index.shape)
+
+        return outputs
+
+    @classmethod
+    def _evaluate_fast(cls, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """fast 引擎的向量化计算：命中插值表的行直接插值，其余行用精确引擎计算
+
+        额外返回 error_bound 列（插值相对误差估计，回退精确计算的行为 NaN）
+        """
+        size = len(next(iter(columns.values())))
+        table = fast_table.get_table(cls.TYPE)
+        if table is None:
+            outputs, bound = {}, np.full(size, np.inf)
+        else:
+            outputs, bound = table.lookup(columns)
+        hit = bound <= fast_table.FAST_TOLERANCE
+
+        miss = np.nonzero(~hit)[0]
+        if miss.size:
+            exact = cls.evaluate_columns({key: values[miss] for key, values in columns.items()}, cls.exact_engine())
+            for key, values in exact.items():
+                outputs.setdefault(key, np.full(size, np.nan))[miss] = values
+
+        outputs["error_bound"] = np.where(hit, bound, np.nan)
+        return outputs
+
+    @classmethod
+    def _from_columns(cls, params: Dict[str, Any], engine: Optional[str] = None) -> "BasicModel":
+        """以已校验的（数组）参数构造模型实例，跳过逐项标量校验"""
+        model = cls.__new__(cls)
+        model.engine = cls._resolve_engine(engine)
+        model.params = params
+        model.sweep = False
+        model.frequencies = np.atleast_1d(np.asarray(params.get("frequency", 1), dtype=float))
+        model.result = {"status": "success"}
+        return model
 
     def calculate(self) -> Dict[str, Any]:
         """核心计算方法（子类必须重写）"""
         raise NotImplementedError(f"子类 {self.__class__.__name__} 必须实现calculate方法")
 
+    def evaluate(self) -> Dict[str, Any]:
+        """按引擎执行计算，返回未取整的原始结果（self.result，各字段为标量或与频点等长的数组）"""
+        if self.engine == FAST_ENGINE:
+            self._calculate_fast()
+        else:
+            self.calculate()
+        return self.result
+
     def get_result(self) -> Dict[str, Any]:
         """获取计算结果（统一返回格式）"""
         try:
-            self.calculate()
-            
-            # 根据 RESULT_DEFINITIONS 构建返回结果
-            result = {"status": "success"}
-            
-            if self.RESULT_DEFINITIONS:
-                # 添加 resultDefinitions 用于前端渲染
-                result["resultDefinitions"] = self.RESULT_DEFINITIONS
-                
-                # 按 RESULT_DEFINITIONS 的顺序组织结果字段
-                for result_def in self.RESULT_DEFINITIONS:
-                    key = result_def["key"]
-                    if key in self.result:
-                        value = self.result[key]
-                        # 根据 precision 格式化数字
-                        if isinstance(value, (int, float)) and "precision" in result_def:
-                            value = round(value, result_def["precision"])
-                        result[key] = value
-            else:
-                # 如果未定义 RESULT_DEFINITIONS，返回所有结果（不含status）
-                for key, value in self.result.items():
-                    if key != "status":
-                        result[key] = value
-            
-            return result
+            self.evaluate()
+            return self._build_result()
         except Exception as e:
             return {"status": "error", "message": str(e)}
+
+    def _calculate_fast(self) -> None:
+        """fast 引擎：全部频点命中插值表且误差估计在容差内时直接插值，否则整体回退精确模型"""
+        table = fast_table.get_table(self.TYPE)
+        if table is not None:
+            outputs, bound = table.lookup(dict(self.params, frequency=self.frequencies))
+            if np.all(bound <= fast_table.FAST_TOLERANCE):
+                self.result.update(outputs)
+                self.result["error_bound"] = bound
+                return
+        self.engine = self.exact_engine()
+        self.calculate()
+        self.result["error_bound"] = np.nan
+
+    def _build_result(self) -> Dict[str, Any]:
+        """根据 RESULT_DEFINITIONS（耦合线引擎含模式字段）将 self.result 组织为统一返回格式"""
+        result = {"status": "success"}
+        definitions = self.result_definitions(self.engine)
+
+        # 扫频模式下附带频点（GHz），各结果字段为等长数组
+        if self.sweep:
+            result["frequency"] = self.frequencies.tolist()
+        
+        if definitions:
+            # 添加 resultDefinitions 用于前端渲染
+            result["resultDefinitions"] = definitions
+            
+            # 按 RESULT_DEFINITIONS 的顺序组织结果字段
+            for result_def in definitions:
+                key = result_def["key"]
+                if key in self.result:
+                    # 根据 precision 格式化数字
+                    result[key] = self._format_value(self.result[key], result_def.get("precision"))
+        else:
+            # 如果未定义 RESULT_DEFINITIONS，返回所有结果（不含status）
+            for key, value in self.result.items():
+                if key != "status":
+                    result[key] = self._format_value(value, None)
+
+        # fast 引擎：标注实际使用的引擎，命中插值表时附带相对误差估计
+        if "error_bound" in self.result:
+            bound = float(np.max(self.result["error_bound"]))
+            hit = bool(np.isfinite(bound))
+            result["engine"] = FAST_ENGINE if hit else self.exact_engine()
+            if hit:
+                result["error_bound"] = float(f"{bound:.2g}")
+        
+        return result
+
+    def _format_value(self, value: Any, precision: Optional[int]) -> Any:
+        """将计算结果转换为可序列化的值：单点模式返回标量，扫频模式返回与频点等长的列表"""
+        if isinstance(value, np.ndarray) or (self.sweep and isinstance(value, (int, float))):
+            values = np.broadcast_to(np.asarray(value, dtype=float), self.frequencies.shape)
+            if precision is not None:
+                values = np.round(values, precision)
+            if not self.sweep:
+                return float(values[0])
+            return values.tolist()
+
+        if isinstance(value, (int, float)) and precision is not None:
+            value = round(value, precision)
+        return value
     
 
 
@@ -1,12 +1,9 @@
 """同轴线模型"""
 import math
 from typing import Dict, Any
+import numpy as np
 from .basic import BasicModel
 
-# 导入scikit-rf库
-import skrf as rf
-from skrf import Frequency
-
 class Coaxial(BasicModel):
     # 核心标识
     TYPE = "coaxial"
@@ -27,6 +24,17 @@ class Coaxial(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '2.1', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（Coaxial 支持对全部几何与介质参数广播）
+    SCALAR_PARAM_KEYS = ("frequency",)
+    # skrf Coaxial 的介电参数与频率无关
+    DIELECTRIC_DISPERSION = False
+    # fast 引擎插值表：坐标轴取内径、外径/内径比、介电常数与频率
+    FAST_TABLE_AXES = (
+        {'key': 'inner_diameter', 'min': 0.02, 'max': 20, 'points': 16},
+        {'key': 'outer_diameter', 'per': 'inner_diameter', 'min': 1.1, 'max': 50, 'points': 20},
+        {'key': 'dielectric', 'min': 1.2, 'max': 16, 'points': 10},
+        {'key': 'frequency', 'min': 0.01, 'max': 100, 'points': 14},
+    )
 
     def calculate(self) -> None:
         """同轴线阻抗计算 - 使用scikit-rf库"""
@@ -37,16 +45,15 @@ class Coaxial(BasicModel):
         loss_tangent = self.params["loss_tangent"]
 
         # 参数验证
-        if d_outer <= d_inner:
+        if np.any(d_outer <= d_inner):
             raise ValueError("外导体直径必须大于内导体直径")
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
+        # 创建频率对象（单点或扫频，频点由 BasicModel 统一生成）
+        freq = self._frequency()
 
-        # 使用scikit-rf的Coaxial类计算
-        coaxial = rf.media.Coaxial(
+        # 使用scikit-rf的Coaxial类计算（按需导入，见 basic.py）
+        from skrf.media import coaxial
+        coax_obj = coaxial.Coaxial(
             frequency=freq,
             Dint=d_inner,
             Dout=d_outer,
@@ -55,16 +62,16 @@ class Coaxial(BasicModel):
         )
 
         # 获取计算结果
-        impedance = float(coaxial.z0[0].real)
+        impedance = coax_obj.z0.real
         er_eff = er  # 同轴线的有效介电常数等于填充介质的介电常数
         diameter_ratio = d_outer / d_inner
         
         # 计算损耗
-        alpha = float(coaxial.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = coax_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
         self.result["impedance"] = impedance
         self.result["er_eff"] = er_eff
         self.result["diameter_ratio"] = diameter_ratio
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
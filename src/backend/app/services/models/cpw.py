@@ -1,12 +1,9 @@
 """共面波导 (CPW) 模型"""
 import math
 from typing import Dict, Any
+import numpy as np
 from .basic import BasicModel
 
-# 导入scikit-rf库
-from skrf.media import cpw
-from skrf import Frequency
-
 class CPW(BasicModel):
     # 核心标识
     TYPE = "cpw"
@@ -30,9 +27,21 @@ class CPW(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '4.3', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（skrf CPW 不支持数组参数，逐点计算）
+    SCALAR_PARAM_KEYS = ("frequency", "width", "gap", "thickness", "dielectric", "loss_tangent")
+    # 支持的计算引擎（numpy 内核对全部参数广播，一次调用完成批量/扫描计算）
+    ENGINES = ("skrf", "numpy")
+    # fast 引擎插值表：无介质厚度参数（媒质使用固定厚度），线宽与频率取绝对值，缝隙与铜厚按线宽归一化
+    FAST_TABLE_AXES = (
+        {'key': 'width', 'min': 0.02, 'max': 10, 'points': 12},
+        {'key': 'gap', 'per': 'width', 'min': 0.1, 'max': 10, 'points': 20},
+        {'key': 'thickness', 'per': 'width', 'min': 0.002, 'max': 0.5, 'points': 20},
+        {'key': 'dielectric', 'min': 1.5, 'max': 16, 'points': 8},
+        {'key': 'frequency', 'min': 0.01, 'max': 100, 'points': 6},
+    )
 
     def calculate(self) -> None:
-        """共面波导阻抗计算 - 使用scikit-rf库"""
+        """共面波导阻抗计算 - 使用CPW媒质模型（skrf 或 numpy 内核）"""
         # 解包参数并转换为米
         w = self.params["width"] / 1000  # 转换为米
         g = self.params["gap"] / 1000  # 转换为米
@@ -40,32 +49,26 @@ class CPW(BasicModel):
         er = self.params["dielectric"]
         loss_tangent = self.params["loss_tangent"]
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
-
         # 使用scikit-rf的CPW类计算
-        cpw_obj = cpw.CPW(
-            frequency=freq,
+        cpw_obj = self._cpw(
             w=w,
-            s=g,  # scikit-rf中使用s表示缝隙宽度
+            s=g,  # 媒质中使用s表示缝隙宽度
             t=t,
             ep_r=er,
             tand=loss_tangent
         )
 
         # 获取计算结果
-        impedance = float(cpw_obj.z0[0].real)
-        er_eff = float(cpw_obj.ep_reff_f[0].real)
+        impedance = cpw_obj.z0.real
+        er_eff = cpw_obj.ep_reff_f.real
         coupling_coefficient = w / (w + 2 * g)
         
         # 计算损耗
-        alpha = float(cpw_obj.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = cpw_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
         self.result["impedance"] = impedance
         self.result["er_eff"] = er_eff
         self.result["coupling_coefficient"] = coupling_coefficient
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
@@ -1,11 +1,8 @@
 """差分共面波导接地 (Differential CPWG) 模型"""
 import math
 from typing import Dict, Any
-from .basic import BasicModel
-
-# 导入scikit-rf库
-from skrf.media import cpw
-from skrf import Frequency
+import numpy as np
+from .basic import COUPLED_ENGINE, BasicModel
 
 class DifferentialCPWG(BasicModel):
     # 核心标识
@@ -33,28 +30,44 @@ class DifferentialCPWG(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '4.3', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（skrf CPW 不支持数组参数，逐点计算）
+    SCALAR_PARAM_KEYS = ("frequency", "width", "gap", "thickness", "dielectric", "loss_tangent")
+    # 支持的计算引擎（numpy 内核对全部参数广播，一次调用完成批量/扫描计算；coupled 为偶/奇模耦合线内核）
+    ENGINES = ("skrf", "numpy", COUPLED_ENGINE)
+    MODAL_ENGINES = (COUPLED_ENGINE,)
+    # fast 引擎插值表：无介质厚度参数（媒质使用固定厚度），线宽与频率取绝对值，缝隙与铜厚按线宽归一化
+    FAST_TABLE_AXES = (
+        {'key': 'width', 'min': 0.02, 'max': 10, 'points': 12},
+        {'key': 'gap', 'per': 'width', 'min': 0.1, 'max': 10, 'points': 20},
+        {'key': 'thickness', 'per': 'width', 'min': 0.002, 'max': 0.5, 'points': 20},
+        {'key': 'dielectric', 'min': 1.5, 'max': 16, 'points': 8},
+        {'key': 'frequency', 'min': 0.01, 'max': 100, 'points': 6},
+    )
 
     def calculate(self) -> None:
-        """差分共面波导接地阻抗计算 - 使用scikit-rf库"""
+        """差分共面波导接地阻抗计算 - 使用CPW媒质模型（skrf 或 numpy 内核）"""
         # 解包参数并转换为米
         w = self.params["width"] / 1000  # 转换为米
         g = self.params["gap"] / 1000  # 转换为米
+        s = self.params["spacing"] / 1000  # 转换为米
         t = self.params["thickness"] / 1000  # 转换为米
         er = self.params["dielectric"]
         loss_tangent = self.params["loss_tangent"]
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
+        if self.engine == COUPLED_ENGINE:
+            # 耦合线引擎：共面耦合线保角映射（不计金属背面与地平面宽度）
+            from app.services.method import coupled
+            modes = coupled.coupled_cpw(self.frequencies * 1e9, w=w, s=s, g=g, t=t,
+                                        ep_r=er, tand=loss_tangent)
+            self._store_modes(modes, loss_tangent)
+            return
 
         # 注意：scikit-rf没有专门的差分共面波导接地类
         # 对于差分共面波导接地，我们使用近似方法计算
         # 这里使用CPW类并调整参数来近似计算差分共面波导接地
-        cpw_obj = cpw.CPW(
-            frequency=freq,
+        cpw_obj = self._cpw(
             w=w,
-            s=g,  # scikit-rf中使用s表示缝隙宽度
+            s=g,  # 媒质中使用s表示缝隙宽度
             t=t,
             ep_r=er,
             tand=loss_tangent,
@@ -62,13 +75,13 @@ class DifferentialCPWG(BasicModel):
         )
 
         # 获取计算结果
-        z0_se = float(cpw_obj.z0[0].real)  # 单端阻抗
+        z0_se = cpw_obj.z0.real  # 单端阻抗
         z0_diff = z0_se * 2  # 差分阻抗
-        er_eff = float(cpw_obj.ep_reff_f[0].real)
+        er_eff = cpw_obj.ep_reff_f.real
         coupling_coefficient = w / (w + 2 * g)
         
         # 计算损耗
-        alpha = float(cpw_obj.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = cpw_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
@@ -76,4 +89,4 @@ class DifferentialCPWG(BasicModel):
         self.result["single_ended_impedance"] = z0_se
         self.result["er_eff"] = er_eff
         self.result["coupling_coefficient"] = coupling_coefficient
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
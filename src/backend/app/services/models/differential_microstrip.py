@@ -1,11 +1,8 @@
 """差分对模型"""
 import math
 from typing import Dict, Any
-from .basic import BasicModel
-
-# 导入scikit-rf库
-from skrf.media import mline
-from skrf import Frequency
+import numpy as np
+from .basic import COUPLED_ENGINE, FIELD_ENGINE, BasicModel
 
 class DifferentialMicrostrip(BasicModel):
     # 核心标识
@@ -33,6 +30,20 @@ class DifferentialMicrostrip(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '4.3', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（MLine 仅支持对线宽、介电常数、损耗角正切广播）
+    SCALAR_PARAM_KEYS = ("frequency", "height", "thickness")
+    # 支持的计算引擎（numpy 为纯 NumPy 闭式内核；coupled 为偶/奇模耦合线内核；field 为二维有限差分场求解）
+    ENGINES = ("skrf", "numpy", COUPLED_ENGINE, FIELD_ENGINE)
+    MODAL_ENGINES = (COUPLED_ENGINE, FIELD_ENGINE)
+    # fast 引擎插值表：结果只依赖 w/h、s/h、t/h、er 与 f·h，按介质厚度归一化
+    FAST_LENGTH_SCALE = "height"
+    FAST_TABLE_AXES = (
+        {'key': 'width', 'per': 'height', 'min': 0.05, 'max': 20, 'points': 20},
+        {'key': 'spacing', 'per': 'height', 'min': 0.02, 'max': 10, 'points': 20},
+        {'key': 'thickness', 'per': 'height', 'min': 0.005, 'max': 0.5, 'points': 8},
+        {'key': 'dielectric', 'min': 1.5, 'max': 16, 'points': 8},
+        {'key': 'frequency', 'times': 'height', 'min': 0.01, 'max': 30, 'points': 20},
+    )
 
     def calculate(self) -> None:
         """差分对阻抗计算 - 使用scikit-rf库"""
@@ -44,17 +55,27 @@ class DifferentialMicrostrip(BasicModel):
         er = self.params["dielectric"]
         loss_tangent = self.params["loss_tangent"]
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
+        if self.engine == COUPLED_ENGINE:
+            # 耦合线引擎：Kirschning–Jansen 偶/奇模公式
+            from app.services.method import coupled
+            modes = coupled.edge_coupled_mline(self.frequencies * 1e9, w=w, s=s, h=h, t=t,
+                                               ep_r=er, tand=loss_tangent)
+            self._store_modes(modes, loss_tangent)
+            return
+
+        if self.engine == FIELD_ENGINE:
+            # 场求解引擎：对称面分别取磁壁（偶模）与电壁（奇模）求解半截面
+            from app.services.method import field_solver
+            modes = field_solver.coupled_microstrip(self.frequencies * 1e9, w=w, s=s, h=h, t=t,
+                                                    ep_r=er, tand=loss_tangent)
+            self._store_modes(modes, loss_tangent)
+            return
 
         # 注意：scikit-rf没有专门的差分微带线类
         # 对于差分微带线，我们使用近似方法计算
         # 这里使用MLine类并调整参数来近似计算差分微带线
         # 待优化：scikit-rf的MLine类可能不是最优选择，考虑其他实现
-        mline_obj = mline.MLine(
-            frequency=freq,
+        mline_obj = self._mline(
             w=w,
             h=h,
             t=t,
@@ -63,17 +84,16 @@ class DifferentialMicrostrip(BasicModel):
         )
 
         # 获取计算结果
-        z0_se = float(mline_obj.z0[0].real)  # 单端阻抗
+        z0_se = mline_obj.z0.real  # 单端阻抗
         # 差分阻抗计算（近似）
-        z0_diff = 2 * z0_se * (1 - 0.48 * math.exp(-0.96 * s / h))
-        er_eff = float(mline_obj.ep_reff_f[0].real)
+        z0_diff = 2 * z0_se * (1 - 0.48 * np.exp(-0.96 * s / h))
+        er_eff = mline_obj.ep_reff_f.real
         # 确保w_eff是实数
-        w_eff = mline_obj.w_eff
-        effective_width = float(w_eff.real) if hasattr(w_eff, 'real') else float(w_eff)
+        effective_width = np.real(mline_obj.w_eff)
         coupling_coefficient = s / (s + 2 * effective_width)
         
         # 计算损耗
-        alpha = float(mline_obj.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = mline_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
@@ -82,4 +102,4 @@ class DifferentialMicrostrip(BasicModel):
         self.result["er_eff"] = er_eff
         self.result["effective_width"] = effective_width * 1000  # 转换回毫米
         self.result["coupling_coefficient"] = coupling_coefficient
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
@@ -1,11 +1,9 @@
 """差分带状线 (Differential Striplines) 模型"""
 import math
 from typing import Dict, Any
-from .basic import BasicModel
-
-# 导入scikit-rf库
-from skrf.media import mline
-from skrf import Frequency
+import numpy as np
+from scipy.special import ellipk
+from .basic import COUPLED_ENGINE, FAST_ENGINE, FIELD_ENGINE, BasicModel
 
 class DifferentialStriplines(BasicModel):
     # 核心标识
@@ -33,6 +31,22 @@ class DifferentialStriplines(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '4.3', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（MLine 仅支持对线宽、介电常数、损耗角正切广播）
+    SCALAR_PARAM_KEYS = ("frequency", "height", "thickness")
+    # 支持的计算引擎（numpy 为纯 NumPy 闭式内核；coupled 为偶/奇模耦合线内核；field 为二维有限差分场求解）
+    ENGINES = ("skrf", "numpy", COUPLED_ENGINE, FIELD_ENGINE)
+    MODAL_ENGINES = (COUPLED_ENGINE, FIELD_ENGINE)
+    # 这些引擎的 er_eff 即 dielectric 输入（场求解与耦合线引擎由数值 / 模式解给出）
+    INPUT_ER_EFF_ENGINES = ("skrf", "numpy", FAST_ENGINE)
+    # fast 引擎插值表：结果只依赖 w/h、s/h、t/h、er 与 f·h，按介质厚度归一化
+    FAST_LENGTH_SCALE = "height"
+    FAST_TABLE_AXES = (
+        {'key': 'width', 'per': 'height', 'min': 0.05, 'max': 20, 'points': 20},
+        {'key': 'spacing', 'per': 'height', 'min': 0.02, 'max': 10, 'points': 20},
+        {'key': 'thickness', 'per': 'height', 'min': 0.005, 'max': 0.5, 'points': 8},
+        {'key': 'dielectric', 'min': 1.5, 'max': 16, 'points': 8},
+        {'key': 'frequency', 'times': 'height', 'min': 0.01, 'max': 30, 'points': 20},
+    )
 
     def calculate(self) -> None:
         """差分带状线阻抗计算 - 使用scikit-rf库"""
@@ -44,16 +58,27 @@ class DifferentialStriplines(BasicModel):
         er = self.params["dielectric"]
         loss_tangent = self.params["loss_tangent"]
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
+        if self.engine == COUPLED_ENGINE:
+            # 耦合线引擎：Cohn 偶/奇模精确解；height 为导体上下两层介质厚度之和（不含铜厚），
+            # 两参考平面间距 b = height + thickness
+            from app.services.method import coupled
+            modes = coupled.edge_coupled_stripline(self.frequencies * 1e9, w=w, s=s, b=h + t, t=t,
+                                                   ep_r=er, tand=loss_tangent)
+            self._store_modes(modes, loss_tangent)
+            return
+
+        if self.engine == FIELD_ENGINE:
+            # 场求解引擎：导体居中于两参考平面之间，上下两层介质厚度各为 height / 2
+            from app.services.method import field_solver
+            modes = field_solver.coupled_stripline(self.frequencies * 1e9, w=w, s=s, h1=h / 2,
+                                                   h2=h / 2, t=t, ep_r=er, tand=loss_tangent)
+            self._store_modes(modes, loss_tangent)
+            return
 
         # 注意：scikit-rf没有专门的差分带状线类
         # 对于差分带状线，我们使用近似方法计算
         # 这里使用MLine类并调整参数来近似计算差分带状线
-        mline_obj = mline.MLine(
-            frequency=freq,
+        mline_obj = self._mline(
             w=w,
             h=h / 2,  # 差分带状线的有效高度是介质厚度的一半
             t=t,
@@ -62,26 +87,25 @@ class DifferentialStriplines(BasicModel):
         )
 
         # 获取计算结果
-        z0_se = float(mline_obj.z0[0].real)  # 单端阻抗
+        z0_se = mline_obj.z0.real  # 单端阻抗
         # 差分阻抗计算（近似）
         # 注意：实际的差分阻抗需要考虑耦合效应，这里使用简化的方法
         z0_diff = z0_se * 2  # 近似计算差分阻抗
         er_eff = er  # 差分带状线的有效介电常数等于基板介电常数
         # 确保w_eff是实数
-        w_eff = mline_obj.w_eff
-        effective_width = float(w_eff.real) if hasattr(w_eff, 'real') else float(w_eff)
+        effective_width = np.real(mline_obj.w_eff)
         # 耦合系数计算
         k = s / (s + 2 * effective_width)
-        k_prime = math.sqrt(1 - k**2)
+        k_prime = np.sqrt(1 - k**2)
         # 使用椭圆积分计算耦合因子
-        from scipy.special import ellipk
-        if k < 0.7:
-            coupling_factor = ellipk(k) / ellipk(k_prime)
-        else:
-            coupling_factor = math.pi / math.log(2 * (1 + math.sqrt(k_prime)) / (1 - math.sqrt(k_prime)))
+        coupling_factor = np.where(
+            k < 0.7,
+            ellipk(k) / ellipk(k_prime),
+            math.pi / np.log(2 * (1 + np.sqrt(k_prime)) / (1 - np.sqrt(k_prime)))
+        )
         
         # 计算损耗
-        alpha = float(mline_obj.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = mline_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
@@ -90,4 +114,4 @@ class DifferentialStriplines(BasicModel):
         self.result["er_eff"] = er_eff
         self.result["effective_width"] = effective_width * 1000  # 转换回毫米
         self.result["coupling_coefficient"] = coupling_factor
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
@@ -1,11 +1,8 @@
 """微带线模型"""
 import math
 from typing import Dict, Any
-from .basic import BasicModel
-
-# 导入scikit-rf库
-from skrf.media import mline
-from skrf import Frequency
+import numpy as np
+from .basic import FIELD_ENGINE, BasicModel
 
 class Microstrip(BasicModel):
     # 核心标识
@@ -28,6 +25,18 @@ class Microstrip(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '4.3', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（MLine 仅支持对线宽、介电常数、损耗角正切广播）
+    SCALAR_PARAM_KEYS = ("frequency", "height", "thickness")
+    # 支持的计算引擎（numpy 为纯 NumPy 闭式内核；field 为二维有限差分场求解）
+    ENGINES = ("skrf", "numpy", FIELD_ENGINE)
+    # fast 引擎插值表：MLine 结果只依赖 w/h、t/h、er 与 f·h，按介质厚度归一化
+    FAST_LENGTH_SCALE = "height"
+    FAST_TABLE_AXES = (
+        {'key': 'width', 'per': 'height', 'min': 0.05, 'max': 20, 'points': 24},
+        {'key': 'thickness', 'per': 'height', 'min': 0.005, 'max': 0.5, 'points': 10},
+        {'key': 'dielectric', 'min': 1.5, 'max': 16, 'points': 12},
+        {'key': 'frequency', 'times': 'height', 'min': 0.01, 'max': 30, 'points': 24},
+    )
 
     def calculate(self) -> None:
         """微带线阻抗计算 - 使用scikit-rf库"""
@@ -38,14 +47,16 @@ class Microstrip(BasicModel):
         er = self.params["dielectric"]
         loss_tangent = self.params["loss_tangent"]
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
+        if self.engine == FIELD_ENGINE:
+            # 场求解引擎：数值求解截面电容
+            from app.services.method import field_solver
+            line = field_solver.microstrip(self.frequencies * 1e9, w=w, h=h, t=t,
+                                           ep_r=er, tand=loss_tangent)
+            self._store_line(line, w, loss_tangent)
+            return
 
-        # 使用scikit-rf的MLine类计算
-        mline_obj = mline.MLine(
-            frequency=freq,
+        # 使用MLine模型计算（skrf 对象或 numpy 内核，由 engine 决定）
+        mline_obj = self._mline(
             w=w,
             h=h,
             t=t,
@@ -54,19 +65,17 @@ class Microstrip(BasicModel):
         )
 
         # 获取计算结果
-        # 直接使用标量值，避免numpy数组
-        impedance = float(mline_obj.z0[0].real)
-        er_eff = float(mline_obj.ep_reff_f[0].real)
+        impedance = mline_obj.z0.real
+        er_eff = mline_obj.ep_reff_f.real
         # 确保w_eff是实数
-        w_eff = mline_obj.w_eff
-        effective_width = float(w_eff.real) if hasattr(w_eff, 'real') else float(w_eff)
+        effective_width = np.real(mline_obj.w_eff)
         
         # 计算损耗
-        alpha = float(mline_obj.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = mline_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
         self.result["impedance"] = impedance
         self.result["er_eff"] = er_eff
         self.result["effective_width"] = effective_width * 1000  # 转换回毫米
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
\ No newline at end of file
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
\ No newline at end of file
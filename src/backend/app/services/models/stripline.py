@@ -1,11 +1,8 @@
 """带状线模型"""
 import math
 from typing import Dict, Any
-from .basic import BasicModel
-
-# 导入scikit-rf库
-from skrf.media import mline
-from skrf import Frequency
+import numpy as np
+from .basic import FAST_ENGINE, FIELD_ENGINE, BasicModel
 
 class Stripline(BasicModel):
     # 核心标识
@@ -28,6 +25,20 @@ class Stripline(BasicModel):
         {'key': 'dielectric', 'label': '介电常数', 'placeholder': '4.3', 'step': 0.01},
         {"key": "loss_tangent", "label": "损耗角正切", "placeholder": "0", "step": 0.001}
     ]
+    # 向量化计算时必须为标量的参数（MLine 仅支持对线宽、介电常数、损耗角正切广播）
+    SCALAR_PARAM_KEYS = ("frequency", "height", "thickness")
+    # 支持的计算引擎（numpy 为纯 NumPy 闭式内核；field 为二维有限差分场求解）
+    ENGINES = ("skrf", "numpy", FIELD_ENGINE)
+    # 这些引擎的 er_eff 即 dielectric 输入（场求解与耦合线引擎由数值 / 模式解给出）
+    INPUT_ER_EFF_ENGINES = ("skrf", "numpy", FAST_ENGINE)
+    # fast 引擎插值表：MLine 结果只依赖 w/h、t/h、er 与 f·h，按介质厚度归一化
+    FAST_LENGTH_SCALE = "height"
+    FAST_TABLE_AXES = (
+        {'key': 'width', 'per': 'height', 'min': 0.05, 'max': 20, 'points': 24},
+        {'key': 'thickness', 'per': 'height', 'min': 0.005, 'max': 0.5, 'points': 10},
+        {'key': 'dielectric', 'min': 1.5, 'max': 16, 'points': 12},
+        {'key': 'frequency', 'times': 'height', 'min': 0.01, 'max': 30, 'points': 24},
+    )
 
     def calculate(self) -> None:
         """带状线阻抗计算 - 使用scikit-rf库"""
@@ -38,17 +49,19 @@ class Stripline(BasicModel):
         er = self.params["dielectric"]
         loss_tangent = self.params["loss_tangent"]
 
-        # 创建频率对象
-        freq_ghz = self.params.get('frequency', 1)
-        freq_hz = freq_ghz * 1e9  # 转换为Hz
-        freq = Frequency(freq_hz, freq_hz, 1, unit='hz')
+        if self.engine == FIELD_ENGINE:
+            # 场求解引擎：与 skrf 引擎一致，height 为导体上下两层介质厚度之和（不含铜厚），导体居中
+            from app.services.method import field_solver
+            line = field_solver.stripline(self.frequencies * 1e9, w=w, h1=h / 2, h2=h / 2, t=t,
+                                          ep_r=er, tand=loss_tangent)
+            self._store_line(line, w, loss_tangent)
+            return
 
         # 注意：scikit-rf没有专门的Stripline类
         # 对于带状线，我们使用近似方法计算
         # 这里使用MLine类并调整参数来近似计算带状线
         # 带状线的有效高度是介质厚度的一半
-        mline_obj = mline.MLine(
-            frequency=freq,
+        mline_obj = self._mline(
             w=w,
             h=h / 2,  # 带状线的有效高度是介质厚度的一半
             t=t,
@@ -57,18 +70,17 @@ class Stripline(BasicModel):
         )
 
         # 获取计算结果
-        impedance = float(mline_obj.z0[0].real)
+        impedance = mline_obj.z0.real
         er_eff = er  # 带状线的有效介电常数等于基板介电常数
         # 确保w_eff是实数
-        w_eff = mline_obj.w_eff
-        effective_width = float(w_eff.real) if hasattr(w_eff, 'real') else float(w_eff)
+        effective_width = np.real(mline_obj.w_eff)
         
         # 计算损耗
-        alpha = float(mline_obj.gamma[0].real)  # 衰减常数 (Np/m)
+        alpha = mline_obj.gamma.real  # 衰减常数 (Np/m)
         loss_db_per_mm = alpha * 8.686 / 1000  # 转换为 dB/mm
 
         # 组装结果（交由 BasicModel.get_result() 统一格式化）
         self.result["impedance"] = impedance
         self.result["er_eff"] = er_eff
         self.result["effective_width"] = effective_width * 1000  # 转换回毫米
-        self.result["loss_db_per_mm"] = loss_db_per_mm if loss_tangent > 0 else 0
+        self.result["loss_db_per_mm"] = np.where(loss_tangent > 0, loss_db_per_mm, 0.0)
@@ -0,0 +1,162 @@
+"""参数校验器 - 按模型类的 PARAM_DEFINITIONS 编译一次，实例化与批量计算时复用
+
+编译时解析 placeholder 默认值并为每个参数生成上下界规则，逐项校验只需一次 float() 与若干比较；
+validate_columns 以 NumPy 对整列参数一次完成转换与范围检查，返回全部不合法的行号及其错误信息。
+"""
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# 物理尺寸参数（不能为负数）与厚度参数（必须大于0）
+DIMENSION_KEYS = ("width", "height", "thickness", "spacing", "gap")
+THICKNESS_KEYS = ("height", "thickness")
+
+
+class Bound(NamedTuple):
+    """取值范围规则：low_open 为 True 时要求 value > low，否则 value >= low；且 value <= high"""
+    low: float
+    low_open: bool
+    high: float
+    # 错误信息模板，可用 {key} 与 {value}
+    message: str
+
+    def violated(self, value):
+        """是否违反规则（标量返回 bool，数组返回布尔数组；NaN 不视为违反）"""
+        below = value <= self.low if self.low_open else value < self.low
+        return below | (value > self.high)
+
+
+def param_bounds(key: str) -> Tuple[Bound, ...]:
+    """参数名对应的范围规则（按检查顺序，报告第一条违反的规则）"""
+    bounds: List[Bound] = []
+    # 频率必须大于0
+    if key == "frequency":
+        bounds.append(Bound(0.0, True, math.inf, "频率必须大于0，当前值: {value}"))
+    # 介电常数必须≥1
+    if key.startswith("dielectric"):
+        bounds.append(Bound(1.0, False, math.inf, "介电常数 {key} 必须≥1，当前值: {value}"))
+    # 损耗角正切范围验证 (0-1)
+    if key == "loss_tangent":
+        bounds.append(Bound(0.0, False, 1.0, "损耗角正切必须在0-1之间，当前值: {value}"))
+    # 物理尺寸不能为负数
+    if key in DIMENSION_KEYS:
+        bounds.append(Bound(0.0, False, math.inf, "物理尺寸 {key} 不能为负数，当前值: {value}"))
+    # 厚度不能为0
+    if key in THICKNESS_KEYS:
+        bounds.append(Bound(0.0, True, math.inf, "厚度参数 {key} 必须大于0，当前值: {value}"))
+    return tuple(bounds)
+
+
+class ParamValidator:
+    """单个模型类的编译后参数校验器"""
+
+    def __init__(self, model_name: str, param_definitions: List[Dict[str, Any]]):
+        if not param_definitions:
+            raise ValueError(f"模型 {model_name} 未定义参数字段")
+
+        # (参数名, 默认值, 范围规则)，顺序与 PARAM_DEFINITIONS 一致
+        fields = []
+        for param_def in param_definitions:
+            key = param_def["key"]
+            placeholder = param_def.get("placeholder")
+            if placeholder is None:
+                raise ValueError(f"参数 {key} 未定义默认值（placeholder）")
+            try:
+                default = float(placeholder)
+            except (ValueError, TypeError):
+                raise ValueError(f"参数 {key} 的默认值（placeholder）必须是数字，当前值: {placeholder}")
+            fields.append((key, default, param_bounds(key)))
+
+        self.fields: Tuple[Tuple[str, float, Tuple[Bound, ...]], ...] = tuple(fields)
+        self.keys: Tuple[str, ...] = tuple(key for key, _, _ in fields)
+        self.defaults: Dict[str, float] = {key: default for key, default, _ in fields}
+        self.bounds: Dict[str, Tuple[Bound, ...]] = {key: bounds for key, _, bounds in fields}
+
+    def validate(self, params: Dict[str, Any]) -> Dict[str, float]:
+        """逐项校验并填充默认值，返回参数名 -> 浮点值（顺序与 PARAM_DEFINITIONS 一致）"""
+        validated = {}
+        for key, default, bounds in self.fields:
+            value = params.get(key, default)
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                raise ValueError(f"参数 {key} 必须是数字，当前值: {value}")
+            # 标量路径内联比较（省去 Bound.violated 的方法调用）
+            for low, low_open, high, message in bounds:
+                if (value <= low if low_open else value < low) or value > high:
+                    raise ValueError(message.format(key=key, value=value))
+            validated[key] = value
+        return validated
+
+    def check(self, key: str, value: float) -> None:
+        """单个参数的范围检查（未定义规则的参数直接通过）"""
+        for bound in self.bounds.get(key) or param_bounds(key):
+            if bound.violated(value):
+                raise ValueError(bound.message.format(key=key, value=value))
+
+    def check_array(self, key: str, values: np.ndarray) -> Dict[int, str]:
+        """单个参数整列的范围检查，返回 不合法下标 -> 错误信息（每个下标只报告第一条违反的规则）"""
+        errors: Dict[int, str] = {}
+        for bound in self.bounds.get(key) or param_bounds(key):
+            for index in np.flatnonzero(bound.violated(values)).tolist():
+                if index not in errors:
+                    errors[index] = bound.message.format(key=key, value=float(values[index]))
+        return errors
+
+    def validate_columns(self, rows: List[Dict[str, Any]]) -> Tuple[Dict[str, np.ndarray], Dict[int, str]]:
+        """
+        整列校验：N 组参数按参数名转为长度为N的浮点列，填充默认值并一次完成范围检查
+
+        Args:
+            rows: N 个参数字典
+
+        Returns:
+            (columns, errors)：columns 为参数名 -> 长度为N的浮点数组（不合法行的取值无意义），
+            errors 为 不合法行号 -> 错误信息（每行只报告第一个出错的参数，顺序同 validate）
+        """
+        columns: Dict[str, np.ndarray] = {}
+        errors: Dict[int, str] = {}
+        for key, default, _ in self.fields:
+            raw = [row.get(key, default) for row in rows]
+            values, invalid = _to_float_column(raw)
+            for index in invalid:
+                errors.setdefault(index, f"参数 {key} 必须是数字，当前值: {raw[index]}")
+            for index, message in self.check_array(key, values).items():
+                errors.setdefault(index, message)
+            columns[key] = values
+        if len(errors) > 1:
+            errors = dict(sorted(errors.items()))
+        return columns, errors
+
+
+def _to_float_column(raw: List[Any]) -> Tuple[np.ndarray, List[int]]:
+    """
+    转换为浮点数组，返回 (数组, 无法转换的下标)；无法转换的位置填 NaN
+
+    与 float() 的语义一致：NumPy 会把 None 转为 NaN，含 None 时逐项转换。
+    """
+    if not any(value is None for value in raw):
+        try:
+            return np.fromiter(raw, dtype=float, count=len(raw)), []
+        except (ValueError, TypeError):
+            pass
+    values = np.empty(len(raw))
+    invalid = []
+    for index, value in enumerate(raw):
+        try:
+            values[index] = float(value)
+        except (ValueError, TypeError):
+            values[index] = np.nan
+            invalid.append(index)
+    return values, invalid
+
+
+def format_errors(errors: Dict[int, str], limit: Optional[int] = 5) -> str:
+    """把 行号 -> 错误信息 汇总为一条信息（最多列出 limit 项）"""
+    items = list(errors.items())
+    shown = items if limit is None else items[:limit]
+    text = "；".join(f"[{index}] {message}" for index, message in shown)
+    if len(items) > len(shown):
+        text += f"；另有 {len(items) - len(shown)} 项"
+    return f"{len(items)} 个取值不合法: {text}"
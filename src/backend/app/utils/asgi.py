@@ -0,0 +1,206 @@
+"""
+ASGI 适配 - 在异步服务器（uvicorn）上运行 Flask 应用
+
+gunicorn 同步 worker 一个进程同时只能服务一个连接：慢速上传、慢速读取大响应的客户端会一直占住 worker。
+本适配器在事件循环中异步接收请求体、异步发送响应，只有 Flask 视图（参数校验与模型计算）在线程池中执行；
+流式响应（NDJSON、Touchstone 下载）每次在线程池中计算一块，发送期间不占用线程。
+并发连接数因此只受事件循环限制，与进程数、线程数无关；大计算仍按 model_executor 分发到进程池。
+
+只实现 HTTP 与 lifespan 协议（不支持 WebSocket）。
+"""
+import asyncio
+import contextvars
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from .logger import log_error, setup_logger
+
+# 执行 Flask 视图的线程数（同时进行中的计算数；等待网络读写的连接不占线程）
+ASGI_THREADS = int(os.environ.get('ZCAL_ASGI_THREADS', 8))
+# 请求体上限（字节），超出时直接返回 413，不进入 Flask
+ASGI_MAX_BODY = int(os.environ.get('ZCAL_ASGI_MAX_BODY', 16 * 1024 * 1024))
+
+_EXHAUSTED = object()
+
+logger = setup_logger("asgi")
+
+
+class WsgiToAsgi:
+    """把 WSGI 应用包装为 ASGI 应用"""
+
+    def __init__(self, wsgi_app: Callable, threads: int = ASGI_THREADS, max_body: int = ASGI_MAX_BODY):
+        self.wsgi_app = wsgi_app
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='zcal-asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        else:
+            raise ValueError(f"不支持的 ASGI 协议: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        # 1. 异步接收完整请求体（慢速上传不占线程）
+        body = await self._read_body(receive)
+        if body is None:
+            await _plain_response(send, 413, '请求体过大')
+            return
+
+        # 2. 在线程池中执行 Flask 视图，取得状态、响应头与第一块响应体；
+        #    同一请求的各次线程池调用共用一个上下文（Flask 请求上下文存放在 contextvars 中，
+        #    流式响应在第一块入栈、最后一块之后出栈，两次调用可能落在不同线程）
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        environ = _environ(scope, body)
+        try:
+            status, headers, first, iterable = await loop.run_in_executor(
+                self.executor, context.run, _start, self.wsgi_app, environ)
+        except Exception as e:
+            log_error(logger, e, f"{scope['method']} {scope['path']}")
+            await _plain_response(send, 500, '服务器内部错误')
+            return
+
+        # 3. 异步发送响应；流式响应逐块在线程池中计算，客户端断开时停止计算
+        disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            chunk = first
+            while chunk is not _EXHAUSTED and not disconnected.done():
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await loop.run_in_executor(self.executor, context.run, next, iterable, _EXHAUSTED)
+            if not disconnected.done():
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            disconnected.cancel()
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(self.executor, context.run, iterable.close)
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        """读取请求体；超出 max_body 时返回 None"""
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+
+def _environ(scope, body: bytes) -> dict:
+    """由 ASGI scope 构造 WSGI environ（路径按 PEP 3333 以 latin-1 承载 UTF-8 字节）"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _start(wsgi_app: Callable, environ: dict) -> Tuple[int, List[Tuple[bytes, bytes]], object, object]:
+    """
+    线程池任务：调用 WSGI 应用，返回 (状态码, 响应头, 第一块响应体, 响应体迭代器)
+
+    带 Content-Length 的普通响应一次取完全部响应体（已在内存中，无需再回到线程池）；
+    流式响应只取第一块（WSGI 应用可以推迟到第一块之前才调用 start_response）。
+    """
+    started = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        if exc_info and started.get('sent'):
+            raise exc_info[1].with_traceback(exc_info[2])
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                              for name, value in response_headers]
+
+    result = wsgi_app(environ, start_response)
+    iterator = iter(result)
+    try:
+        first = next(iterator, _EXHAUSTED)
+        buffered = any(name == b'content-length' for name, _ in started['headers'])
+        if buffered and first is not _EXHAUSTED:
+            first = first + b''.join(iterator)
+    except BaseException:
+        if hasattr(result, 'close'):
+            result.close()
+        raise
+    started['sent'] = True
+    return started['status'], started['headers'], first, _Body(iterator, result, buffered)
+
+
+class _Body:
+    """响应体迭代器：普通响应已一次取完；close() 转发给 WSGI 应用返回的对象（触发 Flask 的请求收尾）"""
+
+    def __init__(self, iterator, result, exhausted):
+        self.iterator = iter(()) if exhausted else iterator
+        self.result = result
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.iterator)
+
+    def close(self):
+        if hasattr(self.result, 'close'):
+            self.result.close()
+
+
+async def _wait_disconnect(receive):
+    """请求体读完后继续监听，收到 http.disconnect 时返回"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _plain_response(send, status: int, message: str):
+    body = message.encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'text/plain; charset=utf-8'), (b'content-length', str(len(body)).encode('latin-1'))]})
+    await send({'type': 'http.response.body', 'body': body, 'more_body': False})
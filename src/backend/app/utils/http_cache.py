@@ -0,0 +1,27 @@
+"""
+HTTP 缓存 - 预先序列化的静态响应附带 ETag 与 Cache-Control，条件请求命中时返回 304
+"""
+import os
+
+from flask import Response, request
+
+# 静态元数据响应的缓存有效期（秒），过期后浏览器/nginx 以 If-None-Match 重新验证
+METADATA_MAX_AGE = int(os.environ.get('ZCAL_METADATA_MAX_AGE', 300))
+# 模型定义版本号响应头（全部静态元数据内容的哈希）
+DEFINITIONS_VERSION_HEADER = 'X-Zcal-Definitions-Version'
+
+
+def static_response(payload, definitions_version: str) -> Response:
+    """
+    返回预先序列化的 JSON 响应；If-None-Match 与 ETag 一致时返回 304（无响应体）
+
+    比较采用弱比较：nginx 压缩响应时会把强 ETag 改为弱 ETag（W/"..."）再交给客户端。
+    """
+    if request.if_none_match.contains_weak(payload.etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload.body, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = f'public, max-age={METADATA_MAX_AGE}'
+    response.headers[DEFINITIONS_VERSION_HEADER] = definitions_version
+    return response
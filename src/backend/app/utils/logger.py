@@ -1,74 +1,216 @@
 """
 日志配置模块
+
+日志器只挂一个 QueueHandler：请求线程把日志记录放入队列即返回，
+由后台线程（QueueListener）格式化并写入控制台与按日文件，格式化与 IO 都不在请求路径上。
+请求/计算/响应日志以结构化字段（payload）记录，只在后台线程真正输出时才序列化，
+输出格式由 ZCAL_LOG_FORMAT 决定（json：每行一个 JSON 对象；text：传统文本格式）。
+ZCAL_LOG_SAMPLE_RATE 控制请求日志的采样率（0~1），同一请求的请求/计算/响应日志同进同出，错误日志不采样。
 """
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
 from datetime import datetime
 from pathlib import Path
 
+# 日志输出格式：json（JSON lines）或 text
+LOG_FORMAT = os.environ.get('ZCAL_LOG_FORMAT', 'json')
+# 请求日志采样率（1 表示全部记录，0 表示不记录）
+LOG_SAMPLE_RATE = float(os.environ.get('ZCAL_LOG_SAMPLE_RATE', 1.0))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 已启动的 (QueueHandler, QueueListener)，fork 后在子进程中重建后台线程
+_listeners = []
+# 当前请求是否被采样（由 log_request 决定，同一请求的后续日志沿用）
+_sampled = contextvars.ContextVar('zcal_log_sampled', default=True)
+
+
+class _LazyCompact:
+    """延迟去掉 resultDefinitions 的结果包装，只在后台线程序列化时才复制字典"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def compact(self):
+        if isinstance(self.data, dict) and 'resultDefinitions' in self.data:
+            return {key: value for key, value in self.data.items() if key != 'resultDefinitions'}
+        return self.data
+
+    def __str__(self):
+        return str(self.compact())
+
+    __repr__ = __str__
+
+
+def _json_default(value):
+    """json.dumps 无法直接序列化的值：延迟包装展开，numpy 数值转为 Python 数值，其余转字符串"""
+    if isinstance(value, _LazyCompact):
+        return value.compact()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON：时间、级别、日志器、位置、消息及结构化字段"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, DATE_FORMAT),
+            'level': record.levelname,
+            'logger': record.name,
+            'func': f"{record.funcName}:{record.lineno}",
+            'message': record.getMessage(),
+        }
+        payload = getattr(record, 'payload', None)
+        if payload is not None:
+            entry.update(payload)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=_json_default)
+
+
+class TextFormatter(logging.Formatter):
+    """传统文本格式，结构化字段附在消息之后"""
+
+    def __init__(self):
+        super().__init__(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        payload = getattr(record, 'payload', None)
+        return f"{message}: {payload}" if payload is not None else message
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    入队时不做格式化的 QueueHandler
+
+    标准 QueueHandler.prepare 会在调用线程里格式化消息（为跨进程队列做 pickle 准备）；
+    这里的队列只在进程内使用，直接把原始记录交给后台线程，格式化推迟到真正输出时。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 def setup_logger(name: str = "zcal", level: str = "INFO") -> logging.Logger:
     """
-    设置应用日志器
-    
+    设置应用日志器（异步：QueueHandler + 后台写线程）
+
     Args:
         name: 日志器名称
         level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-    
+
     Returns:
         配置好的日志器实例
     """
     logger = logging.getLogger(name)
-    
+
     # 避免重复添加处理器
     if logger.handlers:
         return logger
-    
+
     # 设置日志级别
     log_level = getattr(logging, level.upper(), logging.INFO)
     logger.setLevel(log_level)
-    
+    # 输出由后台线程完成，不再向根日志器传播
+    logger.propagate = False
+
     # 创建格式化器
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+    formatter = JsonLinesFormatter() if LOG_FORMAT == 'json' else TextFormatter()
+
     # 控制台处理器
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    handlers = [console_handler]
+
     # 文件处理器（可选）
+    file_error = None
     try:
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
-        
+
         file_handler = logging.FileHandler(
             log_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.log",
             encoding='utf-8'
         )
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except Exception as e:
-        logger.warning(f"无法创建文件日志处理器: {e}")
-    
+        file_error = e
+
+    # 日志器只挂队列处理器，实际输出由后台线程完成
+    queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append((queue_handler, listener))
+    logger.addHandler(queue_handler)
+
+    if file_error is not None:
+        logger.warning("无法创建文件日志处理器: %s", file_error)
     return logger
 
+
+def _stop_listeners():
+    """进程退出前停止后台线程（会先写完队列中剩余的日志）"""
+    for _, listener in _listeners:
+        listener.stop()
+
+
+def _restart_listeners_in_child():
+    """
+    fork 后重建后台线程（gunicorn --preload 时日志器在主进程中创建，
+    子进程不继承线程）；同时换新队列，避免继承 fork 时刻的队列内部状态
+    """
+    for queue_handler, listener in _listeners:
+        queue_handler.queue = listener.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+
+atexit.register(_stop_listeners)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listeners_in_child)
+
+
 def log_request(logger: logging.Logger, request_data: dict, endpoint: str):
-    """记录API请求日志"""
-    logger.info(f"API请求 [{endpoint}]: {request_data}")
+    """记录API请求日志，并决定本请求的后续日志是否采样"""
+    sampled = LOG_SAMPLE_RATE >= 1 or random.random() < LOG_SAMPLE_RATE
+    _sampled.set(sampled)
+    if sampled:
+        logger.info("API请求 [%s]", endpoint, extra={'payload': {'event': 'request', 'endpoint': endpoint,
+                                                                  'request': request_data}})
 
 def log_response(logger: logging.Logger, response_data: dict, endpoint: str, duration: float = None):
-    """记录API响应日志"""
-    duration_str = f" (耗时: {duration:.3f}s)" if duration else ""
-    logger.info(f"API响应 [{endpoint}]{duration_str}: {response_data}")
+    """记录API响应日志（不记录静态的 resultDefinitions）"""
+    if not _sampled.get():
+        return
+    payload = {'event': 'response', 'endpoint': endpoint, 'response': _LazyCompact(response_data)}
+    if duration:
+        payload['duration_ms'] = round(duration * 1000, 3)
+    logger.info("API响应 [%s]", endpoint, extra={'payload': payload})
 
 def log_error(logger: logging.Logger, error: Exception, context: str = ""):
-    """记录错误日志"""
-    logger.error(f"错误 [{context}]: {type(error).__name__}: {str(error)}", exc_info=True)
+    """记录错误日志（不采样）"""
+    logger.error("错误 [%s]: %s: %s", context, type(error).__name__, error, exc_info=True)
 
 def log_calculation(logger: logging.Logger, model_type: str, params: dict, result: dict):
-    """记录计算过程日志"""
-    logger.info(f"计算 [{model_type}] 参数: {params} -> 结果: {result}")
\ No newline at end of file
+    """记录计算过程日志（不记录静态的 resultDefinitions）"""
+    if not _sampled.get():
+        return
+    logger.info("计算 [%s]", model_type, extra={'payload': {'event': 'calculation', 'type': model_type,
+                                                           'params': params, 'result': _LazyCompact(result)}})
+
@@ -0,0 +1,111 @@
+"""
+Prometheus 指标
+
+按接口与 calc_type 统计请求数、错误数与延迟直方图，另对 POST /api/calculate 的
+parse / validate / compute / serialize 各阶段单独计时。
+
+多进程：设置 PROMETHEUS_MULTIPROC_DIR（须在导入 prometheus_client 之前，且启动时为空目录）后，
+各 gunicorn worker 把指标写入该目录下的 mmap 文件，/metrics 汇总全部 worker 的数据；
+worker 退出时由 gunicorn.conf.py 的 child_exit 钩子标记（mark_process_dead）。
+未设置时使用进程内默认注册表（开发服务器单进程）。
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Tuple
+
+from flask import Flask, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+# 请求延迟与阶段耗时的直方图分桶（秒）；单点计算通常在 1ms 以内
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+# calc_type 标签只取已注册的模型类型，其余归为 other，避免标签基数失控
+OTHER_CALC_TYPE = 'other'
+NO_CALC_TYPE = ''
+
+REQUESTS = Counter(
+    'zcal_requests_total', '请求数',
+    ['method', 'endpoint', 'calc_type', 'status'],
+)
+ERRORS = Counter(
+    'zcal_request_errors_total', '错误响应数（状态码 >= 400）',
+    ['method', 'endpoint', 'calc_type', 'status'],
+)
+LATENCY = Histogram(
+    'zcal_request_duration_seconds', '请求处理耗时',
+    ['method', 'endpoint', 'calc_type'], buckets=REQUEST_BUCKETS,
+)
+PHASES = Histogram(
+    'zcal_calculate_phase_seconds', '单次计算各阶段耗时（parse / validate / compute / serialize）',
+    ['phase', 'calc_type'], buckets=PHASE_BUCKETS,
+)
+
+
+def calc_type_label(calc_type) -> str:
+    """calc_type 标签值：已注册的模型类型原样返回，其余归为 other"""
+    # 服务层也会导入本模块，模型注册表在函数内导入以避免循环导入
+    from app.services.models import MODEL_MAP
+
+    if not calc_type:
+        return NO_CALC_TYPE
+    return calc_type if isinstance(calc_type, str) and calc_type in MODEL_MAP else OTHER_CALC_TYPE
+
+
+def observe_phase(phase: str, calc_type, seconds: float) -> None:
+    """记录一个计算阶段的耗时"""
+    PHASES.labels(phase=phase, calc_type=calc_type_label(calc_type)).observe(seconds)
+
+
+@contextmanager
+def phase_timer(phase: str, calc_type):
+    """计算阶段计时（with 块），块内抛出异常时不记录"""
+    started = time.perf_counter()
+    yield
+    observe_phase(phase, calc_type, time.perf_counter() - started)
+
+
+def install_request_metrics(app: Flask) -> None:
+    """注册请求钩子：按接口（路由规则）与 calc_type 统计请求数、错误数与延迟"""
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = {'method': request.method, 'endpoint': endpoint, 'calc_type': _request_calc_type()}
+        status = str(response.status_code)
+        REQUESTS.labels(status=status, **labels).inc()
+        if response.status_code >= 400:
+            ERRORS.labels(status=status, **labels).inc()
+        LATENCY.labels(**labels).observe(time.perf_counter() - started)
+        return response
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """生成 Prometheus 文本格式的指标（多进程模式下汇总所有 worker）"""
+    registry = _registry()
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def _request_calc_type() -> str:
+    """从 JSON 请求体中读取 type 字段（get_json 结果已被 Flask 缓存，不会重复解析）"""
+    if not request.is_json:
+        return NO_CALC_TYPE
+    data = request.get_json(silent=True)
+    return calc_type_label(data.get('type') if isinstance(data, dict) else None)
@@ -0,0 +1,164 @@
+"""
+紧凑响应格式 - 按 Accept 请求头协商计算结果的表示与序列化方式
+
+    application/json（缺省）                完整格式：每个结果附带 resultDefinitions（标签、单位、精度）
+    application/vnd.zcal.compact+json       紧凑格式，orjson 序列化
+    application/msgpack                     紧凑格式，MessagePack 二进制（需安装 msgpack）
+
+紧凑格式不重复输出结果字段定义，只给出定义编号 definitions（定义内容的哈希），
+客户端从 GET /api/result_definitions（编号 -> 定义列表，带 ETag）取一次后本地缓存：
+    单次计算   {"status", "definitions", "values": [按定义顺序的结果值，缺失为 null], ...其余字段原样}
+    批量计算   按定义编号分组的列式结果 {"status", "count", "groups": [{"definitions", "index", "values": [[列], ...]}],
+               "errors": [{"index", "message"}]}，fast 引擎的 engine / error_bound 作为组内附加列
+    网格扫描   结果本身已是列式，仅以 definitions 代替 resultDefinitions
+    流式 NDJSON  逐条记录按以上规则转换（只提供紧凑 JSON，不提供 MessagePack）
+非有限值（NaN）在紧凑格式中序列化为 null。
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from flask import Response, request
+
+from .http_cache import DEFINITIONS_VERSION_HEADER
+
+try:
+    import orjson
+except ImportError:  # 未安装时退回标准库 json
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # 未安装时不提供 MessagePack 格式
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+COMPACT_MIMETYPE = 'application/vnd.zcal.compact+json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+# MessagePack 的非标准别名
+_MSGPACK_ALIASES = ('application/x-msgpack',)
+# 批量结果中不属于结果字段定义、按列输出的附加字段
+BATCH_EXTRA_KEYS = ('engine', 'error_bound')
+
+# 结果字段定义内容 -> 定义编号（定义只随代码变化，条目数等于不同定义列表的个数）
+_definition_ids: Dict[tuple, str] = {}
+_definition_ids_lock = threading.Lock()
+
+
+def negotiate(streaming: bool = False) -> Optional[str]:
+    """
+    按 Accept 请求头选择响应格式，返回 JSON_MIMETYPE / COMPACT_MIMETYPE / MSGPACK_MIMETYPE；
+    客户端不接受任何可提供的格式时返回 None（406）。未给出 Accept 或 */* 时为完整 JSON 格式。
+
+    Args:
+        streaming: NDJSON 流式响应（只提供完整与紧凑 JSON 两种记录格式）
+    """
+    offers = [JSON_MIMETYPE, COMPACT_MIMETYPE]
+    if msgpack is not None and not streaming:
+        offers += [MSGPACK_MIMETYPE, *_MSGPACK_ALIASES]
+    if not request.accept_mimetypes:
+        return JSON_MIMETYPE
+    best = request.accept_mimetypes.best_match(offers)
+    return MSGPACK_MIMETYPE if best in _MSGPACK_ALIASES else best
+
+
+def not_acceptable_message(streaming: bool = False) -> str:
+    formats = [JSON_MIMETYPE, COMPACT_MIMETYPE] + ([MSGPACK_MIMETYPE] if msgpack is not None and not streaming else [])
+    return f"不支持 Accept 请求的响应格式，可选: {', '.join(formats)}"
+
+
+def definitions_id(definitions: List[Dict[str, Any]]) -> str:
+    """结果字段定义列表的编号（规范化 JSON 的 SHA-256 前 16 位）"""
+    key = tuple(tuple(sorted(definition.items())) for definition in definitions)
+    found = _definition_ids.get(key)
+    if found is None:
+        body = json.dumps(definitions, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        found = hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+        with _definition_ids_lock:
+            _definition_ids[key] = found
+    return found
+
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """单次计算结果 -> 紧凑格式（出错的结果原样返回）"""
+    definitions = result.get('resultDefinitions')
+    if definitions is None:
+        return result
+    keys = [definition['key'] for definition in definitions]
+    compact = {key: value for key, value in result.items() if key != 'resultDefinitions' and key not in keys}
+    compact['definitions'] = definitions_id(definitions)
+    compact['values'] = [result.get(key) for key in keys]
+    return compact
+
+
+def compact_batch(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """批量计算结果列表 -> 按定义编号分组的列式格式"""
+    groups, errors = {}, []
+    for index, result in enumerate(results):
+        definitions = result.get('resultDefinitions')
+        if result.get('status') != 'success' or definitions is None:
+            errors.append({'index': index, 'message': result.get('message')})
+            continue
+        group_id = definitions_id(definitions)
+        group = groups.get(group_id)
+        if group is None:
+            group = groups[group_id] = {
+                'definitions': group_id,
+                'index': [],
+                'keys': [definition['key'] for definition in definitions],
+                'values': [[] for _ in definitions],
+                'extras': {},
+            }
+        row = len(group['index'])
+        group['index'].append(index)
+        for column, key in zip(group['values'], group['keys']):
+            column.append(result.get(key))
+        for key in BATCH_EXTRA_KEYS:
+            if key in result:
+                # 附加列只在组内出现过时输出，之前的行补 null
+                group['extras'].setdefault(key, [None] * row).append(result[key])
+        for column in group['extras'].values():
+            if len(column) < row + 1:
+                column.append(None)
+
+    output = []
+    for group in groups.values():
+        item = {'definitions': group['definitions'], 'index': group['index'], 'values': group['values']}
+        item.update(group['extras'])
+        output.append(item)
+    return {'status': 'success', 'count': len(results), 'groups': output, 'errors': errors}
+
+
+def compact_header(data: Dict[str, Any]) -> Dict[str, Any]:
+    """含 resultDefinitions 的响应（网格扫描及其流式 header 记录）：以定义编号代替定义列表"""
+    if 'resultDefinitions' not in data:
+        return data
+    compact = {key: value for key, value in data.items() if key != 'resultDefinitions'}
+    compact['definitions'] = definitions_id(data['resultDefinitions'])
+    return compact
+
+
+def compact_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """NDJSON 流式记录：批量的单项结果记录转为位置数组，header 记录以定义编号代替定义列表"""
+    if record.get('event') == 'result':
+        return compact_result(record)
+    return compact_header(record)
+
+
+def dumps(data: Any, mimetype: str = COMPACT_MIMETYPE) -> bytes:
+    """按格式序列化为字节串（紧凑 JSON 未安装 orjson 时退回标准库 json）"""
+    if mimetype == MSGPACK_MIMETYPE:
+        return msgpack.packb(data, use_bin_type=True)
+    if mimetype == COMPACT_MIMETYPE and orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def formatted_response(data: Any, mimetype: str, definitions_version: str, status: int = 200) -> Response:
+    """
+    紧凑格式响应（data 已由 compact_* 转换）；附带定义版本号，客户端据此判断缓存的结果字段定义是否过期
+    """
+    response = Response(dumps(data, mimetype), status=status, mimetype=mimetype)
+    response.headers[DEFINITIONS_VERSION_HEADER] = definitions_version
+    response.vary.add('Accept')
+    return response
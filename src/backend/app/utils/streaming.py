@@ -0,0 +1,71 @@
+"""
+流式响应 - 把记录生成器逐条序列化为 NDJSON（每行一个 JSON 对象）输出，或把文本块作为附件下载输出
+
+生成器在响应体被读取时才逐块计算，worker 内存只保留当前块；响应头发出后无法再修改状态码，
+计算中途出错时以 {"event": "error", ...} 记录（附件为注释行）结束流。
+NDJSON 记录可按紧凑格式输出（见 app.utils.response_format）。
+"""
+import json
+from typing import Callable, Iterable, Optional
+
+from flask import Response, stream_with_context
+
+from .response_format import compact_record, dumps
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def ndjson_response(records: Iterable[dict],
+                    on_error: Callable[[Exception], str],
+                    on_complete: Optional[Callable[[], None]] = None, compact: bool = False) -> Response:
+    """
+    NDJSON 流式响应
+
+    Args:
+        records: 记录生成器（惰性计算）
+        on_error: 中途出错时调用（记录日志），返回写入 error 记录的错误信息
+        on_complete: 全部记录输出完成后调用（可选）
+        compact: 按紧凑格式输出记录（以定义编号代替 resultDefinitions，单项结果为按定义顺序的数组）
+    """
+    def generate():
+        try:
+            for record in records:
+                if compact:
+                    yield dumps(compact_record(record)) + b'\n'
+                else:
+                    yield json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        except Exception as e:
+            message = on_error(e)
+            yield json.dumps({'event': 'error', 'status': 'error', 'message': message}, ensure_ascii=False) + '\n'
+            return
+        if on_complete is not None:
+            on_complete()
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def attachment_response(chunks: Iterable[str], filename: str, on_error: Callable[[Exception], str],
+                        comment_prefix: str = '! ', mimetype: str = 'text/plain',
+                        on_complete: Optional[Callable[[], None]] = None) -> Response:
+    """
+    文本文件下载（Content-Disposition: attachment）的流式响应
+
+    Args:
+        chunks: 文本块生成器（惰性计算）
+        filename: 下载文件名
+        on_error: 中途出错时调用（记录日志），返回写入文件末尾注释行的错误信息
+        comment_prefix: 文件格式的注释前缀（出错时写入注释行）
+        on_complete: 全部文本输出完成后调用（可选）
+    """
+    def generate():
+        try:
+            yield from chunks
+        except Exception as e:
+            yield f"{comment_prefix}error: {on_error(e)}\n"
+            return
+        if on_complete is not None:
+            on_complete()
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,23 @@
+"""
+后端 ASGI 入口（异步服务模式，与 run.py 的 WSGI 入口并存）
+
+请求体接收与响应发送在事件循环中异步完成，Flask 视图在线程池中执行（见 app/utils/asgi.py），
+慢速客户端与大响应不再占住 worker 进程（worker 数由 WEB_CONCURRENCY 指定，进程池大小据此均分 CPU 核数）：
+    WEB_CONCURRENCY=2 uvicorn asgi:app --host 0.0.0.0 --port 5000
+或由 gunicorn 管理 uvicorn worker：
+    WEB_CONCURRENCY=2 gunicorn -k uvicorn.workers.UvicornWorker --preload -b 0.0.0.0:5000 asgi:app
+"""
+import os
+from app import create_app
+from app.utils.asgi import WsgiToAsgi
+
+flask_app = create_app()
+app = WsgiToAsgi(flask_app)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    # 设置CORS允许的来源（开发环境使用 * 允许所有）
+    os.environ.setdefault('CORS_ORIGINS', '*')
+
+    uvicorn.run(app, host='0.0.0.0', port=int(os.getenv('FLASK_PORT', 5000)))
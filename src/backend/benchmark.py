@@ -0,0 +1,205 @@
+"""
+性能基准测试
+
+对 MODEL_MAP 中的每个模型测量三项：
+    single  默认参数单点计算 get_result()
+    sweep   默认参数扫频计算 get_result()（SWEEP_POINTS 个频点）
+    http    POST /api/calculate 完整请求路径（Flask test client，结果缓存关闭）
+每项输出 p50/p99 延迟、每秒调用次数与单次调用的峰值内存（tracemalloc），结果保存为 JSON；
+compare 子命令按回归阈值比较两次结果，存在回归时退出码为 1（便于 CI 使用）。
+
+用法：
+    python benchmark.py run                                # 全部模型，结果写入 benchmark.json
+    python benchmark.py run -o new.json microstrip cpw     # 只测指定模型
+    python benchmark.py run --engine numpy --seconds 2
+    python benchmark.py compare base.json new.json --threshold 0.15
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from importlib import metadata
+
+import numpy as np
+
+# 基准测量计算本身，关闭结果缓存（须在导入 app 之前设置）
+os.environ['ZCAL_RESULT_CACHE_SIZE'] = '0'
+
+from app import create_app  # noqa: E402
+from app.services.models import MODEL_MAP  # noqa: E402
+
+# 扫频点数
+SWEEP_POINTS = 1001
+# 每项测量的最少/最多调用次数与预热次数
+MIN_CALLS = 20
+MAX_CALLS = 20000
+WARMUP_CALLS = 3
+# 比较时默认使用的指标与回归阈值（相对变化）
+DEFAULT_METRIC = 'p50_ms'
+DEFAULT_THRESHOLD = 0.10
+# 记录版本号的依赖包
+TRACKED_PACKAGES = ('numpy', 'scipy', 'scikit-rf', 'Flask')
+
+
+def measure(func, seconds):
+    """
+    重复调用 func 直到达到时间预算（至少 MIN_CALLS 次，至多 MAX_CALLS 次）
+
+    Returns:
+        {"calls", "p50_ms", "p99_ms", "mean_ms", "calls_per_s", "peak_kib"}
+    """
+    for _ in range(WARMUP_CALLS):
+        func()
+
+    # 峰值内存单独测一次（tracemalloc 会显著拖慢计时）
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < MAX_CALLS:
+        call_started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - call_started)
+        if len(durations) >= MIN_CALLS and time.perf_counter() - started >= seconds:
+            break
+    total = time.perf_counter() - started
+
+    durations_ms = np.array(durations) * 1000
+    return {
+        'calls': len(durations),
+        'p50_ms': round(float(np.percentile(durations_ms, 50)), 4),
+        'p99_ms': round(float(np.percentile(durations_ms, 99)), 4),
+        'mean_ms': round(float(durations_ms.mean()), 4),
+        'calls_per_s': round(len(durations) / total, 1),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def model_benchmarks(client, calc_type, engine):
+    """单个模型的基准项：名称 -> 无参可调用对象"""
+    model_class = MODEL_MAP[calc_type]
+    sweep = {'start': 0.1, 'stop': 40, 'points': SWEEP_POINTS}
+    payload = {'type': calc_type, 'params': {}}
+    if engine:
+        payload['engine'] = engine
+
+    def http():
+        response = client.post('/api/calculate', json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{calc_type}: HTTP {response.status_code} {response.get_json()}")
+
+    return {
+        'single': lambda: model_class({}, engine=engine).get_result(),
+        'sweep': lambda: model_class({}, sweep, engine).get_result(),
+        'http': http,
+    }
+
+
+def run(args):
+    calc_types = args.types or list(MODEL_MAP)
+    unknown = [calc_type for calc_type in calc_types if calc_type not in MODEL_MAP]
+    if unknown:
+        sys.exit(f"不支持的计算类型: {', '.join(unknown)}")
+
+    # 请求日志会逐条写控制台与文件，默认关闭以免干扰计时
+    if not args.with_logging:
+        logging.disable(logging.INFO)
+    client = create_app().test_client()
+
+    results = {}
+    for calc_type in calc_types:
+        for name, func in model_benchmarks(client, calc_type, args.engine).items():
+            key = f"{calc_type}/{name}"
+            results[key] = measure(func, args.seconds)
+            stats = results[key]
+            print(f"{key:40s} p50 {stats['p50_ms']:9.3f} ms  p99 {stats['p99_ms']:9.3f} ms  "
+                  f"{stats['calls_per_s']:10.1f} 次/s  峰值 {stats['peak_kib']:9.1f} KiB")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'packages': {package: _package_version(package) for package in TRACKED_PACKAGES},
+            'engine': args.engine,
+            'seconds': args.seconds,
+            'sweep_points': SWEEP_POINTS,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+
+def compare(args):
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+
+    # 指标越大越好（calls_per_s）时按反向变化判定回归
+    higher_is_better = args.metric == 'calls_per_s'
+    regressions = []
+    for key in sorted(set(base['results']) & set(new['results'])):
+        old_value = base['results'][key][args.metric]
+        new_value = new['results'][key][args.metric]
+        if not old_value:
+            continue
+        change = (new_value - old_value) / old_value
+        regressed = (-change if higher_is_better else change) > args.threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{key:40s} {old_value:12.4f} -> {new_value:12.4f}  {change:+8.1%}{'  回归' if regressed else ''}")
+
+    for key in sorted(set(base['results']) ^ set(new['results'])):
+        print(f"{key:40s} 仅存在于{'基准' if key in base['results'] else '新'}结果中")
+
+    if regressions:
+        print(f"{len(regressions)} 项 {args.metric} 超过回归阈值 {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"无回归（指标 {args.metric}，阈值 {args.threshold:.0%}）")
+
+
+def _package_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zcal 性能基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="运行基准测试并保存 JSON 结果")
+    run_parser.add_argument('types', nargs='*', help="模型类型（缺省为全部）")
+    run_parser.add_argument('-o', '--output', default='benchmark.json', help="结果文件")
+    run_parser.add_argument('--engine', default=None, help="计算引擎（缺省为模型默认引擎）")
+    run_parser.add_argument('--seconds', type=float, default=1.0, help="每项测量的时间预算（秒）")
+    run_parser.add_argument('--with-logging', action='store_true', help="保留请求日志")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser('compare', help="比较两次结果")
+    compare_parser.add_argument('base', help="基准结果文件")
+    compare_parser.add_argument('new', help="新结果文件")
+    compare_parser.add_argument('--metric', default=DEFAULT_METRIC,
+                                choices=['p50_ms', 'p99_ms', 'mean_ms', 'calls_per_s', 'peak_kib'])
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="回归阈值（相对变化）")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
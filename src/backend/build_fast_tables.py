@@ -0,0 +1,33 @@
+"""
+离线构建 fast 引擎插值表
+
+用法：
+    python build_fast_tables.py                 # 构建全部模型
+    python build_fast_tables.py microstrip cpw  # 只构建指定模型
+输出目录由 ZCAL_FAST_TABLE_DIR 指定，缺省为 data/fast_tables
+"""
+import sys
+
+from app.services.method import fast_table
+from app.services.models import MODEL_MAP
+
+
+def main(types):
+    for calc_type in types or MODEL_MAP:
+        if calc_type not in MODEL_MAP:
+            print(f"跳过未知模型: {calc_type}")
+            continue
+        model_class = MODEL_MAP[calc_type]
+        if not model_class.FAST_TABLE_AXES:
+            print(f"跳过 {calc_type}: 未定义插值表坐标轴")
+            continue
+        info = fast_table.build_table(model_class)
+        print(
+            f"{calc_type}: 网格 {info['shape']}，{info['bytes'] / 1024:.0f} KiB，"
+            f"单元误差估计 最大 {info['cell_error_max']:.2e} / 中位 {info['cell_error_median']:.2e}，"
+            f"随机校验最大误差 {info['validation_error_max']:.2e}，耗时 {info['seconds']}s"
+        )
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
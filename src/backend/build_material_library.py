@@ -0,0 +1,21 @@
+"""
+离线构建材料库（SQLite，带索引，各 worker 按材料键逐条查询）
+
+用法：
+    python build_material_library.py                        # 由 data/materials/*.json 构建
+    python build_material_library.py vendor_a.json dir/     # 由指定文件或目录构建
+输出文件由 ZCAL_MATERIAL_LIBRARY 指定，缺省为 data/materials.sqlite
+"""
+import sys
+
+from app.services.model_materials import build_library, load_source_records
+
+
+def main(paths):
+    records = load_source_records(paths or None)
+    info = build_library(records)
+    print(f"材料库: {info['materials']} 种材料，{info['bytes'] / 1024:.0f} KiB -> {info['path']}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,22 @@
+"""
+gunicorn 配置（gunicorn 启动时自动加载工作目录下的 gunicorn.conf.py，命令行参数优先）
+
+设置了 PROMETHEUS_MULTIPROC_DIR 时维护 Prometheus 多进程指标目录，见 app/utils/metrics.py。
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    """清空多进程指标目录（上次运行残留的指标文件会被重复汇总）"""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """worker 退出后标记其指标文件，避免已退出进程的实时类指标被继续汇总"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,206 @@
+"""
+计算内核一致性校验
+
+    mline   numpy 微带线内核 vs skrf.media.MLine：0.1–100 GHz、w/h 0.01–20、er 1–15（含导体厚度、介质损耗）
+    cpw     numpy 共面波导内核 vs skrf.media.CPW：空气背面 / 金属背面
+    material  按材料计算（model_calculate.material_outputs）vs 以各频点材料 er(f) / tand(f) 直接构造的
+              skrf 媒质（介质色散关闭）：同轴线、微带线、带状线
+内核检查逐个比较 z0、ep_reff_f、gamma，材料检查比较阻抗、有效介电常数与损耗（相对误差），
+任一项超出容差时退出码为 1（便于 CI 使用）。
+两侧在同一位置同为 NaN（如 er=1 且 tand>0 时介质损耗 0/0）视为一致。
+
+用法：
+    python validate_kernels.py              # 全部检查
+    python validate_kernels.py mline
+"""
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from app.services.method import calculator
+
+# 相对误差容差（calculator 模块文档中给出的一致性指标）
+MLINE_TOLERANCE = 1e-9
+CPW_TOLERANCE = 1e-9
+MATERIAL_TOLERANCE = 1e-9
+# 比较的结果属性
+COMPARED_ATTRIBUTES = ('z0', 'ep_reff_f', 'gamma')
+# 校验范围：频率 0.1–100 GHz（对数等距）
+FREQUENCIES = np.logspace(-1, 2, 61) * 1e9
+MLINE_WIDTH_RATIOS = np.logspace(np.log10(0.01), np.log10(20), 25)
+MLINE_DIELECTRICS = np.linspace(1, 15, 8)
+MLINE_HEIGHTS = (0.1e-3, 0.8e-3)
+MLINE_THICKNESS_RATIOS = (0.05, 0.25)
+LOSS_TANGENTS = (0.0, 0.02)
+CPW_WIDTHS = (0.05e-3, 0.2e-3, 1e-3)
+CPW_GAPS = (0.05e-3, 0.2e-3, 0.5e-3)
+CPW_DIELECTRICS = (2.2, 4.3, 10.2)
+CPW_HEIGHT = 0.2e-3
+CPW_THICKNESS = 0.035e-3
+# 材料检查：材料（频率表 / 非 1 GHz 标定的 Debye）、扫频与 (模型, 引擎, 参数)
+MATERIAL_KEYS = ('FR4_Wideband', 'Rogers4350B')
+MATERIAL_SWEEP = {'start': 0.5, 'stop': 40, 'points': 41}
+MATERIAL_COMPARED_KEYS = ('impedance', 'er_eff', 'loss_db_per_mm')
+MATERIAL_CASES = (
+    ('coaxial', 'skrf', {'inner_diameter': 0.5, 'outer_diameter': 1.6}),
+    ('microstrip', 'skrf', {'width': 0.3, 'height': 0.2, 'thickness': 0.035}),
+    ('microstrip', 'numpy', {'width': 0.3, 'height': 0.2, 'thickness': 0.035}),
+    ('stripline', 'skrf', {'width': 0.2, 'height': 0.6, 'thickness': 0.035}),
+    ('stripline', 'numpy', {'width': 0.2, 'height': 0.6, 'thickness': 0.035}),
+)
+
+
+def relative_error(actual, expected):
+    """复数相对误差的最大值；NaN 位置不一致时为 inf"""
+    actual, expected = np.asarray(actual), np.asarray(expected)
+    nan_actual, nan_expected = np.isnan(actual), np.isnan(expected)
+    if np.any(nan_actual != nan_expected):
+        return float('inf')
+    valid = ~nan_expected
+    scale = np.maximum(np.abs(expected[valid]), np.finfo(float).tiny)
+    return float(np.max(np.abs(actual[valid] - expected[valid]) / scale, initial=0.0))
+
+
+def _compare(cases, keys=COMPARED_ATTRIBUTES):
+    """cases 逐个产出 (描述, 结果, 参考)，结果与参考为对象（按属性取值）或字典，返回 (各项最大误差, 最差用例, 用例数)"""
+    worst = dict.fromkeys(keys, 0.0)
+    worst_case = dict.fromkeys(keys, '')
+    count = 0
+    with warnings.catch_warnings():
+        # er=1 时两侧介质损耗公式均出现 0/0
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for label, result, media in cases:
+            count += 1
+            for key in keys:
+                error = relative_error(_value(result, key), _value(media, key))
+                if error > worst[key]:
+                    worst[key], worst_case[key] = error, label
+    return worst, worst_case, count
+
+
+def _value(result, key):
+    return result[key] if isinstance(result, dict) else getattr(result, key)
+
+
+def check_mline():
+    from skrf import Frequency
+    from skrf.media import mline
+
+    frequency = Frequency.from_f(FREQUENCIES, unit='hz')
+
+    def cases():
+        for h in MLINE_HEIGHTS:
+            for t_ratio in MLINE_THICKNESS_RATIOS:
+                for u in MLINE_WIDTH_RATIOS:
+                    for er in MLINE_DIELECTRICS:
+                        for tand in LOSS_TANGENTS:
+                            w, t = u * h, t_ratio * h
+                            yield (
+                                f"h={h * 1e3:g}mm t/h={t_ratio:g} w/h={u:.4g} er={er:g} tand={tand:g}",
+                                calculator.mline(FREQUENCIES, w=w, h=h, t=t, ep_r=er, tand=tand),
+                                mline.MLine(frequency=frequency, w=w, h=h, t=t, ep_r=er, tand=tand),
+                            )
+
+    return _compare(cases()), MLINE_TOLERANCE
+
+
+def check_cpw():
+    from skrf import Frequency
+    from skrf.media import cpw
+
+    frequency = Frequency.from_f(FREQUENCIES, unit='hz')
+
+    def cases():
+        for backside in (False, True):
+            for w in CPW_WIDTHS:
+                for s in CPW_GAPS:
+                    for er in CPW_DIELECTRICS:
+                        for tand in LOSS_TANGENTS:
+                            yield (
+                                f"backside={backside} w={w * 1e3:g}mm s={s * 1e3:g}mm er={er:g} tand={tand:g}",
+                                calculator.cpw(FREQUENCIES, w=w, s=s, t=CPW_THICKNESS, ep_r=er, tand=tand,
+                                               h=CPW_HEIGHT, has_metal_backside=backside),
+                                cpw.CPW(frequency=frequency, w=w, s=s, h=CPW_HEIGHT, t=CPW_THICKNESS, ep_r=er,
+                                        tand=tand, has_metal_backside=backside),
+                            )
+
+    return _compare(cases()), CPW_TOLERANCE
+
+
+def check_material():
+    from skrf import Frequency
+    from skrf.media import coaxial, mline
+    from app.services.model_calculate import material_outputs
+    from app.services.model_materials import get_material
+    from app.services.models import MODEL_MAP
+
+    def reference(calc_type, params, f, er, tand):
+        """单频点参考：介电参数取材料在该频点的值，不再施加介质色散"""
+        frequency = Frequency.from_f([f * 1e9], unit='hz')
+        if calc_type == 'coaxial':
+            media = coaxial.Coaxial(frequency=frequency, Dint=params['inner_diameter'] / 1000,
+                                    Dout=params['outer_diameter'] / 1000, epsilon_r=er, tan_delta=tand)
+            er_eff = er
+        else:
+            # 带状线模型按介质厚度一半的微带线近似，er_eff 即介电常数
+            h = params['height'] / 1000 / (2 if calc_type == 'stripline' else 1)
+            media = mline.MLine(frequency=frequency, w=params['width'] / 1000, h=h, t=params['thickness'] / 1000,
+                                ep_r=er, tand=tand, diel='frequencyinvariant')
+            er_eff = er if calc_type == 'stripline' else media.ep_reff_f.real[0]
+        return media.z0.real[0], er_eff, media.gamma.real[0] * 8.686 / 1000
+
+    def cases():
+        for key in MATERIAL_KEYS:
+            material = get_material(key)
+            for calc_type, engine, geometry in MATERIAL_CASES:
+                params = dict(geometry, frequency=1, dielectric=material.er, loss_tangent=material.loss_tangent)
+                model = MODEL_MAP[calc_type](params, MATERIAL_SWEEP, engine)
+                er, tand = material.properties(model.frequencies)
+                expected = np.array([reference(calc_type, geometry, f, e, d)
+                                     for f, e, d in zip(model.frequencies, er, tand)])
+                yield (
+                    f"{key} {calc_type} engine={engine}",
+                    material_outputs(model, material),
+                    dict(zip(MATERIAL_COMPARED_KEYS, expected.T)),
+                )
+
+    return _compare(cases(), MATERIAL_COMPARED_KEYS), MATERIAL_TOLERANCE
+
+
+CHECKS = {
+    'mline': check_mline,
+    'cpw': check_cpw,
+    'material': check_material,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zcal 计算内核一致性校验")
+    parser.add_argument('checks', nargs='*', help=f"检查项：{', '.join(CHECKS)}（缺省为全部）")
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"未知检查项: {', '.join(unknown)}")
+
+    failed = []
+    for name in args.checks or CHECKS:
+        started = time.perf_counter()
+        (worst, worst_case, count), tolerance = CHECKS[name]()
+        seconds = time.perf_counter() - started
+        passed = all(error <= tolerance for error in worst.values())
+        points = MATERIAL_SWEEP['points'] if name == 'material' else FREQUENCIES.size
+        print(f"{name}: {count} 组参数 × {points} 频点，容差 {tolerance:.0e}，"
+              f"{'通过' if passed else '失败'}（{seconds:.1f}s）")
+        for key, error in worst.items():
+            mark = '' if error <= tolerance else '  <-- 超出容差'
+            print(f"    {key:<10} 最大相对误差 {error:.2e}  {worst_case[key]}{mark}")
+        if not passed:
+            failed.append(name)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())